@@ -0,0 +1,219 @@
+import zlib
+from typing import Callable
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+# media that is already compressed, or must reach the client chunk by chunk
+SKIPPED_MEDIA_TYPES = (
+    "audio/",
+    "image/",
+    "video/",
+    "application/octet-stream",
+    "application/zip",
+    "text/event-stream",
+)
+
+
+class _Encoder:
+    """incremental encoder of one response body"""
+
+    def __init__(self, compress: Callable, flush: Callable, finish: Callable):
+        self.compress = compress
+        self.flush = flush
+        self.finish = finish
+
+
+class _Codec:
+    def __init__(self, name: str, encoder: Callable[[], _Encoder]):
+        self.name = name
+        self.encoder = encoder
+
+    def encode(self, data: bytes) -> bytes:
+        encoder = self.encoder()
+        return encoder.compress(data) + encoder.finish()
+
+
+def _gzip(level: int) -> _Codec:
+    def encoder() -> _Encoder:
+        obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return _Encoder(obj.compress, lambda: obj.flush(zlib.Z_SYNC_FLUSH), obj.flush)
+
+    return _Codec("gzip", encoder)
+
+
+def _brotli(quality: int) -> _Codec:
+    def encoder() -> _Encoder:
+        obj = brotli.Compressor(quality=quality)
+        return _Encoder(obj.process, obj.flush, obj.finish)
+
+    return _Codec("br", encoder)
+
+
+def _zstd(level: int) -> _Codec:
+    def encoder() -> _Encoder:
+        # a compressor must not be shared by streams running at the same time
+        obj = zstandard.ZstdCompressor(level=level).compressobj()
+        return _Encoder(
+            obj.compress,
+            lambda: obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            obj.flush,
+        )
+
+    return _Codec("zstd", encoder)
+
+
+def _accepted(accept_encoding: str) -> dict[str, float]:
+    """`Accept-Encoding` as coding -> q-value"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.strip().split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    compresses response bodies with the best of zstd, brotli and gzip the
+    client accepts. small bodies, ranges, already encoded responses and media
+    are sent as they are. bodies of at least `thread_threshold` bytes are
+    compressed in a worker thread so the event loop keeps serving
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int,
+        gzip_level: int,
+        brotli_quality: int,
+        zstd_level: int,
+        thread_threshold: int,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_threshold = thread_threshold
+        # in server preference order, codecs whose library is missing are left out
+        self.codecs = []
+        if zstandard is not None:
+            self.codecs.append(_zstd(zstd_level))
+        if brotli is not None:
+            self.codecs.append(_brotli(brotli_quality))
+        self.codecs.append(_gzip(gzip_level))
+
+    def negotiate(self, accept_encoding: str) -> _Codec | None:
+        accepted = _accepted(accept_encoding)
+        best, best_q = None, 0.0
+        for codec in self.codecs:
+            q = accepted.get(codec.name, accepted.get("*", 0.0))
+            if q > best_q:
+                best, best_q = codec, q
+        return best
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        codec = self.negotiate(headers.get("accept-encoding", ""))
+        if codec is None or "range" in headers:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressedResponder(self, codec, send)
+        await self.app(scope, receive, responder.send_wrapper)
+
+    async def _run(self, fn: Callable[[bytes], bytes], data: bytes) -> bytes:
+        if len(data) >= self.thread_threshold:
+            return await anyio.to_thread.run_sync(fn, data)
+        return fn(data)
+
+
+class _CompressedResponder:
+    def __init__(self, middleware: CompressionMiddleware, codec: _Codec, send: Send):
+        self.middleware = middleware
+        self.codec = codec
+        self.send = send
+        self.start: Message | None = None
+        self.passthrough = False
+        self.encoder: _Encoder | None = None
+
+    def _compressible(self, message: Message) -> bool:
+        if message["status"] < 200 or message["status"] in (204, 206, 304):
+            return False
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        return not headers.get("content-type", "").startswith(SKIPPED_MEDIA_TYPES)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = not self._compressible(message)
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=self.start["headers"])
+
+        if self.encoder is None and not more_body:
+            # the whole body at once
+            if len(body) < self.middleware.minimum_size:
+                await self.send(self.start)
+                await self.send(message)
+                return
+            body = await self.middleware._run(self.codec.encode, body)
+            self._set_encoding(headers)
+            headers["Content-Length"] = str(len(body))
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        if self.encoder is None:
+            # a streamed body, each chunk is flushed so the client is not kept waiting
+            self.encoder = self.codec.encoder()
+            self._set_encoding(headers)
+            del headers["Content-Length"]
+            await self.send(self.start)
+
+        encoder = self.encoder
+        chunk = await self.middleware._run(
+            lambda data: (
+                encoder.compress(data)
+                + (encoder.flush() if more_body else encoder.finish())
+            ),
+            body,
+        )
+        await self.send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
+
+    def _set_encoding(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.codec.name
+        headers.add_vary_header("Accept-Encoding")
@@ -0,0 +1,149 @@
+import datetime
+import functools
+import hashlib
+import inspect
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, get_args, get_origin
+
+from fastapi import Request, Response, status
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter
+
+
+# kept by the database without touching updated_at
+COUNTER_FIELDS = ("followers_count", "following_count")
+
+
+class DTOResponse(Response):
+    """json body dumped by pydantic's serializer straight from validated dtos"""
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, adapter: TypeAdapter, status_code: int = 200):
+        self.adapter = adapter
+        self.content = content
+        super().__init__(content, status_code)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(content, by_alias=True)
+
+
+def _dto_model(response_model: Any) -> tuple[type[BaseModel], bool] | None:
+    """the dto class of `response_model` and whether it is a list of them"""
+    if isinstance(response_model, type) and issubclass(response_model, BaseModel):
+        return response_model, False
+    if get_origin(response_model) is list:
+        (item,) = get_args(response_model)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return item, True
+    return None
+
+
+def _fast_endpoint(
+    endpoint: Callable, model: type[BaseModel], many: bool, status_code: int
+) -> Callable:
+    adapter = TypeAdapter(list[model] if many else model)
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        if many:
+            exact = isinstance(result, list) and all(type(r) is model for r in result)
+        else:
+            exact = type(result) is model
+        if exact:
+            return DTOResponse(result, adapter, status_code)
+        return result
+
+    wrapper.dto_response = True
+    return wrapper
+
+
+def _validators(response: Response) -> tuple[str, datetime.datetime | None]:
+    """
+    weak etag and last modified time of a response. a single entity is
+    versioned by its id and `updated_at`, anything else by a digest of the body
+    """
+    entity = getattr(response, "content", None)
+    fields = type(entity).model_fields if isinstance(entity, BaseModel) else {}
+    if "id" in fields and "updated_at" in fields:
+        version = [
+            type(entity).__name__.lower(),
+            entity.id,
+            entity.updated_at.strftime("%Y%m%d%H%M%S%f"),
+        ]
+        counters = [getattr(entity, f) for f in COUNTER_FIELDS if f in fields]
+        etag = 'W/"' + "-".join(str(v) for v in version + counters) + '"'
+        if counters:
+            return etag, None
+        return etag, entity.updated_at.replace(tzinfo=datetime.timezone.utc)
+    digest = hashlib.blake2b(response.body, digest_size=16).hexdigest()
+    return f'W/"{digest}"', None
+
+
+def _not_modified(
+    request: Request, etag: str, last_modified: datetime.datetime | None
+) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return last_modified.replace(microsecond=0) <= since
+
+
+class DTORoute(APIRoute):
+    """
+    sends dtos of exactly the declared `response_model` type as they are,
+    without fastapi validating them once more on the way out. anything else,
+    e.g. a subclass with extra fields that have to be stripped, takes the regular path.
+    routes copied by `include_router` keep the already wrapped endpoint.
+
+    GET responses carry validators and are answered with 304 when the client's
+    `If-None-Match` or `If-Modified-Since` still matches
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        dto = _dto_model(kwargs.get("response_model"))
+        if (
+            dto is not None
+            and isinstance(kwargs.get("response_class"), DefaultPlaceholder)
+            and inspect.iscoroutinefunction(endpoint)
+            and not getattr(endpoint, "dto_response", False)
+        ):
+            model, many = dto
+            endpoint = _fast_endpoint(
+                endpoint, model, many, kwargs.get("status_code") or 200
+            )
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        if "GET" not in self.methods or _dto_model(self.response_model) is None:
+            return handler
+
+        async def conditional_handler(request: Request) -> Response:
+            response = await handler(request)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            etag, last_modified = _validators(response)
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if last_modified is not None:
+                headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+            if _not_modified(request, etag, last_modified):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+                )
+            response.headers.update(headers)
+            return response
+
+        return conditional_handler
@@ -7,6 +7,7 @@ from fastapi import (
     Depends,
 )
 from fastapi.responses import Response
+from api.responses import DTORoute
 from dto.music import (
     NewAlbum,
     Album,
@@ -27,7 +28,7 @@ from exceptions.music import (
 )
 from exceptions.accounts import UserNotFoundException
 
-router = APIRouter(prefix="/album", tags=["album"])
+router = APIRouter(prefix="/album", tags=["album"], route_class=DTORoute)
 
 
 @router.post(
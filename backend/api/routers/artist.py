@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from api.responses import DTORoute
+
+from services.accounts import AccountService
+from configs.depends import get_account_service
+from exceptions.accounts import UserNotFoundException
+from dto.accounts import ArtistPage, ArtistPageParams
+
+router = APIRouter(prefix="/artist", tags=["artist"], route_class=DTORoute)
+
+
+@router.get("/page/", response_model=ArtistPage)
+async def get_artist_page(
+    params: ArtistPageParams = Depends(),
+    account_service: AccountService = Depends(get_account_service),
+):
+    try:
+        return await account_service.get_artist_page(params)
+    except UserNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
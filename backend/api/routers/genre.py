@@ -4,13 +4,14 @@ from fastapi import (
     status,
     Depends,
 )
+from api.responses import DTORoute
 from dto.music import GenreID, Genre, NewGenre, GenreSearchParams, UpdateGenre
 from dto.accounts import UserMiddleware
 from services.music import MusicService
 from configs.depends import get_music_service, check_admin_access
 from exceptions.music import GenreNameAlreadyExistsException, GenreNotFoundException
 
-router = APIRouter(prefix="/genre", tags=["genre"])
+router = APIRouter(prefix="/genre", tags=["genre"], route_class=DTORoute)
 
 
 @router.post(
@@ -1,7 +1,8 @@
 from fastapi import APIRouter
+from api.responses import DTORoute
 
 
-router = APIRouter(prefix="/misc", tags=["misc"])
+router = APIRouter(prefix="/misc", tags=["misc"], route_class=DTORoute)
 
 
 @router.get("/ping", response_model=str)
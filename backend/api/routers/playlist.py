@@ -5,8 +5,10 @@ from fastapi import (
     HTTPException,
     status,
     Depends,
+    Body,
 )
 from fastapi.responses import Response
+from api.responses import DTORoute
 
 from dto.accounts import (
     NewPlaylist,
@@ -14,6 +16,9 @@ from dto.accounts import (
     PlaylistID,
     PlaylistSearchParams,
     PlaylistTrack,
+    PlaylistTrackPosition,
+    PlaylistTracks,
+    PlaylistTrackResult,
     UpdatePlaylist,
     UserMiddleware,
     PlaylistTrackSearchParams,
@@ -34,7 +39,7 @@ from exceptions.accounts import (
 )
 from exceptions.music import ImageFileNotFoundException, TrackNotFoundException
 
-router = APIRouter(prefix="/playlist", tags=["playlist"])
+router = APIRouter(prefix="/playlist", tags=["playlist"], route_class=DTORoute)
 
 
 @router.post(
@@ -179,7 +184,7 @@ async def delete_image(
     status_code=status.HTTP_201_CREATED,
 )
 async def add_track_to_playlist(
-    playlist_track: PlaylistTrack = Depends(),
+    playlist_track: PlaylistTrackPosition = Depends(),
     accounts_service: AccountService = Depends(get_account_service),
     _: UserMiddleware = Depends(
         require_owner_or_admin(
@@ -191,6 +196,7 @@ async def add_track_to_playlist(
         return await accounts_service.add_track_to_playlist(playlist_track)
     except (
         PlaylistNotFoundException,
+        PlaylistTrackNotFoundException,
         TrackNotFoundException,
     ) as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -198,6 +204,28 @@ async def add_track_to_playlist(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+@router.put(
+    "/track/position/",
+    response_model=PlaylistTrack,
+)
+async def move_track_in_playlist(
+    playlist_track: PlaylistTrackPosition = Depends(),
+    accounts_service: AccountService = Depends(get_account_service),
+    _: UserMiddleware = Depends(
+        require_owner_or_admin(
+            PlaylistTrack, "playlist_id", "get_playlist", get_account_service
+        )
+    ),
+):
+    try:
+        return await accounts_service.move_track_in_playlist(playlist_track)
+    except (
+        PlaylistNotFoundException,
+        PlaylistTrackNotFoundException,
+    ) as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
 @router.get(
     "/tracks/",
     response_model=list[Track],
@@ -233,3 +261,45 @@ async def remove_track_from_playlist(
         TrackNotFoundException,
     ) as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.post(
+    "/tracks/",
+    response_model=list[PlaylistTrackResult],
+    description="add many tracks to the playlist `id` in one statement",
+)
+async def add_tracks_to_playlist(
+    playlist_id: PlaylistID = Depends(),
+    track_ids: list[int] = Body(min_length=1, max_length=1000),
+    accounts_service: AccountService = Depends(get_account_service),
+    _: UserMiddleware = Depends(
+        require_owner_or_admin(PlaylistID, "id", "get_playlist", get_account_service)
+    ),
+):
+    try:
+        return await accounts_service.add_tracks_to_playlist(
+            PlaylistTracks(playlist_id=playlist_id.id, track_ids=track_ids)
+        )
+    except PlaylistNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.post(
+    "/tracks/remove",
+    response_model=list[PlaylistTrackResult],
+    description="remove many tracks from the playlist `id` in one statement",
+)
+async def remove_tracks_from_playlist(
+    playlist_id: PlaylistID = Depends(),
+    track_ids: list[int] = Body(min_length=1, max_length=1000),
+    accounts_service: AccountService = Depends(get_account_service),
+    _: UserMiddleware = Depends(
+        require_owner_or_admin(PlaylistID, "id", "get_playlist", get_account_service)
+    ),
+):
+    try:
+        return await accounts_service.remove_tracks_from_playlist(
+            PlaylistTracks(playlist_id=playlist_id.id, track_ids=track_ids)
+        )
+    except PlaylistNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
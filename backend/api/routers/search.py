@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from api.responses import DTORoute
+
+from dto.search import SuggestEntry, SuggestParams
+from services.search import SearchService
+from configs.depends import get_search_service
+
+router = APIRouter(prefix="/search", tags=["search"], route_class=DTORoute)
+
+
+@router.get(
+    "/suggest",
+    response_model=list[SuggestEntry],
+    description="names of tracks, albums, artists and genres starting with `prefix`",
+)
+async def suggest(
+    params: SuggestParams = Depends(),
+    search_service: SearchService = Depends(get_search_service),
+) -> list[SuggestEntry]:
+    return await search_service.suggest(params)
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from api.responses import DTORoute
 from typing import List
 from configs.depends import get_account_service, get_login_or_admin, get_login_or_user
 from dto.accounts import (
@@ -16,7 +17,7 @@ from exceptions.accounts import (
     SubscriptionAlreadyExist,
 )
 
-router = APIRouter(prefix="/user", tags=["user"])
+router = APIRouter(prefix="/user", tags=["user"], route_class=DTORoute)
 
 
 @router.post(
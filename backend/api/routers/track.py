@@ -8,6 +8,7 @@ from fastapi import (
     Request,
 )
 from fastapi.responses import StreamingResponse, Response
+from api.responses import DTORoute
 from dto.music import (
     Track,
     NewSingle,
@@ -33,7 +34,7 @@ from exceptions.music import (
 )
 from exceptions.accounts import UserNotFoundException
 
-router = APIRouter(prefix="/track", tags=["track"])
+router = APIRouter(prefix="/track", tags=["track"], route_class=DTORoute)
 
 
 @router.post("/single/", response_model=Track, status_code=status.HTTP_201_CREATED)
@@ -1,24 +1,46 @@
+from typing import AsyncIterator
 from fastapi import (
     APIRouter,
+    Body,
     HTTPException,
     status,
     Depends,
 )
+from fastapi.responses import StreamingResponse
+from api.responses import DTORoute
 
-from dto.music import TrackID
-from exceptions.track_queue import TrackQueueNotFoundException
+from dto.music import AlbumID, TrackID
+from exceptions.music import AlbumNotFoundException, TrackNotFoundException
+from exceptions.accounts import PlaylistNotFoundException
+from exceptions.track_queue import (
+    PlaybackSessionNotFoundException,
+    TrackQueueNotFoundException,
+)
 from services.track_queue import TrackQueueService
-from configs.depends import check_access, get_track_queue_service
-from dto.accounts import UserMiddleware
+from services.playback_session import PlaybackSessionService
+from configs.depends import (
+    check_access,
+    get_playback_session_service,
+    get_track_queue_service,
+)
+from dto.accounts import PlaylistID, UserMiddleware
 from dto.track_queue import (
+    BulkEnqueueParams,
     InQueueID,
+    PlaybackSession,
+    PlaybackState,
+    PrefetchParams,
+    QueueModes,
     QueueParameters,
+    QueuePrefetch,
+    QueueRepeat,
+    QueueShuffle,
     QueueSrcDestIDs,
     TrackInQueueIDs,
     TrackQueue,
 )
 
-router = APIRouter(prefix="/track_queue", tags=["music"])
+router = APIRouter(prefix="/track_queue", tags=["music"], route_class=DTORoute)
 
 
 @router.post(
@@ -57,6 +79,71 @@ async def track_queue_push_right(
         )
 
 
+@router.post(
+    "/album",
+    status_code=status.HTTP_200_OK,
+    description="add all tracks of an album to a queue, or replace the queue with them",
+)
+async def track_queue_enqueue_album(
+    album_id: AlbumID = Depends(AlbumID),
+    params: BulkEnqueueParams = Depends(BulkEnqueueParams),
+    user: UserMiddleware = Depends(check_access),
+    user_activity_service: TrackQueueService = Depends(get_track_queue_service),
+) -> None:
+    try:
+        return await user_activity_service.enqueue_album(user.id, album_id, params)
+    except AlbumNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{e}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}"
+        )
+
+
+@router.post(
+    "/playlist",
+    status_code=status.HTTP_200_OK,
+    description="add all tracks of a playlist to a queue, or replace the queue with them",
+)
+async def track_queue_enqueue_playlist(
+    playlist_id: PlaylistID = Depends(PlaylistID),
+    params: BulkEnqueueParams = Depends(BulkEnqueueParams),
+    user: UserMiddleware = Depends(check_access),
+    user_activity_service: TrackQueueService = Depends(get_track_queue_service),
+) -> None:
+    try:
+        return await user_activity_service.enqueue_playlist(
+            user.id, playlist_id, params
+        )
+    except PlaylistNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{e}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}"
+        )
+
+
+@router.post(
+    "/tracks",
+    status_code=status.HTTP_200_OK,
+    description="add tracks to a queue in the given order, or replace the queue with them",
+)
+async def track_queue_enqueue_tracks(
+    track_ids: list[int] = Body(min_length=1, max_length=1000),
+    params: BulkEnqueueParams = Depends(BulkEnqueueParams),
+    user: UserMiddleware = Depends(check_access),
+    user_activity_service: TrackQueueService = Depends(get_track_queue_service),
+) -> None:
+    try:
+        return await user_activity_service.enqueue_tracks(user.id, track_ids, params)
+    except TrackNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{e}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}"
+        )
+
+
 @router.get(
     "/",
     response_model=TrackQueue,
@@ -78,6 +165,27 @@ async def track_queue_list(
         )
 
 
+@router.get(
+    "/prefetch",
+    response_model=QueuePrefetch,
+    status_code=status.HTTP_200_OK,
+    description="the next entries of the queue with their tracks and stream sizes, to start them without a gap",
+)
+async def track_queue_prefetch(
+    params: PrefetchParams = Depends(PrefetchParams),
+    user: UserMiddleware = Depends(check_access),
+    user_activity_service: TrackQueueService = Depends(get_track_queue_service),
+) -> QueuePrefetch:
+    try:
+        return await user_activity_service.prefetch(user.id, params)
+    except TrackQueueNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{e}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}"
+        )
+
+
 @router.delete(
     "/",
     response_model=None,
@@ -159,3 +267,167 @@ async def remove_from_queue(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}"
         )
+
+
+@router.patch(
+    "/shuffle",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    description="shuffle the queue, the order before the first shuffle is kept for `unshuffle`",
+)
+async def shuffle_queue(
+    params: QueueShuffle = Depends(QueueShuffle),
+    user: UserMiddleware = Depends(check_access),
+    user_activity_service: TrackQueueService = Depends(get_track_queue_service),
+) -> None:
+    try:
+        return await user_activity_service.shuffle(user.id, params)
+    except TrackQueueNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{e}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}"
+        )
+
+
+@router.patch(
+    "/unshuffle",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    description="restore the order of the queue before it was shuffled, tracks added since then go last",
+)
+async def unshuffle_queue(
+    user: UserMiddleware = Depends(check_access),
+    user_activity_service: TrackQueueService = Depends(get_track_queue_service),
+) -> None:
+    try:
+        return await user_activity_service.unshuffle(user.id)
+    except TrackQueueNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{e}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}"
+        )
+
+
+@router.patch(
+    "/repeat",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    description="set what `next` does with the track it returns: `off` removes it, `one` keeps it first, `all` moves it to the end",
+)
+async def set_queue_repeat(
+    params: QueueRepeat = Depends(QueueRepeat),
+    user: UserMiddleware = Depends(check_access),
+    user_activity_service: TrackQueueService = Depends(get_track_queue_service),
+) -> None:
+    try:
+        return await user_activity_service.set_repeat(user.id, params)
+    except TrackQueueNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{e}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}"
+        )
+
+
+@router.get(
+    "/modes",
+    response_model=QueueModes,
+    status_code=status.HTTP_200_OK,
+    description="shuffle and repeat modes of the queue",
+)
+async def get_queue_modes(
+    user: UserMiddleware = Depends(check_access),
+    user_activity_service: TrackQueueService = Depends(get_track_queue_service),
+) -> QueueModes:
+    try:
+        return await user_activity_service.get_modes(user.id)
+    except TrackQueueNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{e}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}"
+        )
+
+
+@router.post(
+    "/next",
+    response_model=TrackID,
+    status_code=status.HTTP_200_OK,
+    description="take the next track from the queue according to its repeat mode",
+)
+async def next_in_queue(
+    user: UserMiddleware = Depends(check_access),
+    user_activity_service: TrackQueueService = Depends(get_track_queue_service),
+) -> TrackID:
+    try:
+        return await user_activity_service.next(user.id)
+    except TrackQueueNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{e}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}"
+        )
+
+
+@router.put(
+    "/session",
+    response_model=None,
+    status_code=status.HTTP_200_OK,
+    description="report what is playing now, frequent updates are coalesced and the latest one wins",
+)
+async def update_playback_session(
+    state: PlaybackState = Depends(PlaybackState),
+    user: UserMiddleware = Depends(check_access),
+    playback_session_service: PlaybackSessionService = Depends(
+        get_playback_session_service
+    ),
+) -> None:
+    playback_session_service.update(user.id, state)
+
+
+@router.get(
+    "/session",
+    response_model=PlaybackSession,
+    status_code=status.HTTP_200_OK,
+    description="the last reported playback state to resume from",
+)
+async def resume_playback_session(
+    user: UserMiddleware = Depends(check_access),
+    playback_session_service: PlaybackSessionService = Depends(
+        get_playback_session_service
+    ),
+) -> PlaybackSession:
+    try:
+        return await playback_session_service.resume(user.id)
+    except PlaybackSessionNotFoundException as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{e}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}"
+        )
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    description="server-sent events with the changes of the queue, each tagged with the queue `version` it makes. on a gap in versions or a `resync` event the queue has to be fetched again",
+)
+async def track_queue_events(
+    user: UserMiddleware = Depends(check_access),
+    user_activity_service: TrackQueueService = Depends(get_track_queue_service),
+) -> StreamingResponse:
+    async def stream() -> AsyncIterator[str]:
+        async for event in user_activity_service.events(user.id):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"data: {event}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File
+from api.responses import DTORoute
 from typing import Optional
 from fastapi.responses import Response
 
@@ -37,7 +38,7 @@ from dto.accounts import (
 )
 
 
-router = APIRouter(prefix="/user", tags=["user"])
+router = APIRouter(prefix="/user", tags=["user"], route_class=DTORoute)
 
 
 @router.post(
@@ -1,24 +1,31 @@
-from typing import Optional
+from typing import Any, Optional
 from fastapi import (
     APIRouter,
+    Body,
     HTTPException,
     status,
     Depends,
 )
+from pydantic import TypeAdapter
+from api.responses import DTORoute, DTOResponse
 
 from exceptions.user_activity import (
+    UserActivityBufferFullException,
     UserActivityNotFoundException,
 )
 from dto.user_activity import (
     UserActivity,
+    UserActivityBatchResult,
     UserActivityFilter,
     UserActivityPost,
 )
 from services.user_activity import UserActivityService
 from configs.depends import get_user_activity_service
 
-router = APIRouter(prefix="/user_activity", tags=["telemetry"])
-activity_metrics_router = APIRouter(prefix="/activity-metrics")
+USER_ACTIVITY = TypeAdapter(UserActivity)
+
+router = APIRouter(prefix="/user_activity", tags=["telemetry"], route_class=DTORoute)
+activity_metrics_router = APIRouter(prefix="/activity-metrics", route_class=DTORoute)
 
 
 @router.get(
@@ -67,15 +74,45 @@ async def list_user_activities(
     return user_activities
 
 
-@router.post("/", response_model=UserActivity, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=UserActivity,
+    status_code=status.HTTP_201_CREATED,
+    responses={202: {"model": UserActivity, "description": "buffered, stored later"}},
+)
 async def add_user_activity(
     user_activity: UserActivityPost = Depends(),
     user_activity_service: UserActivityService = Depends(get_user_activity_service),
 ) -> UserActivity:
     try:
-        return await user_activity_service.add(user_activity)
+        added = await user_activity_service.add(user_activity)
+    except UserActivityBufferFullException as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"{e}"
+        )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{e}")
+    if user_activity_service.buffer is not None:
+        return DTOResponse(added, USER_ACTIVITY, status.HTTP_202_ACCEPTED)
+    return added
+
+
+@router.post(
+    "/batch",
+    response_model=UserActivityBatchResult,
+    status_code=status.HTTP_200_OK,
+    description="store buffered activities at once, the invalid ones are reported by their index and the rest are stored",
+)
+async def add_user_activities(
+    user_activities: list[Any] = Body(min_length=1, max_length=1000),
+    user_activity_service: UserActivityService = Depends(get_user_activity_service),
+) -> UserActivityBatchResult:
+    try:
+        return await user_activity_service.add_many(user_activities)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}"
+        )
 
 
 @router.post("/delete", status_code=status.HTTP_200_OK)
@@ -13,6 +13,7 @@ from beanie import Document, init_beanie
 import hashlib
 
 from configs.environment import settings
+from configs.metrics import redis_pool_connections
 
 
 DBS = ["music"]
@@ -43,7 +44,7 @@ def get_mongo_url(db_name: str) -> str:
 def get_redis_url(db_name: str) -> str:
     creds = get_db_creds(db_name)
     host = f"redis-{db_name}-service"
-    return f"redis://{creds['user']}:{creds['password']}@{host}:{creds['port']}/{creds['db']}?decode_responses=True&health_check_interval=2&protocol=3"
+    return f"redis://{creds['user']}:{creds['password']}@{host}:{creds['port']}/{creds['db']}?decode_responses=True&protocol=3"
 
 
 engines: dict[str, AsyncEngine] = {
@@ -83,6 +84,29 @@ def get_redis_client_generator(
     return lambda: redis.asyncio.Redis.from_url(get_redis_url(db_name))
 
 
+def get_redis_client(
+    db_name: str, max_connections: int, timeout: float, health_check_interval: int
+) -> redis.asyncio.client.Redis:
+    """
+    a client over one process-wide pool, closing the client closes the pool.
+    a caller waits up to `timeout` seconds for a free connection
+    """
+    pool = redis.asyncio.BlockingConnectionPool.from_url(
+        get_redis_url(db_name),
+        max_connections=max_connections,
+        timeout=timeout,
+        health_check_interval=health_check_interval,
+    )
+    redis_pool_connections.labels(db_name, "in_use").set_function(
+        lambda: len(pool._in_use_connections)
+    )
+    redis_pool_connections.labels(db_name, "idle").set_function(
+        lambda: len(pool._available_connections)
+    )
+    redis_pool_connections.labels(db_name, "max").set(max_connections)
+    return redis.asyncio.Redis.from_pool(pool)
+
+
 def get_scripts(scripts_dir: str = "scripts/") -> dict[str, str]:
     sha1s = {}
     for filename in os.listdir(scripts_dir):
@@ -1,14 +1,20 @@
 from configs.environment import settings
+from configs.logger import logger
 from configs.database import (
-    get_redis_client_generator,
+    get_redis_client,
     get_session_generator,
     get_scripts,
 )
 from dto.accounts import UserMiddleware, UserRole
 from services.music import MusicService
 from services.user_activity import UserActivityService
+from services.user_activity_buffer import UserActivityBuffer
 from services.accounts import AccountService
 from services.track_queue import TrackQueueService
+from services.playback_session import PlaybackSessionService
+from services.cache import CacheBroadcaster, ResultCache
+from services.search import SearchService
+from services.file_outbox import FileOutboxWorker
 from repositories.music_file import MinioMusicFileRepository
 from repositories.track import SQLAlchemyTrackRepository
 from repositories.album import SQLAlchemyAlbumRepository
@@ -17,12 +23,17 @@ from repositories.user import SQLAlchemyUserRepository
 from repositories.user_activity import MongoDBUserActivityRepository
 from repositories.playlist import SQLAlchemyPlaylistRepository
 from repositories.track_queue import RedisTrackQueueRepository
+from repositories.playback_session import RedisPlaybackSessionRepository
+from repositories.suggest import InMemorySuggestRepository
+from repositories.file_outbox import SQLAlchemyFileOutboxRepository
+from repositories.cache_events import SQLAlchemyCacheEventsRepository
 from exceptions.accounts import AccountsBaseException
 from exceptions.music import MusicBaseException
 
 from typing import Type, Callable, Any
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI, Request, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
@@ -30,8 +41,18 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app.state.user_activity_repository = await MongoDBUserActivityRepository.create()
+    app.state.user_activity_buffer = None
+    if settings.USER_ACTIVITY_BUFFER_ENABLED:
+        app.state.user_activity_buffer = UserActivityBuffer(
+            app.state.user_activity_repository,
+            settings.USER_ACTIVITY_BUFFER_MAX_SIZE,
+            settings.USER_ACTIVITY_BUFFER_FLUSH_SIZE,
+            settings.USER_ACTIVITY_BUFFER_FLUSH_INTERVAL,
+            settings.USER_ACTIVITY_BUFFER_POLICY,
+            settings.USER_ACTIVITY_BUFFER_PUT_TIMEOUT,
+        )
     app.state.user_activity_service = UserActivityService(
-        app.state.user_activity_repository
+        app.state.user_activity_repository, app.state.user_activity_buffer
     )
 
     app.state.music_file_repository = MinioMusicFileRepository(
@@ -41,13 +62,13 @@ async def lifespan(app: FastAPI):
         settings.MINIO_MUSIC_BUCKET,
         settings.MINIO_COVER_BUCKET,
     )
-    app.state.track_repository = SQLAlchemyTrackRepository(
+    app.state.genre_repository = await SQLAlchemyGenreRepository.create(
         await get_session_generator("music")
     )
-    app.state.album_repository = SQLAlchemyAlbumRepository(
-        await get_session_generator("music")
+    app.state.track_repository = SQLAlchemyTrackRepository(
+        await get_session_generator("music"), app.state.genre_repository
     )
-    app.state.genre_repository = SQLAlchemyGenreRepository(
+    app.state.album_repository = SQLAlchemyAlbumRepository(
         await get_session_generator("music")
     )
     app.state.user_repository = SQLAlchemyUserRepository(
@@ -56,12 +77,49 @@ async def lifespan(app: FastAPI):
     app.state.playlist_repository = SQLAlchemyPlaylistRepository(
         await get_session_generator("music")
     )
+    app.state.search_cache = ResultCache(
+        "search",
+        settings.SEARCH_CACHE_TTL,
+        settings.SEARCH_CACHE_NEGATIVE_TTL,
+        settings.SEARCH_CACHE_MAX_ENTRIES,
+    )
+    app.state.entity_cache = ResultCache(
+        "entity",
+        settings.ENTITY_CACHE_TTL,
+        settings.ENTITY_CACHE_NEGATIVE_TTL,
+        settings.ENTITY_CACHE_MAX_ENTRIES,
+    )
+    app.state.cache_broadcaster = CacheBroadcaster(
+        SQLAlchemyCacheEventsRepository(await get_session_generator("music")),
+        [app.state.search_cache, app.state.entity_cache],
+        settings.CACHE_LISTENER_RETRY_DELAY,
+    )
+    app.state.suggest_repository = await InMemorySuggestRepository.create(
+        await get_session_generator("music")
+    )
+    app.state.search_service = SearchService(app.state.suggest_repository)
+    app.state.file_outbox_repository = SQLAlchemyFileOutboxRepository(
+        await get_session_generator("music"),
+        settings.FILE_OUTBOX_RETRY_DELAY,
+        settings.FILE_OUTBOX_MAX_RETRY_DELAY,
+        settings.FILE_OUTBOX_MAX_ATTEMPTS,
+    )
+    app.state.file_outbox_worker = FileOutboxWorker(
+        app.state.file_outbox_repository,
+        app.state.music_file_repository,
+        settings.FILE_OUTBOX_BATCH_SIZE,
+        settings.FILE_OUTBOX_INTERVAL,
+    )
 
     app.state.music_service = MusicService(
         app.state.music_file_repository,
         app.state.track_repository,
         app.state.album_repository,
         app.state.genre_repository,
+        app.state.search_cache,
+        app.state.entity_cache,
+        app.state.suggest_repository,
+        app.state.file_outbox_worker,
     )
     app.state.account_service = AccountService(
         app.state.user_repository,
@@ -69,15 +127,83 @@ async def lifespan(app: FastAPI):
         app.state.music_file_repository,
         app.state.album_repository,
         app.state.track_repository,
+        app.state.search_cache,
+        app.state.entity_cache,
+        app.state.suggest_repository,
+        app.state.file_outbox_worker,
+    )
+    app.state.track_queue_client = get_redis_client(
+        "track-queue",
+        settings.TRACK_QUEUE_MAX_CONNECTIONS,
+        settings.TRACK_QUEUE_POOL_TIMEOUT,
+        settings.TRACK_QUEUE_HEALTH_CHECK_INTERVAL,
     )
     app.state.track_queue_repository = RedisTrackQueueRepository(
-        get_redis_client_generator("track-queue"),
+        app.state.track_queue_client,
         settings.TRACK_QUEUE_TTL,
         get_scripts(),
+        settings.TRACK_QUEUE_EVENTS_BUFFER,
     )
 
-    app.state.track_queue_service = TrackQueueService(app.state.track_queue_repository)
+    app.state.track_queue_service = TrackQueueService(
+        app.state.track_queue_repository,
+        app.state.track_repository,
+        app.state.playlist_repository,
+        app.state.music_service,
+        settings.TRACK_QUEUE_EVENTS_KEEPALIVE,
+    )
+    app.state.playback_session_repository = RedisPlaybackSessionRepository(
+        app.state.track_queue_client, settings.PLAYBACK_SESSION_TTL
+    )
+    app.state.playback_session_service = PlaybackSessionService(
+        app.state.playback_session_repository,
+        app.state.user_activity_repository,
+        settings.PLAYBACK_SESSION_FLUSH_INTERVAL,
+        settings.PLAYBACK_SESSION_COMPACTION_INTERVAL,
+        settings.PLAYBACK_SESSION_COMPACTION_BATCH_SIZE,
+    )
+
+    suggest_reload = asyncio.create_task(
+        app.state.suggest_repository.run_reload(settings.SUGGEST_RELOAD_INTERVAL)
+    )
+    file_outbox_worker = asyncio.create_task(app.state.file_outbox_worker.run())
+    genre_listener = asyncio.create_task(
+        app.state.genre_repository.run_listener(settings.GENRE_LISTENER_RETRY_DELAY)
+    )
+    cache_listener = asyncio.create_task(app.state.cache_broadcaster.run_listener())
+    cache_publisher = asyncio.create_task(app.state.cache_broadcaster.run())
+    track_queue_listener = asyncio.create_task(
+        app.state.track_queue_repository.run_listener(
+            settings.TRACK_QUEUE_LISTENER_RETRY_DELAY
+        )
+    )
+    playback_session_writer = asyncio.create_task(
+        app.state.playback_session_service.run()
+    )
+    writers = [playback_session_writer]
+    if app.state.user_activity_buffer is not None:
+        writers.append(asyncio.create_task(app.state.user_activity_buffer.run()))
     yield
+    suggest_reload.cancel()
+    file_outbox_worker.cancel()
+    genre_listener.cancel()
+    cache_listener.cancel()
+    cache_publisher.cancel()
+    track_queue_listener.cancel()
+    # writes cut short by the cancellation go back to their buffers first
+    for writer in writers:
+        writer.cancel()
+    await asyncio.gather(*writers, return_exceptions=True)
+    try:
+        await app.state.playback_session_service.flush()
+    except Exception as e:
+        logger.warning("failed to flush playback sessions: %s", e)
+    if app.state.user_activity_buffer is not None:
+        try:
+            await app.state.user_activity_buffer.flush()
+        except Exception as e:
+            logger.warning("failed to flush user activities: %s", e)
+    await app.state.track_queue_client.aclose()
 
 
 def get_user_activity_service(request: Request) -> UserActivityService:
@@ -96,6 +222,14 @@ def get_track_queue_service(request: Request) -> TrackQueueService:
     return request.app.state.track_queue_service
 
 
+def get_playback_session_service(request: Request) -> PlaybackSessionService:
+    return request.app.state.playback_session_service
+
+
+def get_search_service(request: Request) -> SearchService:
+    return request.app.state.search_service
+
+
 security = HTTPBearer()
 optional_bearer = HTTPBearer(auto_error=False)
 
@@ -200,7 +334,8 @@ def require_owner_or_admin(
         get_object_method = getattr(service, get_method_name_in_service, None)
 
         try:
-            target_object = await get_object_method(ID(id=body_id))
+            # ownership is checked against the database, not the entity cache
+            target_object = await get_object_method(ID(id=body_id), cached=False)
         except (
             AccountsBaseException,
             MusicBaseException,
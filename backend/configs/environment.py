@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -18,12 +20,49 @@ class Settings(BaseSettings):
     USER_ACTIVITY_ROOT_PASSWORD: str
     USER_ACTIVITY_DB: str
     USER_ACTIVITY_PORT: int
+    USER_ACTIVITY_BUFFER_ENABLED: bool
+    USER_ACTIVITY_BUFFER_MAX_SIZE: int
+    USER_ACTIVITY_BUFFER_FLUSH_SIZE: int
+    USER_ACTIVITY_BUFFER_FLUSH_INTERVAL: float
+    USER_ACTIVITY_BUFFER_POLICY: Literal["block", "drop"]
+    USER_ACTIVITY_BUFFER_PUT_TIMEOUT: float
 
     TRACK_QUEUE_ROOT_USER: str
     TRACK_QUEUE_ROOT_PASSWORD: str
     TRACK_QUEUE_DB: str
     TRACK_QUEUE_PORT: int
     TRACK_QUEUE_TTL: int
+    TRACK_QUEUE_MAX_CONNECTIONS: int
+    TRACK_QUEUE_POOL_TIMEOUT: float
+    TRACK_QUEUE_HEALTH_CHECK_INTERVAL: int
+    TRACK_QUEUE_EVENTS_BUFFER: int
+    TRACK_QUEUE_EVENTS_KEEPALIVE: float
+    TRACK_QUEUE_LISTENER_RETRY_DELAY: float
+    PLAYBACK_SESSION_TTL: int
+    PLAYBACK_SESSION_FLUSH_INTERVAL: float
+    PLAYBACK_SESSION_COMPACTION_INTERVAL: float
+    PLAYBACK_SESSION_COMPACTION_BATCH_SIZE: int
+
+    SEARCH_CACHE_TTL: float
+    SEARCH_CACHE_NEGATIVE_TTL: float
+    SEARCH_CACHE_MAX_ENTRIES: int
+    ENTITY_CACHE_TTL: float
+    ENTITY_CACHE_NEGATIVE_TTL: float
+    ENTITY_CACHE_MAX_ENTRIES: int
+    CACHE_LISTENER_RETRY_DELAY: float
+    SUGGEST_RELOAD_INTERVAL: float
+    GENRE_LISTENER_RETRY_DELAY: float
+    FILE_OUTBOX_BATCH_SIZE: int
+    FILE_OUTBOX_INTERVAL: float
+    FILE_OUTBOX_RETRY_DELAY: float
+    FILE_OUTBOX_MAX_RETRY_DELAY: float
+    FILE_OUTBOX_MAX_ATTEMPTS: int
+    FILE_SWEEP_GRACE_PERIOD: float
+    COMPRESSION_MINIMUM_SIZE: int
+    COMPRESSION_GZIP_LEVEL: int
+    COMPRESSION_BROTLI_QUALITY: int
+    COMPRESSION_ZSTD_LEVEL: int
+    COMPRESSION_THREAD_THRESHOLD: int
 
     BACKEND_PORT: int
     BACKEND_REPLICAS: int
@@ -0,0 +1,50 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+
+result_cache_requests = Counter(
+    "result_cache_requests_total",
+    "Result cache lookups by result: hit, negative_hit, coalesced or miss",
+    ["cache", "namespace", "result"],
+)
+result_cache_entries = Gauge(
+    "result_cache_entries",
+    "Number of entries held by a result cache",
+    ["cache"],
+)
+file_outbox_backlog = Gauge(
+    "file_outbox_backlog",
+    "Rows of the file outbox by state: pending or exhausted (out of attempts)",
+    ["state"],
+)
+file_outbox_files = Counter(
+    "file_outbox_files_total",
+    "Files handled by the file outbox worker by result: removed or failed",
+    ["result"],
+)
+redis_pool_connections = Gauge(
+    "redis_pool_connections",
+    "Connections of a redis pool by state: in_use, idle or max",
+    ["pool", "state"],
+)
+track_queue_event_subscribers = Gauge(
+    "track_queue_event_subscribers",
+    "Track queue event streams open in this process",
+)
+playback_session_writes = Counter(
+    "playback_session_writes_total",
+    "Playback session updates by stage: received, flushed to redis or compacted into activities",
+    ["stage"],
+)
+user_activity_buffer_depth = Gauge(
+    "user_activity_buffer_depth",
+    "User activities held by the write-behind buffer, flushing ones included",
+)
+user_activity_buffer_events = Counter(
+    "user_activity_buffer_events_total",
+    "User activities by result: buffered, dropped or rejected when full, stored or failed",
+    ["result"],
+)
+user_activity_buffer_flush_seconds = Histogram(
+    "user_activity_buffer_flush_seconds",
+    "Time to write one batch of buffered user activities",
+)
@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from enum import Enum
 import datetime
 
+from dto.music import ArtistAlbum, Track
+
 
 class UserRole(str, Enum):
     user = "user"
@@ -46,6 +48,8 @@ class User(BaseModel):
     description: str | None = None
     username: str
     role: UserRole
+    followers_count: int = 0
+    following_count: int = 0
     created_at: datetime.datetime
     updated_at: datetime.datetime
 
@@ -65,6 +69,20 @@ class Artist(BaseModel):
     id: int
     name: str
     description: str | None = None
+    followers_count: int = 0
+    following_count: int = 0
+
+
+class ArtistPageParams(BaseModel):
+    id: int
+    albums_limit: int = Field(ge=1, le=100, default=100)
+    tracks_limit: int = Field(ge=1, le=100, default=10)
+
+
+class ArtistPage(BaseModel):
+    artist: Artist
+    albums: list[ArtistAlbum]
+    latest_tracks: list[Track]
 
 
 class LoginRegister(BaseModel):
@@ -103,6 +121,28 @@ class PlaylistTrack(BaseModel):
     track_id: int
 
 
+class PlaylistTrackPosition(PlaylistTrack):
+    before_id: int | None = None
+
+
+class PlaylistTracks(BaseModel):
+    playlist_id: int
+    track_ids: list[int] = Field(min_length=1, max_length=1000)
+
+
+class PlaylistTrackStatus(str, Enum):
+    added = "added"
+    already_exists = "already_exists"
+    removed = "removed"
+    not_in_playlist = "not_in_playlist"
+    track_not_found = "track_not_found"
+
+
+class PlaylistTrackResult(BaseModel):
+    track_id: int
+    status: PlaylistTrackStatus
+
+
 class SubscribersCount(BaseModel):
     count: int
 
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class CacheInvalidation(BaseModel):
+    """entries of `namespace` dropped by one replica, all of them when `ids` is None"""
+
+    origin: str
+    cache: str
+    namespace: str
+    ids: list[int] | None = None
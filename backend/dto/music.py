@@ -1,4 +1,5 @@
 from datetime import date, datetime
+from enum import Enum
 from fastapi import Query
 from pydantic import BaseModel, Field
 from typing import AsyncIterator
@@ -9,6 +10,64 @@ class MusicFileStats(BaseModel):
     size: int
 
 
+class FileKind(str, Enum):
+    track = "track"
+    image = "image"
+
+
+class FileKey(BaseModel):
+    kind: FileKind
+    name: str
+
+
+class CatalogKind(str, Enum):
+    track = "track"
+    album = "album"
+    playlist = "playlist"
+    user = "user"
+
+
+class CatalogEntry(BaseModel):
+    """a catalog row owning a file, tracks are stored under their artist"""
+
+    kind: CatalogKind
+    id: int
+    artist_id: int | None = None
+
+
+class FileOutboxEntry(BaseModel):
+    id: int
+    catalog: CatalogEntry
+    attempts: int
+
+
+class FileOutboxBacklog(BaseModel):
+    pending: int
+    exhausted: int
+
+
+class DeletedTrack(BaseModel):
+    id: int
+    artist_id: int
+
+
+class DeletedCatalog(BaseModel):
+    """
+    rows removed by one cascading delete, their files are queued for removal in the same transaction
+    """
+
+    tracks: list[DeletedTrack] = []
+    album_ids: list[int] = []
+    playlist_ids: list[int] = []
+    user_ids: list[int] = []
+
+    def add(self, entry: CatalogEntry) -> None:
+        if entry.kind == CatalogKind.track:
+            self.tracks.append(DeletedTrack(id=entry.id, artist_id=entry.artist_id))
+        else:
+            getattr(self, f"{entry.kind.value}_ids").append(entry.id)
+
+
 @dataclass
 class TrackStream:
     stream: AsyncIterator[bytes]
@@ -94,6 +153,10 @@ class Track(NewTrack):
     updated_at: datetime
 
 
+class ArtistAlbum(Album):
+    tracks_count: int
+
+
 class MusicSearchParams(BaseModel):
     name: str | None = None
     skip: int = Field(ge=0, default=0)
@@ -121,3 +184,17 @@ class TrackSearchParams(MusicSearchParams):
     genre_id: int | None = None
     release_search_start: date | None = None
     release_search_end: date | None = None
+
+
+class IngestTrack(BaseModel):
+    """
+    one line of a bulk ingest manifest, `file` and `cover` are relative to the blob directory
+    """
+
+    name: str
+    album: str
+    artist_id: int
+    genre_id: int | None = None
+    release_date: date
+    file: str
+    cover: str | None = None
@@ -0,0 +1,24 @@
+from enum import Enum
+from fastapi import Query
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class SuggestKind(str, Enum):
+    track = "track"
+    album = "album"
+    artist = "artist"
+    genre = "genre"
+
+
+class SuggestEntry(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    kind: SuggestKind
+    id: int
+    name: str
+
+
+class SuggestParams(BaseModel):
+    prefix: str = Query(min_length=1, max_length=100)
+    kind: SuggestKind | None = None
+    limit: int = Field(ge=1, le=50, default=10)
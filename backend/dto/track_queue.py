@@ -1,6 +1,10 @@
+import datetime
+from enum import Enum
 from fastapi import Query
 from pydantic import BaseModel, ConfigDict
 
+from dto.music import Track
+
 
 class InQueueID(BaseModel):
     """
@@ -20,9 +24,15 @@ class QueueParameters(BaseModel):
 
 
 class TrackQueue(BaseModel):
+    """
+    `version` counts the changes of the queue, an event stream tags each
+    change with the version it makes
+    """
+
     model_config = ConfigDict(from_attributes=True)
 
     track_ids: list[int]
+    version: int
 
 
 class TrackInQueueIDs(BaseModel):
@@ -37,3 +47,105 @@ class QueueSrcDestIDs(BaseModel):
 
     src_id: int = Query(ge=0)
     dest_id: int = Query(ge=0)
+
+
+class QueueSide(str, Enum):
+    left = "left"
+    right = "right"
+
+
+class BulkEnqueueParams(BaseModel):
+    """
+    where tracks added at once go: `left` plays them next, in their order.
+    `replace` clears the queue first and turns shuffle off
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    side: QueueSide = Query(default=QueueSide.right)
+    replace: bool = Query(default=False)
+
+
+class RepeatMode(str, Enum):
+    off = "off"
+    one = "one"
+    all = "all"
+
+
+class QueueRepeat(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    mode: RepeatMode = Query()
+
+
+class QueueShuffle(BaseModel):
+    """
+    the same seed gives the same order of the same queue, a random one is
+    picked when not set
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    seed: int | None = Query(ge=0, le=2**31 - 1, default=None)
+
+
+class QueueModes(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    shuffle: bool
+    seed: int | None
+    repeat: RepeatMode
+
+
+class PlaybackState(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    track_id: int = Query(ge=0)
+    position_ms: int = Query(ge=0)
+    queue_index: int | None = Query(ge=0, default=None)
+
+
+class PlaybackSession(BaseModel):
+    """
+    what the user plays right now, to resume it on any device
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: int
+    track_id: int
+    position_ms: int
+    queue_index: int | None
+    updated_at: datetime.datetime
+
+
+class PrefetchParams(BaseModel):
+    """
+    `warm` reads through the caches the stream endpoint uses, so starting the
+    prefetched tracks takes no cold lookups. without it the caches are left as they are
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    limit: int = Query(ge=1, le=10, default=2)
+    warm: bool = Query(default=True)
+
+
+class PrefetchedTrack(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    queue_id: int
+    track: Track
+    size: int
+
+
+class QueuePrefetch(BaseModel):
+    """
+    the entries `next` takes, head first. entries whose track or file is gone
+    are left out
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    entries: list[PrefetchedTrack]
+    version: int
@@ -1,6 +1,6 @@
 import datetime
 from typing import Optional
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class UserActivityPost(BaseModel):
@@ -11,6 +11,31 @@ class UserActivityPost(BaseModel):
     event: str
 
 
+class UserActivityBatchPost(UserActivityPost):
+    """an activity of a batch, checked against the stored event length up front"""
+
+    event: str = Field(max_length=20)
+
+
+class UserActivityBatchError(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    index: int
+    detail: str
+
+
+class UserActivityBatchResult(BaseModel):
+    """
+    `errors` point to the rejected activities of a batch by their index,
+    all the others are stored
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    inserted: int
+    errors: list[UserActivityBatchError]
+
+
 class UserActivity(UserActivityPost):
     id: int
     time: datetime.datetime
@@ -1,2 +1,6 @@
 class TrackQueueNotFoundException(Exception):
     pass
+
+
+class PlaybackSessionNotFoundException(Exception):
+    pass
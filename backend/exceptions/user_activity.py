@@ -4,3 +4,7 @@ class UserActivityException(Exception):
 
 class UserActivityNotFoundException(UserActivityException):
     pass
+
+
+class UserActivityBufferFullException(UserActivityException):
+    pass
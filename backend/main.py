@@ -6,9 +6,11 @@ from configs.logger import logger
 from configs.environment import settings
 from api.routers import album, track, genre
 from api.routers import user_activity
-from api.routers import user, playlist, subscribe
+from api.routers import user, playlist, subscribe, artist
 from api.routers import misc
 from api.routers import track_queue
+from api.routers import search
+from api.compression import CompressionMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 
 app = FastAPI(lifespan=lifespan)
@@ -21,6 +23,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    thread_threshold=settings.COMPRESSION_THREAD_THRESHOLD,
+)
 
 app.include_router(user_activity.router)
 app.include_router(album.router)
@@ -29,7 +39,9 @@ app.include_router(genre.router)
 app.include_router(user.router)
 app.include_router(playlist.router)
 app.include_router(subscribe.router)
+app.include_router(artist.router)
 app.include_router(misc.router)
 app.include_router(track_queue.router)
+app.include_router(search.router)
 
 Instrumentator().instrument(app).expose(app)
\ No newline at end of file
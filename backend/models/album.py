@@ -38,6 +38,7 @@ class AlbumModel(MusicModelBase):
             postgresql_using="gin",
             postgresql_ops={"name": "gin_trgm_ops"},
         ),
+        Index("idx_albums_artist_id_release_date", artist_id, release_date),
     )
 
     def __repr__(self):
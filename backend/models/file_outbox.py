@@ -0,0 +1,26 @@
+from sqlalchemy import BigInteger, Integer, String, Index, TIMESTAMP, func
+from sqlalchemy.orm import Mapped, mapped_column
+import datetime
+
+from models.base_model import MusicModelBase
+
+
+class FileOutboxModel(MusicModelBase):
+    __tablename__ = "file_outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    artist_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, server_default="0", nullable=False)
+    available_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP, server_default=func.now(), nullable=False
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        TIMESTAMP, server_default=func.now()
+    )
+
+    __table_args__ = (Index("idx_file_outbox_available_at", available_at),)
+
+    def __repr__(self):
+        return f"<FileOutbox(id={self.id}, kind='{self.kind}', entity_id={self.entity_id}, attempts={self.attempts})>"
@@ -35,6 +35,7 @@ class PlaylistModel(MusicModelBase):
             postgresql_using="gin",
             postgresql_ops={"name": "gin_trgm_ops"},
         ),
+        Index("idx_playlists_author_id", author_id),
     )
 
     def __repr__(self):
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from models.base_model import MusicModelBase
@@ -13,8 +13,17 @@ class PlaylistTrackModel(MusicModelBase):
     track_id: Mapped[int] = mapped_column(
         ForeignKey("tracks.id", ondelete="CASCADE"), primary_key=True
     )
+    position: Mapped[str] = mapped_column(String(255, collation="C"), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "idx_playlist_tracks_playlist_id_position",
+            playlist_id,
+            position,
+            unique=True,
+        ),
+        Index("idx_playlist_tracks_track_id", track_id),
+    )
 
     def __repr__(self):
-        return (
-            f"<PlaylistTrack(playlist_id={self.playlist_id}, track_id={self.track_id})>"
-        )
+        return f"<PlaylistTrack(playlist_id={self.playlist_id}, track_id={self.track_id}, position='{self.position}')>"
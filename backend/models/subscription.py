@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, TIMESTAMP, func
+from sqlalchemy import ForeignKey, Index, TIMESTAMP, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 import datetime
 
@@ -31,5 +31,7 @@ class SubscriptionModel(MusicModelBase):
         back_populates="subscribers",
     )
 
+    __table_args__ = (Index("idx_subscriptions_artist_id", artist_id),)
+
     def __repr__(self):
         return f"<Subscription(subscriber_id={self.subscriber_id}, artist_id={self.artist_id})>"
@@ -48,6 +48,9 @@ class TrackModel(MusicModelBase):
             postgresql_using="gin",
             postgresql_ops={"name": "gin_trgm_ops"},
         ),
+        Index("idx_tracks_album_id", album_id),
+        Index("idx_tracks_artist_id_release_date", artist_id, release_date),
+        Index("idx_tracks_genre_id", genre_id),
     )
 
     def __repr__(self):
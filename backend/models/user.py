@@ -21,6 +21,12 @@ class UserModel(MusicModelBase):
     username: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     password: Mapped[str] = mapped_column(String(128), nullable=False)
     role: Mapped[UserRoleEnum] = mapped_column(Enum(UserRoleEnum), nullable=False)
+    followers_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    following_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
     created_at: Mapped[datetime.datetime] = mapped_column(
         TIMESTAMP, server_default=func.now()
     )
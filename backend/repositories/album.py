@@ -1,15 +1,30 @@
-from dto.music import Album, NewAlbum, AlbumID, AlbumSearchParams, UpdateAlbum
+from dto.accounts import ArtistPageParams
+from dto.music import (
+    Album,
+    ArtistAlbum,
+    NewAlbum,
+    AlbumID,
+    AlbumSearchParams,
+    UpdateAlbum,
+    DeletedCatalog,
+)
 from repositories.interfaces import IAlbumRepository
 from repositories.helpers import RepositoryHelpers
 from models.album import AlbumModel
 from models.user import UserModel
+from models.track import TrackModel
 from exceptions.music import AlbumNotFoundException
 from exceptions.accounts import UserNotFoundException
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from pydantic import TypeAdapter
 from sqlalchemy import select, delete, func
 
 
+ALBUMS = TypeAdapter(list[Album])
+ARTIST_ALBUMS = TypeAdapter(list[ArtistAlbum])
+
+
 class SQLAlchemyAlbumRepository(IAlbumRepository, RepositoryHelpers):
     def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
         self.session_factory = session_factory
@@ -35,13 +50,28 @@ class SQLAlchemyAlbumRepository(IAlbumRepository, RepositoryHelpers):
                 raise AlbumNotFoundException(f"Album '{album.id}' not found")
             return Album.model_validate(model, from_attributes=True)
 
+    async def get_artist_albums(self, params: ArtistPageParams) -> list[ArtistAlbum]:
+        async with self.session_factory() as session:
+            query = (
+                select(
+                    *self._columns(AlbumModel, Album),
+                    func.count(TrackModel.id).label("tracks_count"),
+                )
+                .outerjoin(TrackModel, TrackModel.album_id == AlbumModel.id)
+                .where(AlbumModel.artist_id == params.id)
+                .group_by(AlbumModel.id)
+                .order_by(AlbumModel.release_date.desc(), AlbumModel.id.desc())
+                .limit(params.albums_limit)
+            )
+            return await self._get_rows(query, ARTIST_ALBUMS, session)
+
     async def get_albums(self, params: AlbumSearchParams) -> list[Album]:
         async with self.session_factory() as session:
-            query = select(AlbumModel)
+            query = select(*self._columns(AlbumModel, Album))
 
             if params.artist_id:
                 model = await self._get_one_or_none(
-                    select(UserModel).where(UserModel.id == params.artist_id),
+                    select(UserModel.id).where(UserModel.id == params.artist_id),
                     session,
                 )
                 if not model:
@@ -75,8 +105,7 @@ class SQLAlchemyAlbumRepository(IAlbumRepository, RepositoryHelpers):
                 ).order_by(func.similarity(AlbumModel.name, params.name).desc())
 
             query = query.offset(params.skip).limit(params.limit)
-            models = await self._get_all(query, session)
-            return [Album.model_validate(m, from_attributes=True) for m in models]
+            return await self._get_rows(query, ALBUMS, session)
 
     async def update_album(self, new_album: UpdateAlbum) -> Album:
         async with self.session_factory() as session:
@@ -97,9 +126,22 @@ class SQLAlchemyAlbumRepository(IAlbumRepository, RepositoryHelpers):
             updated = await self._update_and_commit(model, new_album, session)
             return Album.model_validate(updated, from_attributes=True)
 
-    async def delete_album(self, album: AlbumID) -> None:
+    async def delete_album(self, album: AlbumID) -> DeletedCatalog:
         async with self.session_factory() as session:
-            query = delete(AlbumModel).where(AlbumModel.id == album.id)
-            deleted = await self._delete_and_commit(query, session)
-            if deleted == 0:
+            albums = (
+                delete(AlbumModel)
+                .where(AlbumModel.id == album.id)
+                .returning(AlbumModel.id)
+                .cte("deleted_albums")
+            )
+            tracks = (
+                delete(TrackModel)
+                .where(TrackModel.album_id == album.id)
+                .returning(TrackModel.id, TrackModel.artist_id)
+                .cte("deleted_tracks")
+            )
+            deleted = await self._delete_catalog(session, tracks=tracks, albums=albums)
+            if not deleted.album_ids:
                 raise AlbumNotFoundException(f"Album '{album.id}' not found")
+            await session.commit()
+            return deleted
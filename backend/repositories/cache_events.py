@@ -0,0 +1,74 @@
+import asyncio
+from typing import Callable
+
+from configs.logger import logger
+from dto.cache import CacheInvalidation
+from repositories.interfaces import ICacheEventsRepository
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select, func
+
+
+CACHE_CHANNEL = "cache_invalidated"
+# postgres rejects NOTIFY payloads of 8000 bytes and more
+MAX_PAYLOAD_SIZE = 7900
+
+
+class SQLAlchemyCacheEventsRepository(ICacheEventsRepository):
+    """cache invalidations sent to every replica over postgres NOTIFY"""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+
+    @staticmethod
+    def _payload(event: CacheInvalidation) -> str:
+        payload = event.model_dump_json()
+        if len(payload.encode("utf-8")) > MAX_PAYLOAD_SIZE:
+            # too many ids for one notification, the whole namespace goes instead
+            payload = event.model_copy(update={"ids": None}).model_dump_json()
+        return payload
+
+    async def publish(self, events: list[CacheInvalidation]) -> None:
+        async with self.session_factory() as session:
+            for event in events:
+                await session.execute(
+                    select(func.pg_notify(CACHE_CHANNEL, self._payload(event)))
+                )
+            await session.commit()
+
+    async def run_listener(
+        self,
+        on_event: Callable[[CacheInvalidation | None], None],
+        retry_delay_sec: float,
+    ) -> None:
+        """
+        calls `on_event` with every invalidation published by any replica, and
+        with None on each (re)connect, as invalidations may have been missed
+        """
+
+        def received(connection, pid, channel, payload: str) -> None:
+            try:
+                on_event(CacheInvalidation.model_validate_json(payload))
+            except ValidationError as e:
+                logger.warning("invalid cache invalidation: %s", e)
+
+        engine = self.session_factory.kw["bind"]
+        closed = asyncio.Event()
+        while True:
+            try:
+                async with engine.connect() as connection:
+                    try:
+                        raw = await connection.get_raw_connection()
+                        listener = raw.driver_connection
+                        listener.add_termination_listener(lambda _: closed.set())
+                        await listener.add_listener(CACHE_CHANNEL, received)
+                        on_event(None)
+                        await closed.wait()
+                        closed.clear()
+                    finally:
+                        # a listening connection is not given back to the pool
+                        await connection.invalidate()
+            except Exception as e:
+                logger.warning("cache invalidation listener failed: %s", e)
+            await asyncio.sleep(retry_delay_sec)
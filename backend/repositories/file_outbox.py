@@ -0,0 +1,154 @@
+from dto.music import CatalogEntry, CatalogKind, FileOutboxBacklog, FileOutboxEntry
+from repositories.interfaces import IFileOutboxRepository
+from repositories.helpers import RepositoryHelpers
+from models.file_outbox import FileOutboxModel
+from models.album import AlbumModel
+from models.playlist import PlaylistModel
+from models.track import TrackModel
+from models.user import UserModel
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import (
+    select,
+    update,
+    delete,
+    insert,
+    func,
+    any_,
+    and_,
+    or_,
+    exists,
+    literal,
+    literal_column,
+    Integer,
+    String,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+
+
+class SQLAlchemyFileOutboxRepository(IFileOutboxRepository, RepositoryHelpers):
+    """
+    files of deleted rows waiting to be removed from storage.
+
+    claiming a row pushes it `retry_delay_sec * 2 ** attempts` (at most
+    `max_retry_delay_sec`) into the future, so a row whose removal failed or whose
+    worker died comes back on its own, and rows out of attempts are left for inspection
+    """
+
+    OWNERS = {
+        CatalogKind.track: TrackModel,
+        CatalogKind.album: AlbumModel,
+        CatalogKind.playlist: PlaylistModel,
+        CatalogKind.user: UserModel,
+    }
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        retry_delay_sec: float,
+        max_retry_delay_sec: float,
+        max_attempts: int,
+    ):
+        self.session_factory = session_factory
+        self.retry_delay_sec = retry_delay_sec
+        self.max_retry_delay_sec = max_retry_delay_sec
+        self.max_attempts = max_attempts
+
+    async def claim(self, limit: int) -> list[FileOutboxEntry]:
+        async with self.session_factory() as session:
+            due = (
+                select(FileOutboxModel.id)
+                .where(
+                    FileOutboxModel.available_at <= func.now(),
+                    FileOutboxModel.attempts < self.max_attempts,
+                )
+                .order_by(FileOutboxModel.available_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            delay = func.least(
+                self.retry_delay_sec * func.power(2, FileOutboxModel.attempts),
+                self.max_retry_delay_sec,
+            )
+            retry_at = func.now() + delay * literal_column("interval '1 second'")
+            models = await self._get_all(
+                update(FileOutboxModel)
+                .where(FileOutboxModel.id.in_(due.scalar_subquery()))
+                .values(
+                    attempts=FileOutboxModel.attempts + 1,
+                    available_at=retry_at,
+                )
+                .returning(FileOutboxModel)
+                .execution_options(synchronize_session=False),
+                session,
+            )
+            await session.commit()
+            return [
+                FileOutboxEntry(
+                    id=model.id,
+                    catalog=CatalogEntry(
+                        kind=model.kind, id=model.entity_id, artist_id=model.artist_id
+                    ),
+                    attempts=model.attempts,
+                )
+                for model in models
+            ]
+
+    async def complete(self, ids: list[int]) -> None:
+        if not ids:
+            return
+        async with self.session_factory() as session:
+            await self._delete_and_commit(
+                delete(FileOutboxModel).where(
+                    FileOutboxModel.id == any_(literal(ids, ARRAY(Integer)))
+                ),
+                session,
+            )
+
+    async def backlog(self) -> FileOutboxBacklog:
+        async with self.session_factory() as session:
+            exhausted = FileOutboxModel.attempts >= self.max_attempts
+            result = await self._execute_query(
+                select(func.count().filter(~exhausted), func.count().filter(exhausted)),
+                session,
+            )
+            pending, exhausted = result.one()
+            return FileOutboxBacklog(pending=pending, exhausted=exhausted)
+
+    async def enqueue_orphans(self, entries: list[CatalogEntry]) -> int:
+        """queues the files of `entries` whose rows no longer exist"""
+        if not entries:
+            return 0
+        async with self.session_factory() as session:
+            candidates = (
+                func.unnest(
+                    literal([e.kind.value for e in entries], ARRAY(String)),
+                    literal([e.id for e in entries], ARRAY(Integer)),
+                    literal([e.artist_id for e in entries], ARRAY(Integer)),
+                )
+                .table_valued("kind", "id", "artist_id")
+                .render_derived()
+            )
+            alive = or_(
+                *(
+                    and_(
+                        candidates.c.kind == kind.value,
+                        exists().where(model.id == candidates.c.id),
+                    )
+                    for kind, model in self.OWNERS.items()
+                )
+            )
+            result = await self._execute_query(
+                insert(FileOutboxModel)
+                .from_select(
+                    ["kind", "entity_id", "artist_id"],
+                    select(
+                        candidates.c.kind, candidates.c.id, candidates.c.artist_id
+                    ).where(~alive),
+                )
+                .returning(FileOutboxModel.id),
+                session,
+            )
+            queued = len(result.all())
+            await session.commit()
+            return queued
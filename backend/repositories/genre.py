@@ -1,16 +1,109 @@
+import asyncio
+from types import MappingProxyType
+
+from configs.logger import logger
 from dto.music import Genre, GenreID, NewGenre, GenreSearchParams, UpdateGenre
 from repositories.interfaces import IGenreRepository
 from repositories.helpers import RepositoryHelpers
 from models.genre import GenreModel
+from models.track import TrackModel
 from exceptions.music import GenreNotFoundException, GenreNameAlreadyExistsException
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from sqlalchemy import select, delete, func
+from pydantic import TypeAdapter
+from sqlalchemy import select, delete, func, update
+
+
+GENRES = TypeAdapter(list[Genre])
+GENRES_CHANNEL = "genres_changed"
+
+
+class _GenreSnapshot:
+    """immutable copy of the genre table, replaced as a whole on every change"""
+
+    def __init__(self, genres: list[Genre]) -> None:
+        self.genres = tuple(sorted(genres, key=lambda g: g.id))
+        self.by_id = MappingProxyType({g.id: g for g in self.genres})
+
+    def search(self, params: GenreSearchParams) -> list[Genre]:
+        found = [
+            g
+            for g in self.genres
+            if (
+                not params.created_search_start
+                or g.created_at >= params.created_search_start
+            )
+            and (
+                not params.created_search_end
+                or g.created_at <= params.created_search_end
+            )
+            and (
+                not params.updated_search_start
+                or g.updated_at >= params.updated_search_start
+            )
+            and (
+                not params.updated_search_end
+                or g.updated_at <= params.updated_search_end
+            )
+        ]
+        return found[params.skip : params.skip + params.limit]
 
 
 class SQLAlchemyGenreRepository(IGenreRepository, RepositoryHelpers):
+    """
+    reads are served from an in-process snapshot of the genres, writes go to
+    postgres and notify `GENRES_CHANNEL` so every replica reloads its snapshot
+    """
+
     def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
         self.session_factory = session_factory
+        self.snapshot = _GenreSnapshot([])
+
+    @staticmethod
+    async def create(
+        session_factory: async_sessionmaker[AsyncSession],
+    ) -> "SQLAlchemyGenreRepository":
+        repository = SQLAlchemyGenreRepository(session_factory)
+        await repository.reload()
+        return repository
+
+    async def reload(self) -> None:
+        async with self.session_factory() as session:
+            query = select(*self._columns(GenreModel, Genre))
+            self.snapshot = _GenreSnapshot(await self._get_rows(query, GENRES, session))
+
+    async def run_listener(self, retry_delay_sec: float) -> None:
+        """reloads the snapshot whenever any replica changes the genres"""
+        engine = self.session_factory.kw["bind"]
+        changed = asyncio.Event()
+        while True:
+            try:
+                async with engine.connect() as connection:
+                    try:
+                        raw = await connection.get_raw_connection()
+                        listener = raw.driver_connection
+                        listener.add_termination_listener(lambda _: changed.set())
+                        await listener.add_listener(
+                            GENRES_CHANNEL, lambda *_: changed.set()
+                        )
+                        # whatever changed while nobody was listening
+                        await self.reload()
+                        while not listener.is_closed():
+                            await changed.wait()
+                            changed.clear()
+                            if not listener.is_closed():
+                                await self.reload()
+                    finally:
+                        # a listening connection is not given back to the pool
+                        await connection.invalidate()
+            except Exception as e:
+                logger.warning("genre snapshot listener failed: %s", e)
+            await asyncio.sleep(retry_delay_sec)
+
+    @staticmethod
+    async def _notify(session: AsyncSession) -> None:
+        """delivered to the listeners when the transaction commits"""
+        await session.execute(select(func.pg_notify(GENRES_CHANNEL, "")))
 
     async def create_genre(self, new_genre: NewGenre) -> Genre:
         async with self.session_factory() as session:
@@ -21,20 +114,24 @@ class SQLAlchemyGenreRepository(IGenreRepository, RepositoryHelpers):
                     f"Genre '{new_genre.name}' already exists"
                 )
             genre_to_add = GenreModel(**new_genre.model_dump())
+            await self._notify(session)
             genre_added = await self._add_and_commit(genre_to_add, session)
-            return Genre.model_validate(genre_added, from_attributes=True)
+            created = Genre.model_validate(genre_added, from_attributes=True)
+        await self.reload()
+        return created
 
     async def get_genre_by_id(self, genre: GenreID) -> Genre:
-        async with self.session_factory() as session:
-            query = select(GenreModel).where(GenreModel.id == genre.id)
-            model = await self._get_one_or_none(query, session)
-            if not model:
-                raise GenreNotFoundException(f"Genre '{genre.id}' not found")
-            return Genre.model_validate(model, from_attributes=True)
+        found = self.snapshot.by_id.get(genre.id)
+        if found is None:
+            raise GenreNotFoundException(f"Genre '{genre.id}' not found")
+        return found
 
     async def get_genres(self, params: GenreSearchParams) -> list[Genre]:
+        if not params.name:
+            return self.snapshot.search(params)
+        # similarity ranking stays with pg_trgm
         async with self.session_factory() as session:
-            query = select(GenreModel)
+            query = select(*self._columns(GenreModel, Genre))
 
             if params.created_search_start:
                 query = query.where(
@@ -55,8 +152,7 @@ class SQLAlchemyGenreRepository(IGenreRepository, RepositoryHelpers):
                 ).order_by(func.similarity(GenreModel.name, params.name).desc())
 
             query = query.offset(params.skip).limit(params.limit)
-            models = await self._get_all(query, session)
-            return [Genre.model_validate(m, from_attributes=True) for m in models]
+            return await self._get_rows(query, GENRES, session)
 
     async def update_genre(self, new_genre: UpdateGenre) -> Genre:
         async with self.session_factory() as session:
@@ -71,12 +167,25 @@ class SQLAlchemyGenreRepository(IGenreRepository, RepositoryHelpers):
             )
             if not model:
                 raise GenreNotFoundException(f"Genre '{new_genre.id}' not found")
-            updated = await self._update_and_commit(model, new_genre, session)
-            return Genre.model_validate(updated, from_attributes=True)
+            await self._notify(session)
+            model = await self._update_and_commit(model, new_genre, session)
+            updated = Genre.model_validate(model, from_attributes=True)
+        await self.reload()
+        return updated
 
     async def delete_genre(self, genre: GenreID) -> None:
         async with self.session_factory() as session:
+            # the foreign key would null genre_id on its own, doing it here also
+            # moves the tracks' updated_at so their etags change
+            await session.execute(
+                update(TrackModel)
+                .where(TrackModel.genre_id == genre.id)
+                .values(genre_id=None)
+                .execution_options(synchronize_session=False)
+            )
+            await self._notify(session)
             query = delete(GenreModel).where(GenreModel.id == genre.id)
             deleted = await self._delete_and_commit(query, session)
-            if deleted == 0:
-                raise GenreNotFoundException(f"Genre '{genre.id}' not found")
+        if deleted == 0:
+            raise GenreNotFoundException(f"Genre '{genre.id}' not found")
+        await self.reload()
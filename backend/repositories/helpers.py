@@ -1,5 +1,15 @@
+from typing import TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import CTE, Integer, cast, insert, literal, null, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from dto.music import CatalogEntry, DeletedCatalog
+from models.file_outbox import FileOutboxModel
+
+
+T = TypeVar("T")
+
 
 class RepositoryHelpers:
     @staticmethod
@@ -17,6 +27,20 @@ class RepositoryHelpers:
         result = await session.execute(query)
         return result.scalars().all()
 
+    @staticmethod
+    def _columns(model, dto: type[BaseModel]) -> list:
+        """columns of `model` backing the fields of `dto`"""
+        return [getattr(model, field) for field in dto.model_fields]
+
+    @staticmethod
+    async def _get_rows(
+        query, adapter: TypeAdapter[list[T]], session: AsyncSession
+    ) -> list[T]:
+        """validates plain result rows into dtos in one go, no orm instances involved"""
+        result = await session.execute(query)
+        keys = result.keys()
+        return adapter.validate_python([dict(zip(keys, row)) for row in result])
+
     @staticmethod
     async def _add_and_commit(instance, session: AsyncSession):
         session.add(instance)
@@ -38,3 +62,37 @@ class RepositoryHelpers:
         result = await session.execute(query)
         await session.commit()
         return result.rowcount
+
+    @staticmethod
+    async def _delete_catalog(
+        session: AsyncSession,
+        tracks: CTE | None = None,
+        albums: CTE | None = None,
+        playlists: CTE | None = None,
+        users: CTE | None = None,
+    ) -> DeletedCatalog:
+        """
+        run `DELETE ... RETURNING` ctes as one statement that also queues the files
+        of what they removed into the file outbox, so the files go if and only if
+        the rows do. `tracks` has to return `id` and `artist_id`, the others just `id`
+        """
+        parts = []
+        if tracks is not None:
+            parts.append(select(literal("track"), tracks.c.id, tracks.c.artist_id))
+        for kind, cte in (("album", albums), ("playlist", playlists), ("user", users)):
+            if cte is not None:
+                parts.append(select(literal(kind), cte.c.id, cast(null(), Integer)))
+
+        query = (
+            insert(FileOutboxModel)
+            .from_select(["kind", "entity_id", "artist_id"], union_all(*parts))
+            .returning(
+                FileOutboxModel.kind,
+                FileOutboxModel.entity_id,
+                FileOutboxModel.artist_id,
+            )
+        )
+        deleted = DeletedCatalog()
+        for kind, id, artist_id in (await session.execute(query)).all():
+            deleted.add(CatalogEntry(kind=kind, id=id, artist_id=artist_id))
+        return deleted
@@ -1,6 +1,11 @@
 from dto.track_queue import (
+    BulkEnqueueParams,
     InQueueID,
+    PlaybackSession,
+    QueueModes,
     QueueParameters,
+    QueueRepeat,
+    QueueShuffle,
     QueueSrcDestIDs,
     TrackInQueueIDs,
     TrackQueue,
@@ -9,6 +14,7 @@ from dto.music import (
     MusicFileStats,
     Track,
     Album,
+    ArtistAlbum,
     NewAlbum,
     NewTrack,
     AlbumID,
@@ -22,12 +28,19 @@ from dto.music import (
     UpdateAlbum,
     UpdateTrack,
     UpdateGenre,
+    DeletedCatalog,
+    CatalogEntry,
+    FileKey,
+    FileOutboxEntry,
+    FileOutboxBacklog,
 )
 from dto.user_activity import (
     UserActivity,
     UserActivityFilter,
     UserActivityPost,
 )
+from dto.search import SuggestEntry, SuggestKind, SuggestParams
+from dto.cache import CacheInvalidation
 from dto.accounts import (
     User,
     UserID,
@@ -38,6 +51,9 @@ from dto.accounts import (
     Playlist,
     PlaylistID,
     PlaylistTrack,
+    PlaylistTrackPosition,
+    PlaylistTracks,
+    PlaylistTrackResult,
     SubscribersCount,
     UserSearchParams,
     PlaylistSearchParams,
@@ -46,9 +62,12 @@ from dto.accounts import (
     Subscribe,
     SubscribeSearchParams,
     PlaylistTrackSearchParams,
+    ArtistPageParams,
 )
 
-from typing import AsyncIterator, Protocol, Optional
+from datetime import datetime
+import asyncio
+from typing import AsyncIterator, Callable, Protocol, Optional
 
 
 class IMusicFileRepository(Protocol):
@@ -75,6 +94,17 @@ class IMusicFileRepository(Protocol):
     async def delete_image(
         self, image: Album | AlbumID | User | UserID | Playlist | PlaylistID
     ) -> None: ...
+    def file_key(self, entry: CatalogEntry) -> FileKey: ...
+    def catalog_entry(self, file: FileKey) -> CatalogEntry | None: ...
+    async def list_files(self, modified_before: datetime) -> AsyncIterator[FileKey]: ...
+    async def delete_files(self, files: list[FileKey]) -> list[FileKey]: ...
+
+
+class IFileOutboxRepository(Protocol):
+    async def claim(self, limit: int) -> list[FileOutboxEntry]: ...
+    async def complete(self, ids: list[int]) -> None: ...
+    async def backlog(self) -> FileOutboxBacklog: ...
+    async def enqueue_orphans(self, entries: list[CatalogEntry]) -> int: ...
 
 
 class IGenreRepository(Protocol):
@@ -89,16 +119,22 @@ class IAlbumRepository(Protocol):
     async def create_album(self, new_album: NewAlbum) -> Album: ...
     async def get_album_by_id(self, album: AlbumID) -> Album: ...
     async def get_albums(self, params: AlbumSearchParams) -> list[Album]: ...
+    async def get_artist_albums(
+        self, params: ArtistPageParams
+    ) -> list[ArtistAlbum]: ...
     async def update_album(self, new_album: UpdateAlbum) -> Album: ...
-    async def delete_album(self, album: AlbumID) -> None: ...
+    async def delete_album(self, album: AlbumID) -> DeletedCatalog: ...
 
 
 class ITrackRepository(Protocol):
     async def create_track(self, new_track: NewTrack) -> Track: ...
     async def get_track_by_id(self, track: TrackID) -> Track: ...
     async def get_tracks(self, params: TrackSearchParams) -> list[Track]: ...
+    async def get_artist_tracks(self, params: ArtistPageParams) -> list[Track]: ...
+    async def get_album_track_ids(self, album_id: AlbumID) -> list[int]: ...
+    async def get_existing_track_ids(self, track_ids: list[int]) -> set[int]: ...
     async def update_track(self, new_track: UpdateTrack) -> Track: ...
-    async def delete_track(self, track: TrackID) -> None: ...
+    async def delete_track(self, track: TrackID) -> DeletedCatalog: ...
 
 
 class IUserActivityRepository(Protocol):
@@ -107,6 +143,18 @@ class IUserActivityRepository(Protocol):
         user_activity: UserActivityPost,
     ) -> UserActivity: ...
 
+    async def add_many(
+        self, user_activities: list[UserActivityPost]
+    ) -> dict[int, str]: ...
+
+    def prepare(self, user_activity: UserActivityPost) -> UserActivity: ...
+
+    async def add_prepared(
+        self, user_activities: list[UserActivity]
+    ) -> dict[int, str]: ...
+
+    async def add_playheads(self, sessions: list[PlaybackSession]) -> None: ...
+
     async def get(
         self,
         id: int,
@@ -128,7 +176,7 @@ class IUserRepository(Protocol):
     async def get_user_by_username(self, user: UserUsername) -> FullUser: ...
     async def get_users(self, params: UserSearchParams) -> list[User]: ...
     async def update_user(self, new_user: UpdateUserRole) -> User: ...
-    async def delete_user(self, user: UserID) -> None: ...
+    async def delete_user(self, user: UserID) -> DeletedCatalog: ...
 
     async def subscribe_to(self, subscribe: Subscribe) -> None: ...
     async def unsubscribe_from(self, subscribe: Subscribe) -> None: ...
@@ -142,24 +190,66 @@ class IPlaylistRepository(Protocol):
     async def get_playlist_by_id(self, playlist: PlaylistID) -> Playlist: ...
     async def get_playlists(self, params: PlaylistSearchParams) -> list[Playlist]: ...
     async def update_playlist(self, playlist: UpdatePlaylist) -> Playlist: ...
-    async def delete_playlist(self, playlist: PlaylistID) -> None: ...
+    async def delete_playlist(self, playlist: PlaylistID) -> DeletedCatalog: ...
 
     async def add_track_to_playlist(
-        self, playlist_track: PlaylistTrack
+        self, playlist_track: PlaylistTrackPosition
     ) -> PlaylistTrack: ...
+    async def move_track_in_playlist(
+        self, playlist_track: PlaylistTrackPosition
+    ) -> PlaylistTrack: ...
+    async def get_playlist_track_ids(self, playlist_id: PlaylistID) -> list[int]: ...
     async def get_tracks_by_playlist(
         self, params: PlaylistTrackSearchParams
     ) -> list[Track]: ...
     async def remove_track_from_playlist(
         self, playlist_track: PlaylistTrack
     ) -> None: ...
+    async def add_tracks_to_playlist(
+        self, playlist_tracks: PlaylistTracks
+    ) -> list[PlaylistTrackResult]: ...
+    async def remove_tracks_from_playlist(
+        self, playlist_tracks: PlaylistTracks
+    ) -> list[PlaylistTrackResult]: ...
 
 
 class ITrackQueueRepository(Protocol):
     async def push_left(self, user_id: int, id: TrackID) -> None: ...
     async def push_right(self, user_id: int, id: TrackID) -> None: ...
+    async def push_many(
+        self, user_id: int, track_ids: list[int], params: BulkEnqueueParams
+    ) -> None: ...
     async def list(self, user_id: int, params: QueueParameters) -> TrackQueue: ...
     async def delete(self, user_id: int) -> None: ...
     async def insert(self, user_id: int, ids: TrackInQueueIDs) -> None: ...
     async def move(self, user_id: int, ids: QueueSrcDestIDs) -> None: ...
     async def remove(self, user_id: int, id: InQueueID) -> None: ...
+    async def shuffle(self, user_id: int, params: QueueShuffle) -> None: ...
+    async def unshuffle(self, user_id: int) -> None: ...
+    async def set_repeat(self, user_id: int, params: QueueRepeat) -> None: ...
+    async def get_modes(self, user_id: int) -> QueueModes: ...
+    async def next(self, user_id: int) -> TrackID: ...
+    def subscribe(self, user_id: int) -> asyncio.Queue[str]: ...
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue[str]) -> None: ...
+
+
+class IPlaybackSessionRepository(Protocol):
+    async def save_many(self, sessions: list[PlaybackSession]) -> None: ...
+    async def get(self, user_id: int) -> PlaybackSession: ...
+    async def take_changed(self, limit: int) -> list[PlaybackSession]: ...
+    async def return_changed(self, sessions: list[PlaybackSession]) -> None: ...
+
+
+class ISuggestRepository(Protocol):
+    async def add(self, entry: SuggestEntry) -> None: ...
+    async def remove(self, kind: SuggestKind, id: int) -> None: ...
+    async def suggest(self, params: SuggestParams) -> list[SuggestEntry]: ...
+
+
+class ICacheEventsRepository(Protocol):
+    async def publish(self, events: list[CacheInvalidation]) -> None: ...
+    async def run_listener(
+        self,
+        on_event: Callable[[CacheInvalidation | None], None],
+        retry_delay_sec: float,
+    ) -> None: ...
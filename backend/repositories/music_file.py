@@ -1,10 +1,22 @@
 from .interfaces import IMusicFileRepository
-from dto.music import MusicFileStats, Track, Album, AlbumID
+from dto.music import (
+    MusicFileStats,
+    Track,
+    Album,
+    AlbumID,
+    CatalogEntry,
+    CatalogKind,
+    DeletedTrack,
+    FileKey,
+    FileKind,
+)
 from dto.accounts import User, UserID, Playlist, PlaylistID
 from exceptions.music import MusicFileNotFoundException, ImageFileNotFoundException
 
+from datetime import datetime
 from typing import AsyncIterator
 from miniopy_async import Minio, S3Error
+from miniopy_async.deleteobjects import DeleteObject
 from io import BytesIO
 
 
@@ -24,7 +36,7 @@ class MinioMusicFileRepository(IMusicFileRepository):
         self.image_bucket = image_bucket
 
     @staticmethod
-    def _get_track_path(track: Track):
+    def _get_track_path(track: Track | DeletedTrack):
         return f"{track.artist_id}/{track.id}"
 
     @staticmethod
@@ -162,3 +174,58 @@ class MinioMusicFileRepository(IMusicFileRepository):
                     f"Image file '{image.id}' not found for delete"
                 )
             raise
+
+    def file_key(self, entry: CatalogEntry) -> FileKey:
+        if entry.kind == CatalogKind.track:
+            track = DeletedTrack(id=entry.id, artist_id=entry.artist_id)
+            return FileKey(kind=FileKind.track, name=self._get_track_path(track))
+        if entry.kind == CatalogKind.album:
+            name = self._get_album_path(AlbumID(id=entry.id))
+        elif entry.kind == CatalogKind.user:
+            name = self._get_artist_path(UserID(id=entry.id))
+        else:
+            name = self._get_playlist_path(PlaylistID(id=entry.id))
+        return FileKey(kind=FileKind.image, name=name)
+
+    def catalog_entry(self, file: FileKey) -> CatalogEntry | None:
+        """the row owning a file, None for names not laid out by this repository"""
+        prefix, _, id = file.name.partition("/")
+        if not id.isdigit():
+            return None
+        if file.kind == FileKind.track:
+            if not prefix.isdigit():
+                return None
+            return CatalogEntry(
+                kind=CatalogKind.track, id=int(id), artist_id=int(prefix)
+            )
+        kinds = {
+            "albums": CatalogKind.album,
+            "user": CatalogKind.user,
+            "playlist": CatalogKind.playlist,
+        }
+        if prefix not in kinds:
+            return None
+        return CatalogEntry(kind=kinds[prefix], id=int(id))
+
+    async def list_files(self, modified_before: datetime) -> AsyncIterator[FileKey]:
+        buckets = {FileKind.track: self.track_bucket, FileKind.image: self.image_bucket}
+        for kind, bucket in buckets.items():
+            async for obj in self.minio_client.list_objects(bucket, recursive=True):
+                if obj.last_modified and obj.last_modified < modified_before:
+                    yield FileKey(kind=kind, name=obj.object_name)
+
+    async def delete_files(self, files: list[FileKey]) -> list[FileKey]:
+        """removes files with bulk requests, returns the ones that failed"""
+        failed = []
+        buckets = {FileKind.track: self.track_bucket, FileKind.image: self.image_bucket}
+        for kind, bucket in buckets.items():
+            names = [f.name for f in files if f.kind == kind]
+            if not names:
+                continue
+            errors = self.minio_client.remove_objects(
+                bucket, [DeleteObject(name) for name in names]
+            )
+            async for error in errors:
+                if error.code != "NoSuchKey":
+                    failed.append(FileKey(kind=kind, name=error.name))
+        return failed
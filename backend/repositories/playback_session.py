@@ -0,0 +1,81 @@
+import datetime
+
+import redis.asyncio.client
+from dto.track_queue import PlaybackSession
+from exceptions.track_queue import PlaybackSessionNotFoundException
+from repositories.interfaces import IPlaybackSessionRepository
+
+
+# users whose session changed since the last compaction
+CHANGED_KEY = "queue:sessions:changed"
+
+
+class RedisPlaybackSessionRepository(IPlaybackSessionRepository):
+    def __init__(self, client: redis.asyncio.client.Redis, ttl_sec: int) -> None:
+        self.client = client
+        self.ttl_sec = ttl_sec
+
+    @staticmethod
+    def _session_key(user_id: int) -> str:
+        return f"queue:{user_id}:session"
+
+    @staticmethod
+    def _from_hash(user_id: int, fields: dict[str, str]) -> PlaybackSession:
+        return PlaybackSession(
+            user_id=user_id,
+            track_id=fields["track_id"],
+            position_ms=fields["position_ms"],
+            queue_index=fields.get("queue_index") or None,
+            updated_at=datetime.datetime.fromtimestamp(
+                int(fields["updated_at"]) / 1000
+            ),
+        )
+
+    async def save_many(self, sessions: list[PlaybackSession]) -> None:
+        if not sessions:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for session in sessions:
+                key = self._session_key(session.user_id)
+                pipe.hset(
+                    key,
+                    mapping={
+                        "track_id": session.track_id,
+                        "position_ms": session.position_ms,
+                        "queue_index": ""
+                        if session.queue_index is None
+                        else session.queue_index,
+                        "updated_at": int(session.updated_at.timestamp() * 1000),
+                    },
+                )
+                pipe.expire(key, self.ttl_sec)
+            pipe.sadd(CHANGED_KEY, *(session.user_id for session in sessions))
+            await pipe.execute()
+
+    async def get(self, user_id: int) -> PlaybackSession:
+        fields = await self.client.hgetall(self._session_key(user_id))
+        if not fields:
+            raise PlaybackSessionNotFoundException
+        return self._from_hash(user_id, fields)
+
+    async def take_changed(self, limit: int) -> list[PlaybackSession]:
+        # popped, so every change is compacted by one replica only
+        user_ids = [int(id) for id in await self.client.spop(CHANGED_KEY, limit)]
+        if not user_ids:
+            return []
+        async with self.client.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.hgetall(self._session_key(user_id))
+            found = await pipe.execute()
+        return [
+            self._from_hash(user_id, fields)
+            for user_id, fields in zip(user_ids, found)
+            if fields
+        ]
+
+    async def return_changed(self, sessions: list[PlaybackSession]) -> None:
+        """marks taken sessions as changed again, when they were not compacted"""
+        if sessions:
+            await self.client.sadd(
+                CHANGED_KEY, *(session.user_id for session in sessions)
+            )
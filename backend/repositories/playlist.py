@@ -4,12 +4,17 @@ from dto.accounts import (
     NewPlaylist,
     PlaylistSearchParams,
     PlaylistTrack,
+    PlaylistTrackPosition,
+    PlaylistTracks,
+    PlaylistTrackResult,
+    PlaylistTrackStatus,
     UpdatePlaylist,
     PlaylistTrackSearchParams,
 )
-from dto.music import Track
+from dto.music import Track, DeletedCatalog
 from repositories.interfaces import IPlaylistRepository
 from repositories.helpers import RepositoryHelpers
+from repositories.ranking import key_between, keys_after
 from models.playlist import PlaylistModel
 from models.user import UserModel
 from models.playlist_track import PlaylistTrackModel
@@ -23,7 +28,16 @@ from exceptions.accounts import (
 )
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from sqlalchemy import select, delete, func
+from sqlalchemy import select, delete, update, func, any_, literal, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from pydantic import TypeAdapter
+
+
+PLAYLISTS = TypeAdapter(list[Playlist])
+TRACKS = TypeAdapter(list[Track])
+# positions are stored in 255 chars, a playlist is renumbered once a new one
+# grows past this length, so repeated inserts at one spot never overflow it
+REBALANCE_POSITION_LENGTH = 200
 
 
 class SQLAlchemyPlaylistRepository(IPlaylistRepository, RepositoryHelpers):
@@ -54,11 +68,12 @@ class SQLAlchemyPlaylistRepository(IPlaylistRepository, RepositoryHelpers):
 
     async def get_playlists(self, params: PlaylistSearchParams) -> list[Playlist]:
         async with self.session_factory() as session:
-            query = select(PlaylistModel)
+            query = select(*self._columns(PlaylistModel, Playlist))
 
             if params.author_id:
                 model = await self._get_one_or_none(
-                    select(UserModel).where(UserModel.id == params.author_id), session
+                    select(UserModel.id).where(UserModel.id == params.author_id),
+                    session,
                 )
                 if not model:
                     raise UserNotFoundException(f"User '{params.author_id}' not found")
@@ -87,8 +102,7 @@ class SQLAlchemyPlaylistRepository(IPlaylistRepository, RepositoryHelpers):
                 )
 
             query = query.offset(params.skip).limit(params.limit)
-            models = await self._get_all(query, session)
-            return [Playlist.model_validate(m, from_attributes=True) for m in models]
+            return await self._get_rows(query, PLAYLISTS, session)
 
     async def update_playlist(self, playlist: UpdatePlaylist) -> Playlist:
         async with self.session_factory() as session:
@@ -108,15 +122,109 @@ class SQLAlchemyPlaylistRepository(IPlaylistRepository, RepositoryHelpers):
             updated = await self._update_and_commit(existing, playlist, session)
             return Playlist.model_validate(updated, from_attributes=True)
 
-    async def delete_playlist(self, playlist: PlaylistID) -> None:
+    async def delete_playlist(self, playlist: PlaylistID) -> DeletedCatalog:
         async with self.session_factory() as session:
-            query = delete(PlaylistModel).where(PlaylistModel.id == playlist.id)
-            deleted = await self._delete_and_commit(query, session)
-            if deleted == 0:
+            playlists = (
+                delete(PlaylistModel)
+                .where(PlaylistModel.id == playlist.id)
+                .returning(PlaylistModel.id)
+                .cte("deleted_playlists")
+            )
+            deleted = await self._delete_catalog(session, playlists=playlists)
+            if not deleted.playlist_ids:
                 raise PlaylistNotFoundException(f"Playlist '{playlist.id}' not found")
+            await session.commit()
+            return deleted
+
+    async def _lock_playlist(self, playlist_id: int, session: AsyncSession) -> None:
+        """row lock serializing position changes within one playlist"""
+        model = await self._get_one_or_none(
+            select(PlaylistModel.id)
+            .where(PlaylistModel.id == playlist_id)
+            .with_for_update(),
+            session,
+        )
+        if not model:
+            raise PlaylistNotFoundException(f"Playlist '{playlist_id}' not found")
+
+    async def _rebalance(self, playlist_id: int, session: AsyncSession) -> None:
+        """renumbers the playlist's positions with the shortest ranks, order kept"""
+        track_ids = await self._get_all(
+            select(PlaylistTrackModel.track_id)
+            .where(PlaylistTrackModel.playlist_id == playlist_id)
+            .order_by(PlaylistTrackModel.position),
+            session,
+        )
+        in_playlist = PlaylistTrackModel.playlist_id == playlist_id
+        # moved out of the way first, "~" sorts after every rank, so the
+        # unique index never sees two equal positions
+        await self._execute_query(
+            update(PlaylistTrackModel)
+            .where(in_playlist)
+            .values(position=func.concat("~", PlaylistTrackModel.track_id))
+            .execution_options(synchronize_session=False),
+            session,
+        )
+        renumbered = (
+            func.unnest(
+                literal(list(track_ids), ARRAY(Integer)),
+                literal(keys_after(None, len(track_ids)), ARRAY(String)),
+            )
+            .table_valued("id", "position")
+            .render_derived()
+        )
+        await self._execute_query(
+            update(PlaylistTrackModel)
+            .where(in_playlist, PlaylistTrackModel.track_id == renumbered.c.id)
+            .values(position=renumbered.c.position)
+            .execution_options(synchronize_session=False),
+            session,
+        )
+
+    async def _position_before(
+        self, playlist_track: PlaylistTrackPosition, session: AsyncSession
+    ) -> str:
+        """rank placing the track right before `before_id`, or last if it is None"""
+        position = await self._find_position_before(playlist_track, session)
+        if len(position) <= REBALANCE_POSITION_LENGTH:
+            return position
+        await self._rebalance(playlist_track.playlist_id, session)
+        return await self._find_position_before(playlist_track, session)
+
+    async def _find_position_before(
+        self, playlist_track: PlaylistTrackPosition, session: AsyncSession
+    ) -> str:
+        others = select(PlaylistTrackModel.position).where(
+            PlaylistTrackModel.playlist_id == playlist_track.playlist_id,
+            PlaylistTrackModel.track_id != playlist_track.track_id,
+        )
+        if playlist_track.before_id is None:
+            after = await self._get_one_or_none(
+                others.order_by(PlaylistTrackModel.position.desc()).limit(1), session
+            )
+            return key_between(after, None)
+
+        before = await self._get_one_or_none(
+            select(PlaylistTrackModel.position).where(
+                PlaylistTrackModel.playlist_id == playlist_track.playlist_id,
+                PlaylistTrackModel.track_id == playlist_track.before_id,
+            ),
+            session,
+        )
+        if before is None:
+            raise PlaylistTrackNotFoundException(
+                f"Playlist '{playlist_track.playlist_id}' don't have track '{playlist_track.before_id}'"
+            )
+        after = await self._get_one_or_none(
+            others.where(PlaylistTrackModel.position < before)
+            .order_by(PlaylistTrackModel.position.desc())
+            .limit(1),
+            session,
+        )
+        return key_between(after, before)
 
     async def add_track_to_playlist(
-        self, playlist_track: PlaylistTrack
+        self, playlist_track: PlaylistTrackPosition
     ) -> PlaylistTrack:
         async with self.session_factory() as session:
             model = await self._get_one_or_none(
@@ -130,16 +238,7 @@ class SQLAlchemyPlaylistRepository(IPlaylistRepository, RepositoryHelpers):
                 raise PlaylistAlreadyExist(
                     f"Playlist '{playlist_track.playlist_id}' already has track '{playlist_track.track_id}'"
                 )
-            model = await self._get_one_or_none(
-                select(PlaylistModel).where(
-                    PlaylistModel.id == playlist_track.playlist_id
-                ),
-                session,
-            )
-            if not model:
-                raise PlaylistNotFoundException(
-                    f"Playlist '{playlist_track.playlist_id}' not found"
-                )
+            await self._lock_playlist(playlist_track.playlist_id, session)
             model = await self._get_one_or_none(
                 select(TrackModel).where(TrackModel.id == playlist_track.track_id),
                 session,
@@ -149,10 +248,55 @@ class SQLAlchemyPlaylistRepository(IPlaylistRepository, RepositoryHelpers):
                     f"Track '{playlist_track.track_id}' not found"
                 )
 
-            to_add = PlaylistTrackModel(**playlist_track.model_dump())
+            to_add = PlaylistTrackModel(
+                playlist_id=playlist_track.playlist_id,
+                track_id=playlist_track.track_id,
+                position=await self._position_before(playlist_track, session),
+            )
             added = await self._add_and_commit(to_add, session)
             return PlaylistTrack.model_validate(added, from_attributes=True)
 
+    async def move_track_in_playlist(
+        self, playlist_track: PlaylistTrackPosition
+    ) -> PlaylistTrack:
+        async with self.session_factory() as session:
+            await self._lock_playlist(playlist_track.playlist_id, session)
+            model = await self._get_one_or_none(
+                select(PlaylistTrackModel).where(
+                    PlaylistTrackModel.playlist_id == playlist_track.playlist_id,
+                    PlaylistTrackModel.track_id == playlist_track.track_id,
+                ),
+                session,
+            )
+            if not model:
+                raise PlaylistTrackNotFoundException(
+                    f"Playlist '{playlist_track.playlist_id}' don't have track '{playlist_track.track_id}'"
+                )
+            model.position = await self._position_before(playlist_track, session)
+            await session.commit()
+            return PlaylistTrack(
+                playlist_id=playlist_track.playlist_id,
+                track_id=playlist_track.track_id,
+            )
+
+    async def get_playlist_track_ids(self, playlist_id: PlaylistID) -> list[int]:
+        async with self.session_factory() as session:
+            # the outer join tells a missing playlist from an empty one in one query
+            result = await self._execute_query(
+                select(PlaylistModel.id, PlaylistTrackModel.track_id)
+                .outerjoin(
+                    PlaylistTrackModel,
+                    PlaylistTrackModel.playlist_id == PlaylistModel.id,
+                )
+                .where(PlaylistModel.id == playlist_id.id)
+                .order_by(PlaylistTrackModel.position),
+                session,
+            )
+            rows = result.all()
+        if not rows:
+            raise PlaylistNotFoundException(f"Playlist '{playlist_id.id}' not found")
+        return [track_id for _, track_id in rows if track_id is not None]
+
     async def get_tracks_by_playlist(
         self, params: PlaylistTrackSearchParams
     ) -> list[Track]:
@@ -165,14 +309,14 @@ class SQLAlchemyPlaylistRepository(IPlaylistRepository, RepositoryHelpers):
                 raise PlaylistNotFoundException(f"Playlist '{params.id}' not found")
 
             query = (
-                select(TrackModel)
+                select(*self._columns(TrackModel, Track))
                 .join(PlaylistTrackModel, PlaylistTrackModel.track_id == TrackModel.id)
                 .where(PlaylistTrackModel.playlist_id == params.id)
+                .order_by(PlaylistTrackModel.position)
                 .offset(params.skip)
                 .limit(params.limit)
             )
-            track_models = await self._get_all(query, session)
-            return [Track.model_validate(m, from_attributes=True) for m in track_models]
+            return await self._get_rows(query, TRACKS, session)
 
     async def remove_track_from_playlist(self, playlist_track: PlaylistTrack) -> None:
         async with self.session_factory() as session:
@@ -204,3 +348,110 @@ class SQLAlchemyPlaylistRepository(IPlaylistRepository, RepositoryHelpers):
                 raise PlaylistTrackNotFoundException(
                     f"Playlist '{playlist_track.playlist_id}' don't have track '{playlist_track.track_id}'"
                 )
+
+    async def add_tracks_to_playlist(
+        self, playlist_tracks: PlaylistTracks
+    ) -> list[PlaylistTrackResult]:
+        track_ids = list(dict.fromkeys(playlist_tracks.track_ids))
+        async with self.session_factory() as session:
+            await self._lock_playlist(playlist_tracks.playlist_id, session)
+            last_position = select(func.max(PlaylistTrackModel.position)).where(
+                PlaylistTrackModel.playlist_id == playlist_tracks.playlist_id
+            )
+            positions = keys_after(
+                await self._get_one_or_none(last_position, session), len(track_ids)
+            )
+            if positions and len(positions[-1]) > REBALANCE_POSITION_LENGTH:
+                await self._rebalance(playlist_tracks.playlist_id, session)
+                positions = keys_after(
+                    await self._get_one_or_none(last_position, session),
+                    len(track_ids),
+                )
+
+            requested = (
+                func.unnest(
+                    literal(track_ids, ARRAY(Integer)),
+                    literal(positions, ARRAY(String)),
+                )
+                .table_valued("id", "position")
+                .render_derived()
+            )
+            found = (
+                select(requested.c.id, requested.c.position)
+                .join(TrackModel, TrackModel.id == requested.c.id)
+                .cte("found")
+            )
+            added = (
+                insert(PlaylistTrackModel)
+                .from_select(
+                    ["playlist_id", "track_id", "position"],
+                    select(
+                        literal(playlist_tracks.playlist_id),
+                        found.c.id,
+                        found.c.position,
+                    ),
+                )
+                .on_conflict_do_nothing()
+                .returning(PlaylistTrackModel.track_id)
+                .cte("added")
+            )
+            result = await self._execute_query(
+                select(found.c.id, added.c.track_id).outerjoin(
+                    added, added.c.track_id == found.c.id
+                ),
+                session,
+            )
+            rows = result.all()
+            await session.commit()
+
+            statuses = {
+                track_id: PlaylistTrackStatus.added
+                if added_id is not None
+                else PlaylistTrackStatus.already_exists
+                for track_id, added_id in rows
+            }
+            return [
+                PlaylistTrackResult(
+                    track_id=track_id,
+                    status=statuses.get(track_id, PlaylistTrackStatus.track_not_found),
+                )
+                for track_id in track_ids
+            ]
+
+    async def remove_tracks_from_playlist(
+        self, playlist_tracks: PlaylistTracks
+    ) -> list[PlaylistTrackResult]:
+        async with self.session_factory() as session:
+            model = await self._get_one_or_none(
+                select(PlaylistModel.id).where(
+                    PlaylistModel.id == playlist_tracks.playlist_id
+                ),
+                session,
+            )
+            if not model:
+                raise PlaylistNotFoundException(
+                    f"Playlist '{playlist_tracks.playlist_id}' not found"
+                )
+
+            result = await self._execute_query(
+                delete(PlaylistTrackModel)
+                .where(
+                    PlaylistTrackModel.playlist_id == playlist_tracks.playlist_id,
+                    PlaylistTrackModel.track_id
+                    == any_(literal(playlist_tracks.track_ids, ARRAY(Integer))),
+                )
+                .returning(PlaylistTrackModel.track_id),
+                session,
+            )
+            removed = set(result.scalars().all())
+            await session.commit()
+
+            return [
+                PlaylistTrackResult(
+                    track_id=track_id,
+                    status=PlaylistTrackStatus.removed
+                    if track_id in removed
+                    else PlaylistTrackStatus.not_in_playlist,
+                )
+                for track_id in dict.fromkeys(playlist_tracks.track_ids)
+            ]
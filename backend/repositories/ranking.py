@@ -0,0 +1,145 @@
+"""
+lexicographic fractional ranks for ordered collections.
+
+a rank is an "integer" part (a head char encoding its length plus base62
+digits) followed by an optional fraction without trailing zeros. ranks compare
+bytewise, so a column using them has to be collated as "C"
+"""
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+INTEGER_ZERO = "a" + DIGITS[0]
+SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid rank head '{head}'")
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid rank '{key}'")
+    return key[:length]
+
+
+def _validate(key: str) -> None:
+    if key == SMALLEST_INTEGER:
+        raise ValueError(f"Invalid rank '{key}'")
+    if key[len(_integer_part(key)) :].endswith(DIGITS[0]):
+        raise ValueError(f"Invalid rank '{key}'")
+
+
+def _midpoint(a: str, b: str | None) -> str:
+    """fraction strictly between `a` and `b`, `b` is None for the upper bound"""
+    if b is not None:
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b) // 2]
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _increment_integer(x: str) -> str | None:
+    head, digits = x[0], list(x[1:])
+    for i in reversed(range(len(digits))):
+        d = DIGITS.index(digits[i]) + 1
+        if d < len(DIGITS):
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[0]
+
+    if head == "Z":
+        return INTEGER_ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(x: str) -> str | None:
+    head, digits = x[0], list(x[1:])
+    for i in reversed(range(len(digits))):
+        d = DIGITS.index(digits[i]) - 1
+        if d >= 0:
+            digits[i] = DIGITS[d]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: str | None, b: str | None) -> str:
+    """rank strictly between `a` and `b`, None meaning the open end"""
+    if a is not None:
+        _validate(a)
+    if b is not None:
+        _validate(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"Rank '{a}' is not less than '{b}'")
+
+    if a is None:
+        if b is None:
+            return INTEGER_ZERO
+        int_b = _integer_part(b)
+        frac_b = b[len(int_b) :]
+        if int_b == SMALLEST_INTEGER:
+            return int_b + _midpoint("", frac_b)
+        if frac_b:
+            return int_b
+        decremented = _decrement_integer(int_b)
+        if decremented is None:
+            raise ValueError("Cannot decrement rank any further")
+        return decremented
+
+    int_a = _integer_part(a)
+    frac_a = a[len(int_a) :]
+    if b is None:
+        incremented = _increment_integer(int_a)
+        if incremented is None:
+            return int_a + _midpoint(frac_a, None)
+        return incremented
+
+    int_b = _integer_part(b)
+    frac_b = b[len(int_b) :]
+    if int_a == int_b:
+        return int_a + _midpoint(frac_a, frac_b)
+    incremented = _increment_integer(int_a)
+    if incremented is None:
+        raise ValueError("Cannot increment rank any further")
+    if incremented < b:
+        return incremented
+    return int_a + _midpoint(frac_a, None)
+
+
+def keys_after(a: str | None, n: int) -> list[str]:
+    """`n` ascending ranks appended after `a`"""
+    keys = []
+    for _ in range(n):
+        a = key_between(a, None)
+        keys.append(a)
+    return keys
@@ -0,0 +1,166 @@
+import asyncio
+import heapq
+from bisect import bisect_left, insort
+from typing import Callable, Iterator
+
+from configs.logger import logger
+from dto.search import SuggestEntry, SuggestKind, SuggestParams
+from repositories.interfaces import ISuggestRepository
+from models.track import TrackModel
+from models.album import AlbumModel
+from models.user import UserModel
+from models.genre import GenreModel
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select
+
+
+_SOURCES = (
+    (SuggestKind.track, TrackModel),
+    (SuggestKind.album, AlbumModel),
+    (SuggestKind.artist, UserModel),
+    (SuggestKind.genre, GenreModel),
+)
+
+
+class _PrefixIndex:
+    """
+    sorted arrays of (normalized key, kind, id), one per kind, searched with
+    bisect. every word start of a name is a key so "plan" finds "god's plan"
+    """
+
+    def __init__(self) -> None:
+        self.keys: dict[str, list[tuple[str, str, int]]] = {
+            kind.value: [] for kind, _ in _SOURCES
+        }
+        self.names: dict[tuple[str, int], str] = {}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split()).casefold()
+
+    @classmethod
+    def word_starts(cls, name: str) -> set[str]:
+        words = cls.normalize(name).split(" ")
+        return {" ".join(words[i:]) for i in range(len(words)) if words[i]}
+
+    @classmethod
+    def build(cls, entries: list[SuggestEntry]) -> "_PrefixIndex":
+        index = cls()
+        for entry in entries:
+            index.names[(entry.kind.value, entry.id)] = entry.name
+            for key in cls.word_starts(entry.name):
+                index.keys[entry.kind.value].append((key, entry.kind.value, entry.id))
+        for keys in index.keys.values():
+            keys.sort()
+        return index
+
+    def add(self, entry: SuggestEntry) -> None:
+        self.remove(entry.kind, entry.id)
+        self.names[(entry.kind.value, entry.id)] = entry.name
+        for key in self.word_starts(entry.name):
+            insort(self.keys[entry.kind.value], (key, entry.kind.value, entry.id))
+
+    def remove(self, kind: SuggestKind, id: int) -> None:
+        name = self.names.pop((kind.value, id), None)
+        if name is None:
+            return
+        keys = self.keys[kind.value]
+        for key in self.word_starts(name):
+            pos = bisect_left(keys, (key, kind.value, id))
+            if pos < len(keys) and keys[pos] == (key, kind.value, id):
+                del keys[pos]
+
+    def _matches(
+        self, keys: list[tuple[str, str, int]], prefix: str
+    ) -> Iterator[tuple[str, str, int]]:
+        pos = bisect_left(keys, (prefix,))
+        while pos < len(keys) and keys[pos][0].startswith(prefix):
+            yield keys[pos]
+            pos += 1
+
+    def search(self, params: SuggestParams) -> list[SuggestEntry]:
+        prefix = self.normalize(params.prefix)
+        if params.kind:
+            matches = self._matches(self.keys[params.kind.value], prefix)
+        else:
+            matches = heapq.merge(
+                *(self._matches(keys, prefix) for keys in self.keys.values())
+            )
+        seen: set[tuple[str, int]] = set()
+        found: list[SuggestEntry] = []
+        for _, entry_kind, entry_id in matches:
+            if len(found) >= params.limit:
+                break
+            if (entry_kind, entry_id) in seen:
+                continue
+            seen.add((entry_kind, entry_id))
+            found.append(
+                SuggestEntry(
+                    kind=entry_kind,
+                    id=entry_id,
+                    name=self.names[(entry_kind, entry_id)],
+                )
+            )
+        return found
+
+
+class InMemorySuggestRepository(ISuggestRepository):
+    """
+    the index lives in each backend process. `add` and `remove` only change the
+    index of the replica handling the request, the others pick the change up
+    with their next reload
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+        self.index = _PrefixIndex()
+        # changes made while a reload reads the tables, replayed onto its index
+        self._changes: list[Callable[[_PrefixIndex], None]] | None = None
+
+    @staticmethod
+    async def create(
+        session_factory: async_sessionmaker[AsyncSession],
+    ) -> "InMemorySuggestRepository":
+        repository = InMemorySuggestRepository(session_factory)
+        await repository.reload()
+        return repository
+
+    async def reload(self) -> None:
+        entries = []
+        self._changes = []
+        try:
+            async with self.session_factory() as session:
+                for kind, model in _SOURCES:
+                    result = await session.execute(select(model.id, model.name))
+                    entries.extend(
+                        SuggestEntry(kind=kind, id=id, name=name) for id, name in result
+                    )
+            index = _PrefixIndex.build(entries)
+            for change in self._changes:
+                change(index)
+            self.index = index
+        finally:
+            self._changes = None
+
+    def _apply(self, change: Callable[[_PrefixIndex], None]) -> None:
+        change(self.index)
+        if self._changes is not None:
+            self._changes.append(change)
+
+    async def run_reload(self, interval_sec: float) -> None:
+        while True:
+            await asyncio.sleep(interval_sec)
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.warning("failed to reload suggest index: %s", e)
+
+    async def add(self, entry: SuggestEntry) -> None:
+        self._apply(lambda index: index.add(entry))
+
+    async def remove(self, kind: SuggestKind, id: int) -> None:
+        self._apply(lambda index: index.remove(kind, id))
+
+    async def suggest(self, params: SuggestParams) -> list[SuggestEntry]:
+        return self.index.search(params)
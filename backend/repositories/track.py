@@ -1,24 +1,43 @@
-from dto.music import Track, NewTrack, TrackID, TrackSearchParams, UpdateTrack
-from repositories.interfaces import ITrackRepository
+from dto.accounts import ArtistPageParams
+from dto.music import (
+    Track,
+    NewTrack,
+    AlbumID,
+    TrackID,
+    GenreID,
+    TrackSearchParams,
+    UpdateTrack,
+    DeletedCatalog,
+)
+from repositories.interfaces import ITrackRepository, IGenreRepository
 from repositories.helpers import RepositoryHelpers
 from models.track import TrackModel
 from models.album import AlbumModel
-from models.genre import GenreModel
 from models.user import UserModel
 from exceptions.music import (
     AlbumNotFoundException,
     TrackNotFoundException,
-    GenreNotFoundException,
 )
 from exceptions.accounts import UserNotFoundException
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from sqlalchemy import select, delete, func
+from pydantic import TypeAdapter
+from sqlalchemy import select, delete, func, exists, any_, literal, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+
+
+TRACKS = TypeAdapter(list[Track])
 
 
 class SQLAlchemyTrackRepository(ITrackRepository, RepositoryHelpers):
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        genre_repository: IGenreRepository,
+    ):
         self.session_factory = session_factory
+        # genres are checked against its in-process snapshot, not the database
+        self.genre_repository = genre_repository
 
     async def create_track(self, new_track: NewTrack) -> Track:
         async with self.session_factory() as session:
@@ -28,14 +47,9 @@ class SQLAlchemyTrackRepository(ITrackRepository, RepositoryHelpers):
             if not album:
                 raise AlbumNotFoundException(f"Album '{new_track.album_id}' not found")
             if new_track.genre_id:
-                model = await self._get_one_or_none(
-                    select(GenreModel).where(GenreModel.id == new_track.genre_id),
-                    session,
+                await self.genre_repository.get_genre_by_id(
+                    GenreID(id=new_track.genre_id)
                 )
-                if not model:
-                    raise GenreNotFoundException(
-                        f"Genre '{new_track.genre_id}' not found"
-                    )
             artist = await self._get_one_or_none(
                 select(UserModel).where(UserModel.id == new_track.artist_id),
                 session,
@@ -57,11 +71,11 @@ class SQLAlchemyTrackRepository(ITrackRepository, RepositoryHelpers):
 
     async def get_tracks(self, params: TrackSearchParams) -> list[Track]:
         async with self.session_factory() as session:
-            query = select(TrackModel)
+            query = select(*self._columns(TrackModel, Track))
 
             if params.artist_id:
                 model = await self._get_one_or_none(
-                    select(UserModel).where(UserModel.id == params.artist_id),
+                    select(UserModel.id).where(UserModel.id == params.artist_id),
                     session,
                 )
                 if not model:
@@ -72,7 +86,8 @@ class SQLAlchemyTrackRepository(ITrackRepository, RepositoryHelpers):
 
             if params.album_id:
                 model = await self._get_one_or_none(
-                    select(AlbumModel).where(AlbumModel.id == params.album_id), session
+                    select(AlbumModel.id).where(AlbumModel.id == params.album_id),
+                    session,
                 )
                 if not model:
                     raise AlbumNotFoundException(f"Album '{params.album_id}' not found")
@@ -98,11 +113,7 @@ class SQLAlchemyTrackRepository(ITrackRepository, RepositoryHelpers):
                 query = query.where(TrackModel.updated_at <= params.updated_search_end)
 
             if params.genre_id:
-                model = await self._get_one_or_none(
-                    select(GenreModel).where(GenreModel.id == params.genre_id), session
-                )
-                if not model:
-                    raise GenreNotFoundException(f"Genre '{params.genre_id}' not found")
+                await self.genre_repository.get_genre_by_id(GenreID(id=params.genre_id))
                 query = query.where(TrackModel.genre_id == params.genre_id)
 
             if params.name:
@@ -111,8 +122,42 @@ class SQLAlchemyTrackRepository(ITrackRepository, RepositoryHelpers):
                 ).order_by(func.similarity(TrackModel.name, params.name).desc())
 
             query = query.offset(params.skip).limit(params.limit)
-            models = await self._get_all(query, session)
-            return [Track.model_validate(m, from_attributes=True) for m in models]
+            return await self._get_rows(query, TRACKS, session)
+
+    async def get_artist_tracks(self, params: ArtistPageParams) -> list[Track]:
+        async with self.session_factory() as session:
+            query = (
+                select(*self._columns(TrackModel, Track))
+                .where(TrackModel.artist_id == params.id)
+                .order_by(TrackModel.release_date.desc(), TrackModel.id.desc())
+                .limit(params.tracks_limit)
+            )
+            return await self._get_rows(query, TRACKS, session)
+
+    async def get_album_track_ids(self, album_id: AlbumID) -> list[int]:
+        async with self.session_factory() as session:
+            # the outer join tells a missing album from an empty one in one query
+            result = await self._execute_query(
+                select(AlbumModel.id, TrackModel.id)
+                .outerjoin(TrackModel, TrackModel.album_id == AlbumModel.id)
+                .where(AlbumModel.id == album_id.id)
+                .order_by(TrackModel.id),
+                session,
+            )
+            rows = result.all()
+        if not rows:
+            raise AlbumNotFoundException(f"Album '{album_id.id}' not found")
+        return [track_id for _, track_id in rows if track_id is not None]
+
+    async def get_existing_track_ids(self, track_ids: list[int]) -> set[int]:
+        async with self.session_factory() as session:
+            found = await self._get_all(
+                select(TrackModel.id).where(
+                    TrackModel.id == any_(literal(track_ids, ARRAY(Integer)))
+                ),
+                session,
+            )
+            return set(found)
 
     async def update_track(self, new_track: UpdateTrack) -> Track:
         async with self.session_factory() as session:
@@ -135,14 +180,9 @@ class SQLAlchemyTrackRepository(ITrackRepository, RepositoryHelpers):
                         f"Album '{new_track.album_id}' not found"
                     )
             if new_track.genre_id:
-                model = await self._get_one_or_none(
-                    select(GenreModel).where(GenreModel.id == new_track.genre_id),
-                    session,
+                await self.genre_repository.get_genre_by_id(
+                    GenreID(id=new_track.genre_id)
                 )
-                if not model:
-                    raise GenreNotFoundException(
-                        f"Genre '{new_track.genre_id}' not found"
-                    )
             model = await self._get_one_or_none(
                 select(TrackModel).where(TrackModel.id == new_track.id), session
             )
@@ -151,24 +191,30 @@ class SQLAlchemyTrackRepository(ITrackRepository, RepositoryHelpers):
             updated = await self._update_and_commit(model, new_track, session)
             return Track.model_validate(updated, from_attributes=True)
 
-    async def delete_track(self, track: TrackID) -> None:
+    async def delete_track(self, track: TrackID) -> DeletedCatalog:
         async with self.session_factory() as session:
-            model = await self._get_one_or_none(
-                select(TrackModel).where(TrackModel.id == track.id), session
+            tracks = (
+                delete(TrackModel)
+                .where(TrackModel.id == track.id)
+                .returning(TrackModel.id, TrackModel.artist_id, TrackModel.album_id)
+                .cte("deleted_tracks")
             )
-            if not model:
-                raise TrackNotFoundException(f"Track '{track.id}' not found")
-
-            query = delete(TrackModel).where(TrackModel.id == track.id)
-            await self._delete_and_commit(query, session)
-
-            album_id = model.album_id
-
-            count = await session.scalar(
-                select(func.count())
-                .select_from(TrackModel)
-                .where(TrackModel.album_id == album_id)
+            # the album goes with its last track, ctes share a snapshot so the
+            # track being deleted is still visible here
+            albums = (
+                delete(AlbumModel)
+                .where(
+                    AlbumModel.id.in_(select(tracks.c.album_id)),
+                    ~exists().where(
+                        TrackModel.album_id == AlbumModel.id,
+                        TrackModel.id != track.id,
+                    ),
+                )
+                .returning(AlbumModel.id)
+                .cte("deleted_albums")
             )
-            if count == 0:
-                query = delete(AlbumModel).where(AlbumModel.id == album_id)
-                await self._delete_and_commit(query, session)
+            deleted = await self._delete_catalog(session, tracks=tracks, albums=albums)
+            if not deleted.tracks:
+                raise TrackNotFoundException(f"Track '{track.id}' not found")
+            await session.commit()
+            return deleted
@@ -1,9 +1,20 @@
-from typing import Callable
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
 import redis.asyncio.client
+from configs.logger import logger
+from configs.metrics import track_queue_event_subscribers
 from exceptions.track_queue import TrackQueueNotFoundException
 from dto.track_queue import (
     InQueueID,
+    BulkEnqueueParams,
+    QueueModes,
     QueueParameters,
+    QueueRepeat,
+    QueueShuffle,
+    QueueSide,
+    RepeatMode,
     QueueSrcDestIDs,
     TrackInQueueIDs,
     TrackQueue,
@@ -12,96 +23,427 @@ from dto.music import TrackID
 from repositories.interfaces import ITrackQueueRepository
 
 
-class RedisTrackQueueRepository(ITrackQueueRepository):
+EVENTS_PATTERN = "queue:*:events"
+RESYNC_EVENT = json.dumps({"op": "resync"}, separators=(",", ":"))
+DELETE_EVENT = json.dumps({"op": "delete"}, separators=(",", ":"))
+
+
+class TrackQueueEventsHelpers:
+    """event streams open in this process, `subscribers` maps users to their queues"""
+
+    subscribers: dict[int, set[asyncio.Queue[str]]]
+    events_buffer: int
+
+    def subscribe(self, user_id: int) -> asyncio.Queue[str]:
+        queue = asyncio.Queue(maxsize=self.events_buffer)
+        self.subscribers.setdefault(user_id, set()).add(queue)
+        track_queue_event_subscribers.inc()
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue[str]) -> None:
+        queues = self.subscribers.get(user_id)
+        if queues is None or queue not in queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[user_id]
+        track_queue_event_subscribers.dec()
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue[str], event: str) -> None:
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # a subscriber that fell behind drops its backlog and refetches
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_EVENT)
+
+
+class RedisTrackQueueRepository(TrackQueueEventsHelpers, ITrackQueueRepository):
     def __init__(
         self,
-        client_factory: Callable[[], redis.asyncio.client.Redis],
+        client: redis.asyncio.client.Redis,
         ttl_sec: int,
         script_sha1s: dict[str, str],
+        events_buffer: int,
     ) -> None:
-        self.client_factory = client_factory
+        self.client = client
         self.ttl_sec = ttl_sec
         self.script_sha1s = script_sha1s
+        self.events_buffer = events_buffer
+        # queues of the event streams open in this process, by user
+        self.subscribers: dict[int, set[asyncio.Queue[str]]] = {}
 
     @staticmethod
-    def _queue_key(user_id: int) -> str:
-        return f"queue:{user_id}"
+    def _queue_keys(user_id: int) -> tuple[str, str, str]:
+        """
+        a sorted set of "<seq>:<track id>" entries ranked by fractional scores,
+        so duplicates stay apart and positions change in O(log n), a hash with
+        the queue's entry counter and modes, and a copy of the ranks taken when
+        the queue is shuffled to restore its order
+        """
+        return (
+            f"queue:{user_id}:ranks",
+            f"queue:{user_id}:meta",
+            f"queue:{user_id}:order",
+        )
+
+    @staticmethod
+    def _events_channel(user_id: int) -> str:
+        return f"queue:{user_id}:events"
+
+    @staticmethod
+    def _track_id(entry: str) -> int:
+        return int(entry.partition(":")[2])
+
+    async def _run_script(self, name: str, user_id: int, *args):
+        try:
+            return await self.client.evalsha(
+                self.script_sha1s[name],
+                3,
+                *self._queue_keys(user_id),
+                self._events_channel(user_id),
+                *args,
+            )
+        except Exception as e:
+            if str(e) == "e":
+                raise TrackQueueNotFoundException
+            raise e
 
     async def push_left(self, user_id: int, id: TrackID) -> None:
-        async with self.client_factory() as client:
-            queue_key = self._queue_key(user_id)
-            await client.lpush(queue_key, id.id)
-            await client.expire(queue_key, self.ttl_sec)
+        await self.push_many(
+            user_id, [id.id], BulkEnqueueParams(side=QueueSide.left, replace=False)
+        )
 
     async def push_right(self, user_id: int, id: TrackID) -> None:
-        async with self.client_factory() as client:
-            queue_key = self._queue_key(user_id)
-            await client.rpush(queue_key, id.id)
-            await client.expire(queue_key, self.ttl_sec)
+        await self.push_many(
+            user_id, [id.id], BulkEnqueueParams(side=QueueSide.right, replace=False)
+        )
+
+    async def push_many(
+        self, user_id: int, track_ids: list[int], params: BulkEnqueueParams
+    ) -> None:
+        if not track_ids and not params.replace:
+            return
+        await self._run_script(
+            "push",
+            user_id,
+            params.side.value,
+            int(params.replace),
+            self.ttl_sec,
+            *track_ids,
+        )
 
     async def list(self, user_id: int, params: QueueParameters) -> TrackQueue:
-        async with self.client_factory() as client:
-            offset, limit = 0, -1
-            offset = params.offset
-            if params.limit > 0:
-                limit = offset + params.limit - 1
-
-            queue_key = self._queue_key(user_id)
-            res = await client.lrange(queue_key, offset, limit)
-            await client.expire(queue_key, self.ttl_sec)
-            if len(res) == 0:
-                raise TrackQueueNotFoundException
-            return TrackQueue.model_validate({"track_ids": [int(r) for r in res]})
+        offset, limit = 0, -1
+        offset = params.offset
+        if params.limit > 0:
+            limit = offset + params.limit - 1
+
+        ranks_key, meta_key, order_key = self._queue_keys(user_id)
+        # the version says which events are already applied to the page
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zrange(ranks_key, offset, limit)
+            pipe.hget(meta_key, "version")
+            pipe.expire(ranks_key, self.ttl_sec)
+            pipe.expire(meta_key, self.ttl_sec)
+            pipe.expire(order_key, self.ttl_sec)
+            res, version, *_ = await pipe.execute()
+        if len(res) == 0:
+            raise TrackQueueNotFoundException
+        return TrackQueue.model_validate(
+            {"track_ids": [self._track_id(r) for r in res], "version": version or 0}
+        )
 
     async def delete(self, user_id: int) -> None:
-        async with self.client_factory() as client:
-            res = await client.delete(self._queue_key(user_id))
-            if res == 0:
-                raise TrackQueueNotFoundException
+        ranks_key, meta_key, order_key = self._queue_keys(user_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(ranks_key)
+            pipe.delete(meta_key, order_key)
+            pipe.publish(self._events_channel(user_id), DELETE_EVENT)
+            res, *_ = await pipe.execute()
+        if res == 0:
+            raise TrackQueueNotFoundException
 
     async def insert(self, user_id: int, ids: TrackInQueueIDs) -> None:
-        async with self.client_factory() as client:
-            try:
-                await client.evalsha(
-                    self.script_sha1s["insert"],
-                    1,
-                    self._queue_key(user_id),
-                    ids.track_id,
-                    ids.queue_id,
-                    self.ttl_sec,
-                )
-            except Exception as e:
-                if str(e) == "e":
-                    raise TrackQueueNotFoundException
-                raise e
+        await self._run_script(
+            "insert", user_id, ids.track_id, ids.queue_id, self.ttl_sec
+        )
 
     async def move(self, user_id: int, ids: QueueSrcDestIDs) -> None:
-        async with self.client_factory() as client:
-            try:
-                await client.evalsha(
-                    self.script_sha1s["move"],
-                    1,
-                    self._queue_key(user_id),
-                    ids.src_id,
-                    ids.dest_id,
-                    self.ttl_sec,
-                )
-            except Exception as e:
-                if str(e) == "e":
-                    raise TrackQueueNotFoundException
-                raise e
+        await self._run_script("move", user_id, ids.src_id, ids.dest_id, self.ttl_sec)
 
     async def remove(self, user_id: int, id: InQueueID) -> None:
-        async with self.client_factory() as client:
+        await self._run_script("remove", user_id, id.id, self.ttl_sec)
+
+    async def shuffle(self, user_id: int, params: QueueShuffle) -> None:
+        await self._run_script("shuffle", user_id, params.seed, self.ttl_sec)
+
+    async def unshuffle(self, user_id: int) -> None:
+        await self._run_script("unshuffle", user_id, self.ttl_sec)
+
+    async def set_repeat(self, user_id: int, params: QueueRepeat) -> None:
+        await self._run_script("repeat", user_id, params.mode.value, self.ttl_sec)
+
+    async def get_modes(self, user_id: int) -> QueueModes:
+        ranks_key, meta_key, _ = self._queue_keys(user_id)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zcard(ranks_key)
+            pipe.hmget(meta_key, "shuffle", "repeat")
+            length, (seed, repeat) = await pipe.execute()
+        if length == 0:
+            raise TrackQueueNotFoundException
+        return QueueModes(
+            shuffle=seed is not None,
+            seed=seed,
+            repeat=repeat or RepeatMode.off,
+        )
+
+    async def next(self, user_id: int) -> TrackID:
+        entry = await self._run_script("next", user_id, self.ttl_sec)
+        return TrackID(id=self._track_id(entry))
+
+    async def run_listener(self, retry_delay_sec: float) -> None:
+        """
+        one pattern subscription per process fans the queue events out to the
+        streams open here, so an idle stream holds no redis connection
+        """
+        while True:
             try:
-                await client.evalsha(
-                    self.script_sha1s["remove"],
-                    1,
-                    self._queue_key(user_id),
-                    id.id,
-                    self.ttl_sec,
-                )
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.psubscribe(EVENTS_PATTERN)
+                    # whatever was published while nobody was listening
+                    for queues in self.subscribers.values():
+                        for queue in queues:
+                            self._deliver(queue, RESYNC_EVENT)
+                    async for message in pubsub.listen():
+                        if message["type"] != "pmessage":
+                            continue
+                        user_id = int(message["channel"].split(":")[1])
+                        for queue in self.subscribers.get(user_id, ()):
+                            self._deliver(queue, message["data"])
             except Exception as e:
-                if str(e) == "e":
-                    raise TrackQueueNotFoundException
-                raise e
+                logger.warning("track queue events listener failed: %s", e)
+            await asyncio.sleep(retry_delay_sec)
+
+
+class _LuaRandom:
+    """
+    `math.random` of redis lua scripts, a drand48 generator, so a seeded
+    shuffle gives the same order as the shuffle script
+    """
+
+    MASK = (1 << 48) - 1
+    INT32_MAX = 2**31 - 1
+
+    def __init__(self, seed: int) -> None:
+        self.state = ((seed & 0xFFFFFFFF) << 16) | 0x330E
+
+    def randint(self, upper: int) -> int:
+        """between 1 and `upper`, like `math.random(upper)`"""
+        self.state = (0x5DEECE66D * self.state + 0xB) & self.MASK
+        r = (self.state >> 17) % self.INT32_MAX / self.INT32_MAX
+        return int(r * upper) + 1
+
+
+@dataclass
+class _Queue:
+    expires_at: float
+    # (seq, track id), the seq keeps duplicates apart like the sorted set members
+    entries: list[tuple[int, int]] = field(default_factory=list)
+    seq: int = 0
+    version: int = 0
+    shuffle: int | None = None
+    repeat: str | None = None
+    # the entries in their order before shuffling
+    order: list[tuple[int, int]] | None = None
+
+
+class InMemoryTrackQueueRepository(TrackQueueEventsHelpers, ITrackQueueRepository):
+    """
+    the queue scripts in plain python, for a single process: tests, benchmarks
+    and local runs without redis. queues expire `ttl_sec` after their last
+    change or listing, positions are clamped and missing queues raise the same
+    errors, events go straight to the streams open here
+    """
+
+    def __init__(self, ttl_sec: int, events_buffer: int) -> None:
+        self.ttl_sec = ttl_sec
+        self.events_buffer = events_buffer
+        self.queues: dict[int, _Queue] = {}
+        self.subscribers: dict[int, set[asyncio.Queue[str]]] = {}
+
+    def _get(self, user_id: int) -> _Queue | None:
+        queue = self.queues.get(user_id)
+        if queue is not None and queue.expires_at <= time.monotonic():
+            del self.queues[user_id]
+            return None
+        return queue
+
+    def _get_existing(self, user_id: int) -> _Queue:
+        queue = self._get(user_id)
+        if queue is None:
+            raise TrackQueueNotFoundException
+        return queue
+
+    def _touch(self, queue: _Queue) -> None:
+        queue.expires_at = time.monotonic() + self.ttl_sec
+
+    def _publish(self, user_id: int, event: str) -> None:
+        for subscriber in self.subscribers.get(user_id, ()):
+            self._deliver(subscriber, event)
+
+    def _publish_change(self, user_id: int, queue: _Queue, event: dict) -> None:
+        queue.version += 1
+        event["version"] = queue.version
+        self._publish(user_id, json.dumps(event, separators=(",", ":")))
+        self._touch(queue)
+
+    def _drop(self, user_id: int) -> None:
+        self.queues.pop(user_id, None)
+        self._publish(user_id, DELETE_EVENT)
+
+    async def push_left(self, user_id: int, id: TrackID) -> None:
+        await self.push_many(
+            user_id, [id.id], BulkEnqueueParams(side=QueueSide.left, replace=False)
+        )
+
+    async def push_right(self, user_id: int, id: TrackID) -> None:
+        await self.push_many(
+            user_id, [id.id], BulkEnqueueParams(side=QueueSide.right, replace=False)
+        )
+
+    async def push_many(
+        self, user_id: int, track_ids: list[int], params: BulkEnqueueParams
+    ) -> None:
+        if not track_ids and not params.replace:
+            return
+        if not track_ids:
+            self._drop(user_id)
+            return
+        queue = self._get(user_id)
+        if queue is None:
+            queue = self.queues[user_id] = _Queue(expires_at=0)
+        if params.replace:
+            queue.entries, queue.order, queue.shuffle = [], None, None
+
+        added = [(queue.seq + i, id) for i, id in enumerate(track_ids, 1)]
+        queue.seq += len(track_ids)
+        if params.side == QueueSide.left:
+            queue.entries[:0] = added
+        else:
+            queue.entries.extend(added)
+        self._publish_change(
+            user_id,
+            queue,
+            {
+                "op": "push",
+                "side": params.side.value,
+                "replace": params.replace,
+                "track_ids": track_ids,
+            },
+        )
+
+    async def list(self, user_id: int, params: QueueParameters) -> TrackQueue:
+        queue = self._get(user_id)
+        if queue is None:
+            raise TrackQueueNotFoundException
+        self._touch(queue)
+        end = params.offset + params.limit if params.limit > 0 else None
+        entries = queue.entries[params.offset : end]
+        if not entries:
+            raise TrackQueueNotFoundException
+        return TrackQueue(track_ids=[id for _, id in entries], version=queue.version)
+
+    async def delete(self, user_id: int) -> None:
+        queue = self._get(user_id)
+        self._drop(user_id)
+        if queue is None:
+            raise TrackQueueNotFoundException
+
+    async def insert(self, user_id: int, ids: TrackInQueueIDs) -> None:
+        queue = self._get_existing(user_id)
+        pos = min(ids.queue_id, len(queue.entries))
+        queue.seq += 1
+        queue.entries.insert(pos, (queue.seq, ids.track_id))
+        self._publish_change(
+            user_id, queue, {"op": "insert", "pos": pos, "track_id": ids.track_id}
+        )
+
+    async def move(self, user_id: int, ids: QueueSrcDestIDs) -> None:
+        queue = self._get_existing(user_id)
+        last = len(queue.entries) - 1
+        src, dest = min(ids.src_id, last), min(ids.dest_id, last)
+        if dest == src:
+            self._touch(queue)
+            return
+        entry = queue.entries.pop(src)
+        # the entry goes to the end, or before the one that was at dest
+        pos = dest - 1 if src < dest < last else dest
+        queue.entries.insert(pos, entry)
+        self._publish_change(user_id, queue, {"op": "move", "src": src, "dest": pos})
+
+    async def remove(self, user_id: int, id: InQueueID) -> None:
+        queue = self._get_existing(user_id)
+        pos = min(id.id, len(queue.entries) - 1)
+        del queue.entries[pos]
+        if not queue.entries:
+            self._drop(user_id)
+            return
+        self._publish_change(user_id, queue, {"op": "remove", "pos": pos})
+
+    async def shuffle(self, user_id: int, params: QueueShuffle) -> None:
+        queue = self._get_existing(user_id)
+        # a reshuffle keeps the order saved by the first one
+        if queue.order is None:
+            queue.order = list(queue.entries)
+        entries = queue.entries
+        random = _LuaRandom(params.seed)
+        for i in range(len(entries), 1, -1):
+            j = random.randint(i)
+            entries[i - 1], entries[j - 1] = entries[j - 1], entries[i - 1]
+        queue.shuffle = params.seed
+        self._publish_change(user_id, queue, {"op": "shuffle", "seed": params.seed})
+
+    async def unshuffle(self, user_id: int) -> None:
+        queue = self._get_existing(user_id)
+        # entries still queued go back to their saved order, the ones added
+        # while shuffled follow them in their current order
+        current = set(queue.entries)
+        saved = [entry for entry in queue.order or () if entry in current]
+        placed = set(saved)
+        queue.entries = saved + [e for e in queue.entries if e not in placed]
+        queue.order, queue.shuffle = None, None
+        self._publish_change(user_id, queue, {"op": "unshuffle"})
+
+    async def set_repeat(self, user_id: int, params: QueueRepeat) -> None:
+        queue = self._get_existing(user_id)
+        queue.repeat = params.mode.value
+        self._publish_change(
+            user_id, queue, {"op": "repeat", "mode": params.mode.value}
+        )
+
+    async def get_modes(self, user_id: int) -> QueueModes:
+        queue = self._get_existing(user_id)
+        return QueueModes(
+            shuffle=queue.shuffle is not None,
+            seed=queue.shuffle,
+            repeat=queue.repeat or RepeatMode.off,
+        )
+
+    async def next(self, user_id: int) -> TrackID:
+        queue = self._get_existing(user_id)
+        entry = queue.entries[0]
+        if queue.repeat == RepeatMode.all.value:
+            # the head goes around to the end
+            queue.entries.append(queue.entries.pop(0))
+        elif queue.repeat != RepeatMode.one.value:
+            del queue.entries[0]
+            if not queue.entries:
+                self._drop(user_id)
+                return TrackID(id=entry[1])
+        self._publish_change(
+            user_id, queue, {"op": "next", "repeat": queue.repeat or "off"}
+        )
+        return TrackID(id=entry[1])
@@ -1,3 +1,4 @@
+from dto.music import DeletedCatalog
 from dto.accounts import (
     User,
     UserID,
@@ -14,6 +15,9 @@ from repositories.interfaces import IUserRepository
 from repositories.helpers import RepositoryHelpers
 from models.user import UserModel
 from models.subscription import SubscriptionModel
+from models.album import AlbumModel
+from models.track import TrackModel
+from models.playlist import PlaylistModel
 from exceptions.accounts import (
     UserNotFoundException,
     SubscriptionNotFoundException,
@@ -22,7 +26,12 @@ from exceptions.accounts import (
 )
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from sqlalchemy import select, delete, func
+from pydantic import TypeAdapter
+from sqlalchemy import select, delete, update, case, func, or_
+from sqlalchemy.dialects.postgresql import insert
+
+
+USERS = TypeAdapter(list[User])
 
 
 class SQLAlchemyUserRepository(IUserRepository, RepositoryHelpers):
@@ -59,7 +68,7 @@ class SQLAlchemyUserRepository(IUserRepository, RepositoryHelpers):
 
     async def get_users(self, params: UserSearchParams) -> list[User]:
         async with self.session_factory() as session:
-            query = select(UserModel)
+            query = select(*self._columns(UserModel, User))
 
             if params.name:
                 query = query.filter(
@@ -85,8 +94,7 @@ class SQLAlchemyUserRepository(IUserRepository, RepositoryHelpers):
                 query = query.where(UserModel.updated_at <= params.updated_search_end)
 
             query = query.offset(params.skip).limit(params.limit)
-            models = await self._get_all(query, session)
-            return [User.model_validate(m, from_attributes=True) for m in models]
+            return await self._get_rows(query, USERS, session)
 
     async def update_user(self, new_user: UpdateUserRole) -> User:
         async with self.session_factory() as session:
@@ -103,12 +111,88 @@ class SQLAlchemyUserRepository(IUserRepository, RepositoryHelpers):
             updated = await self._update_and_commit(model, new_user, session)
             return User.model_validate(updated, from_attributes=True)
 
-    async def delete_user(self, user: UserID) -> None:
+    @staticmethod
+    async def _adjust_counters(
+        subscribe: Subscribe, delta: int, session: AsyncSession
+    ) -> None:
+        """shift both sides' counters of one subscription in a single statement"""
+        await session.execute(
+            update(UserModel)
+            .where(UserModel.id.in_([subscribe.subscriber_id, subscribe.artist_id]))
+            .values(
+                followers_count=UserModel.followers_count
+                + case((UserModel.id == subscribe.artist_id, delta), else_=0),
+                following_count=UserModel.following_count
+                + case((UserModel.id == subscribe.subscriber_id, delta), else_=0),
+                updated_at=UserModel.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def delete_user(self, user: UserID) -> DeletedCatalog:
         async with self.session_factory() as session:
-            query = delete(UserModel).where(UserModel.id == user.id)
-            deleted = await self._delete_and_commit(query, session)
-            if deleted == 0:
+            await session.execute(
+                update(UserModel)
+                .where(
+                    UserModel.id == SubscriptionModel.artist_id,
+                    SubscriptionModel.subscriber_id == user.id,
+                )
+                .values(
+                    followers_count=UserModel.followers_count - 1,
+                    updated_at=UserModel.updated_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await session.execute(
+                update(UserModel)
+                .where(
+                    UserModel.id == SubscriptionModel.subscriber_id,
+                    SubscriptionModel.artist_id == user.id,
+                )
+                .values(
+                    following_count=UserModel.following_count - 1,
+                    updated_at=UserModel.updated_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            # the foreign keys would cascade on their own, the ctes are there to
+            # return what went away so its files can be removed
+            albums = (
+                delete(AlbumModel)
+                .where(AlbumModel.artist_id == user.id)
+                .returning(AlbumModel.id)
+                .cte("deleted_albums")
+            )
+            tracks = (
+                delete(TrackModel)
+                .where(
+                    or_(
+                        TrackModel.artist_id == user.id,
+                        TrackModel.album_id.in_(select(albums.c.id)),
+                    )
+                )
+                .returning(TrackModel.id, TrackModel.artist_id)
+                .cte("deleted_tracks")
+            )
+            playlists = (
+                delete(PlaylistModel)
+                .where(PlaylistModel.author_id == user.id)
+                .returning(PlaylistModel.id)
+                .cte("deleted_playlists")
+            )
+            users = (
+                delete(UserModel)
+                .where(UserModel.id == user.id)
+                .returning(UserModel.id)
+                .cte("deleted_users")
+            )
+            deleted = await self._delete_catalog(
+                session, tracks=tracks, albums=albums, playlists=playlists, users=users
+            )
+            if not deleted.user_ids:
                 raise UserNotFoundException(f"User '{user.id}' not found")
+            await session.commit()
+            return deleted
 
     async def subscribe_to(self, subscribe: Subscribe) -> None:
         async with self.session_factory() as session:
@@ -126,20 +210,20 @@ class SQLAlchemyUserRepository(IUserRepository, RepositoryHelpers):
             if not model:
                 raise UserNotFoundException(f"User '{subscribe.artist_id}' not found")
 
-            model = await self._get_one_or_none(
-                select(SubscriptionModel).where(
-                    SubscriptionModel.subscriber_id == subscribe.subscriber_id,
-                    SubscriptionModel.artist_id == subscribe.artist_id,
-                ),
+            added = await self._get_one_or_none(
+                insert(SubscriptionModel)
+                .values(**subscribe.model_dump())
+                .on_conflict_do_nothing()
+                .returning(SubscriptionModel.artist_id),
                 session,
             )
-            if model:
+            if added is None:
                 raise SubscriptionAlreadyExist(
                     f"Subscription from '{subscribe.subscriber_id}' to '{subscribe.artist_id}' already exists"
                 )
 
-            sub = SubscriptionModel(**subscribe.model_dump())
-            await self._add_and_commit(sub, session)
+            await self._adjust_counters(subscribe, 1, session)
+            await session.commit()
 
     async def unsubscribe_from(self, subscribe: Subscribe) -> None:
         async with self.session_factory() as session:
@@ -157,64 +241,63 @@ class SQLAlchemyUserRepository(IUserRepository, RepositoryHelpers):
             if not model:
                 raise UserNotFoundException(f"User '{subscribe.artist_id}' not found")
 
-            query = delete(SubscriptionModel).where(
-                SubscriptionModel.subscriber_id == subscribe.subscriber_id,
-                SubscriptionModel.artist_id == subscribe.artist_id,
+            deleted = await self._get_one_or_none(
+                delete(SubscriptionModel)
+                .where(
+                    SubscriptionModel.subscriber_id == subscribe.subscriber_id,
+                    SubscriptionModel.artist_id == subscribe.artist_id,
+                )
+                .returning(SubscriptionModel.artist_id),
+                session,
             )
-            deleted = await self._delete_and_commit(query, session)
-            if deleted == 0:
+            if deleted is None:
                 raise SubscriptionNotFoundException(
                     f"Subscription from '{subscribe.subscriber_id}' to '{subscribe.artist_id}' not found"
                 )
 
+            await self._adjust_counters(subscribe, -1, session)
+            await session.commit()
+
     async def get_subscriptions(self, params: SubscribeSearchParams) -> list[User]:
         async with self.session_factory() as session:
             model = await self._get_one_or_none(
-                select(UserModel).where(UserModel.id == params.id), session
+                select(UserModel.id).where(UserModel.id == params.id), session
             )
             if not model:
                 raise UserNotFoundException(f"User '{params.id}' not found")
 
             query = (
-                select(UserModel)
+                select(*self._columns(UserModel, User))
                 .join(SubscriptionModel, SubscriptionModel.artist_id == UserModel.id)
                 .where(SubscriptionModel.subscriber_id == params.id)
             )
             query = query.offset(params.skip).limit(params.limit)
-            models = await self._get_all(query, session)
-            return [User.model_validate(m, from_attributes=True) for m in models]
+            return await self._get_rows(query, USERS, session)
 
     async def get_subscribers(self, params: SubscribeSearchParams) -> list[User]:
         async with self.session_factory() as session:
             model = await self._get_one_or_none(
-                select(UserModel).where(UserModel.id == params.id), session
+                select(UserModel.id).where(UserModel.id == params.id), session
             )
             if not model:
                 raise UserNotFoundException(f"User '{params.id}' not found")
 
             query = (
-                select(UserModel)
+                select(*self._columns(UserModel, User))
                 .join(
                     SubscriptionModel, SubscriptionModel.subscriber_id == UserModel.id
                 )
                 .where(SubscriptionModel.artist_id == params.id)
             )
             query = query.offset(params.skip).limit(params.limit)
-            models = await self._get_all(query, session)
-            return [User.model_validate(m, from_attributes=True) for m in models]
+            return await self._get_rows(query, USERS, session)
 
     async def get_subscribe_count(self, user: UserID) -> SubscribersCount:
         async with self.session_factory() as session:
-            model = await self._get_one_or_none(
-                select(UserModel).where(UserModel.id == user.id), session
+            count = await self._get_one_or_none(
+                select(UserModel.followers_count).where(UserModel.id == user.id),
+                session,
             )
-            if not model:
+            if count is None:
                 raise UserNotFoundException(f"User '{user.id}' not found")
-
-            result = await session.execute(
-                select(func.count())
-                .select_from(SubscriptionModel)
-                .where(SubscriptionModel.artist_id == user.id)
-            )
-            count = result.scalar_one()
             return SubscribersCount(count=count)
@@ -2,6 +2,7 @@ from typing import Optional
 
 from beanie import PydanticObjectId
 from beanie.operators import In
+from pymongo.errors import BulkWriteError
 
 from exceptions.user_activity import (
     UserActivityNotFoundException,
@@ -9,6 +10,7 @@ from exceptions.user_activity import (
 from configs.database import init_mongo_db
 from models.user_activity import UserActivityModel
 from repositories.interfaces import IUserActivityRepository
+from dto.track_queue import PlaybackSession
 from dto.user_activity import (
     UserActivity,
     UserActivityFilter,
@@ -16,6 +18,9 @@ from dto.user_activity import (
 )
 
 
+PLAYHEAD_EVENT = "playhead"
+
+
 class MongoDBUserActivityRepository(IUserActivityRepository):
     @staticmethod
     async def create() -> "MongoDBUserActivityRepository":
@@ -36,6 +41,77 @@ class MongoDBUserActivityRepository(IUserActivityRepository):
             }
         )
 
+    @staticmethod
+    async def _insert_many(docs: list[UserActivityModel]) -> dict[int, str]:
+        """
+        unordered, so a failed document does not hold back the ones after it.
+        returns the write errors by position
+        """
+        if not docs:
+            return {}
+        try:
+            await UserActivityModel.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            return {
+                error["index"]: error["errmsg"] for error in e.details["writeErrors"]
+            }
+        return {}
+
+    async def add_many(self, user_activities: list[UserActivityPost]) -> dict[int, str]:
+        return await self._insert_many(
+            [
+                UserActivityModel(
+                    user_id=user_activity.user_id,
+                    track_id=user_activity.track_id,
+                    event=user_activity.event,
+                )
+                for user_activity in user_activities
+            ]
+        )
+
+    def prepare(self, user_activity: UserActivityPost) -> UserActivity:
+        """the activity as `add` would store it, with its id and time already set"""
+        doc = UserActivityModel(
+            id=PydanticObjectId(),
+            user_id=user_activity.user_id,
+            track_id=user_activity.track_id,
+            event=user_activity.event,
+        )
+        return UserActivity.model_validate(
+            {
+                **doc.model_dump(),
+                "id": int(str(doc.id), 16),
+            }
+        )
+
+    async def add_prepared(self, user_activities: list[UserActivity]) -> dict[int, str]:
+        return await self._insert_many(
+            [
+                UserActivityModel(
+                    id=PydanticObjectId(hex(user_activity.id)[2:]),
+                    user_id=user_activity.user_id,
+                    track_id=user_activity.track_id,
+                    event=user_activity.event,
+                    time=user_activity.time,
+                )
+                for user_activity in user_activities
+            ]
+        )
+
+    async def add_playheads(self, sessions: list[PlaybackSession]) -> None:
+        """the current track of each session as one `playhead` activity"""
+        await UserActivityModel.insert_many(
+            [
+                UserActivityModel(
+                    user_id=session.user_id,
+                    track_id=session.track_id,
+                    event=PLAYHEAD_EVENT,
+                    time=session.updated_at,
+                )
+                for session in sessions
+            ]
+        )
+
     async def get(self, id: int) -> UserActivity:
         mongo_id = hex(id)[2:]
         if not PydanticObjectId.is_valid(mongo_id):
@@ -1,29 +1,110 @@
--- KEYS[1]: queue key
--- ARGV[1]: source position (0-based)
--- ARGV[2]: dest position (0-based)
--- ARGV[3]: TTL seconds
+-- KEYS[1]: queue ranks key (sorted set of "<seq>:<track ID>" entries)
+-- KEYS[2]: queue meta key (hash of the entry counter and modes)
+-- KEYS[3]: queue order key (the entries in their order before shuffling)
+-- ARGV[1]: events channel
+-- ARGV[2]: source position (0-based)
+-- ARGV[3]: dest position (0-based)
+-- ARGV[4]: TTL seconds
 
-local key = KEYS[1]
-local src = tonumber(ARGV[1]) + 1
-local dest = tonumber(ARGV[2]) + 1
-local ttl = tonumber(ARGV[3])
+-- spreads the entries around `pos` evenly over the gap between the window's
+-- outer neighbours, leaving a free slot before the entry at `pos`. the window
+-- doubles until the spacing leaves room for further halvings, so only the
+-- entries near `pos` are rewritten. returns the score of the free slot
+local function respace(ranks, pos, len)
+    local half = 16
+    while true do
+        local lo = math.max(pos - half, 0)
+        local hi = math.min(pos + half, len)
+        local entries = redis.call('ZRANGE', ranks, lo, hi - 1)
+        local lower, upper
+        if lo > 0 then
+            lower = tonumber(redis.call('ZRANGE', ranks, lo - 1, lo - 1, 'WITHSCORES')[2])
+        end
+        if hi < len then
+            upper = tonumber(redis.call('ZRANGE', ranks, hi, hi, 'WITHSCORES')[2])
+        end
+        local slots = #entries + 1
+        if lower == nil and upper == nil then
+            lower, upper = -1, slots
+        elseif lower == nil then
+            lower = upper - slots - 1
+        elseif upper == nil then
+            upper = lower + slots + 1
+        end
+        local step = (upper - lower) / (slots + 1)
+        if step > math.max(math.abs(lower), math.abs(upper), 1) * 2 ^ -30 then
+            local free
+            local args = {}
+            for i = 1, slots do
+                local score = lower + step * i
+                if lo + i - 1 == pos then
+                    free = score
+                else
+                    args[#args + 1] = string.format('%.17g', score)
+                    args[#args + 1] = entries[lo + i - 1 < pos and i or i - 1]
+                end
+                if #args == 1000 or (i == slots and #args > 0) then
+                    redis.call('ZADD', ranks, unpack(args))
+                    args = {}
+                end
+            end
+            return free
+        end
+        half = half * 2
+    end
+end
 
-local len = redis.call('LLEN', key)
-if len == 0 then return redis.error_reply("e") end
-if src > len then src = len end
-if dest >= len then dest = len + 1 end
+-- score placing an entry before the one at `pos`, or after the last one when
+-- `pos` is past the end. the entries around `pos` are respaced once two
+-- neighbours have no double left between them
+local function score_at(ranks, pos, len)
+    if pos >= len then
+        local last = redis.call('ZRANGE', ranks, -1, -1, 'WITHSCORES')
+        return tonumber(last[2]) + 1
+    end
+    if pos == 0 then
+        local first = redis.call('ZRANGE', ranks, 0, 0, 'WITHSCORES')
+        return tonumber(first[2]) - 1
+    end
+    local around = redis.call('ZRANGE', ranks, pos - 1, pos, 'WITHSCORES')
+    local before = tonumber(around[2])
+    local after = tonumber(around[4])
+    local mid = before + (after - before) / 2
+    if mid > before and mid < after then return mid end
+    return respace(ranks, pos, len)
+end
 
-local elements = redis.call('LRANGE', key, 0, -1)
-local elem = table.remove(elements, src)  -- Remove from source
+local ranks = KEYS[1]
+local meta = KEYS[2]
+local order = KEYS[3]
+local channel = ARGV[1]
+local src = tonumber(ARGV[2])
+local dest = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
 
--- Adjust destination after removal
-if dest > src then dest = dest - 1 end
+-- the change goes to the queue's subscribers, tagged with the queue version
+local function publish(event)
+    event.version = redis.call('HINCRBY', meta, 'version', 1)
+    redis.call('PUBLISH', channel, cjson.encode(event))
+end
+
+local len = redis.call('ZCARD', ranks)
+if len == 0 then return redis.error_reply("e") end
+if src > len - 1 then src = len - 1 end
+if dest > len - 1 then dest = len - 1 end
 
-table.insert(elements, dest, elem)  -- Insert at destination
-redis.call('DEL', key)
-if #elements > 0 then
-    redis.call('RPUSH', key, unpack(elements))
+if dest ~= src then
+    local entry = redis.call('ZRANGE', ranks, src, src)[1]
+    redis.call('ZREM', ranks, entry)
+    -- the entry goes to the end, or before the one that was at dest
+    local pos = dest
+    if dest > src and dest < len - 1 then pos = dest - 1 end
+    local score = score_at(ranks, pos, len - 1)
+    redis.call('ZADD', ranks, string.format('%.17g', score), entry)
+    publish({op = 'move', src = src, dest = pos})
 end
 
-redis.call('EXPIRE', key, ttl)
-return 'OK'
\ No newline at end of file
+redis.call('EXPIRE', ranks, ttl)
+redis.call('EXPIRE', meta, ttl)
+redis.call('EXPIRE', order, ttl)
+return 'OK'
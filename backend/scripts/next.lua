@@ -0,0 +1,44 @@
+-- KEYS[1]: queue ranks key (sorted set of "<seq>:<track ID>" entries)
+-- KEYS[2]: queue meta key (hash of the entry counter and modes)
+-- KEYS[3]: queue order key (the entries in their order before shuffling)
+-- ARGV[1]: events channel
+-- ARGV[2]: TTL seconds
+-- returns the entry at the head of the queue
+
+local ranks = KEYS[1]
+local meta = KEYS[2]
+local order = KEYS[3]
+local channel = ARGV[1]
+local ttl = tonumber(ARGV[2])
+
+-- the change goes to the queue's subscribers, tagged with the queue version
+local function publish(event)
+    event.version = redis.call('HINCRBY', meta, 'version', 1)
+    redis.call('PUBLISH', channel, cjson.encode(event))
+end
+
+local len = redis.call('ZCARD', ranks)
+if len == 0 then return redis.error_reply("e") end
+
+local entry = redis.call('ZRANGE', ranks, 0, 0)[1]
+local mode = redis.call('HGET', meta, 'repeat')
+if mode == 'all' then
+    -- the head goes around to the end
+    if len > 1 then
+        local last = redis.call('ZRANGE', ranks, -1, -1, 'WITHSCORES')
+        redis.call('ZADD', ranks, string.format('%.17g', tonumber(last[2]) + 1), entry)
+    end
+elseif mode ~= 'one' then
+    redis.call('ZREM', ranks, entry)
+    if len == 1 then
+        redis.call('DEL', meta, order)
+        redis.call('PUBLISH', channel, cjson.encode({op = 'delete'}))
+        return entry
+    end
+end
+publish({op = 'next', ['repeat'] = mode or 'off'})
+
+redis.call('EXPIRE', ranks, ttl)
+redis.call('EXPIRE', meta, ttl)
+redis.call('EXPIRE', order, ttl)
+return entry
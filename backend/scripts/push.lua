@@ -0,0 +1,64 @@
+-- KEYS[1]: queue ranks key (sorted set of "<seq>:<track ID>" entries)
+-- KEYS[2]: queue meta key (hash of the entry counter and modes)
+-- KEYS[3]: queue order key (the entries in their order before shuffling)
+-- ARGV[1]: events channel
+-- ARGV[2]: side, "left" or "right"
+-- ARGV[3]: "1" to replace the queue, "0" to add to it
+-- ARGV[4]: TTL seconds
+-- ARGV[5..]: track IDs, in queue order
+
+local ranks = KEYS[1]
+local meta = KEYS[2]
+local order = KEYS[3]
+local channel = ARGV[1]
+local side = ARGV[2]
+local replace = ARGV[3] == '1'
+local ttl = tonumber(ARGV[4])
+local count = #ARGV - 4
+
+-- the change goes to the queue's subscribers, tagged with the queue version
+local function publish(event)
+    event.version = redis.call('HINCRBY', meta, 'version', 1)
+    redis.call('PUBLISH', channel, cjson.encode(event))
+end
+
+-- an empty replacement clears the queue, any other keeps its repeat mode
+-- and turns shuffle off
+if replace and count == 0 then
+    redis.call('DEL', ranks, meta, order)
+    redis.call('PUBLISH', channel, cjson.encode({op = 'delete'}))
+    return 'OK'
+end
+if replace then
+    redis.call('DEL', ranks, order)
+    redis.call('HDEL', meta, 'shuffle')
+end
+
+-- a left push keeps the given order in front of the queue
+local start = 0
+if side == 'left' then
+    local first = redis.call('ZRANGE', ranks, 0, 0, 'WITHSCORES')
+    if #first > 0 then start = tonumber(first[2]) - count end
+else
+    local last = redis.call('ZRANGE', ranks, -1, -1, 'WITHSCORES')
+    if #last > 0 then start = tonumber(last[2]) + 1 end
+end
+
+local seq = redis.call('HINCRBY', meta, 'seq', count) - count
+local args = {}
+local track_ids = {}
+for i = 1, count do
+    track_ids[i] = tonumber(ARGV[i + 4])
+    args[#args + 1] = string.format('%.17g', start + i - 1)
+    args[#args + 1] = (seq + i) .. ':' .. ARGV[i + 4]
+    if #args == 1000 or i == count then
+        redis.call('ZADD', ranks, unpack(args))
+        args = {}
+    end
+end
+publish({op = 'push', side = side, replace = replace, track_ids = track_ids})
+
+redis.call('EXPIRE', ranks, ttl)
+redis.call('EXPIRE', meta, ttl)
+redis.call('EXPIRE', order, ttl)
+return 'OK'
@@ -1,21 +1,36 @@
--- KEYS[1]: queue key
--- ARGV[1]: position (0-based)
--- ARGV[2]: TTL seconds
+-- KEYS[1]: queue ranks key (sorted set of "<seq>:<track ID>" entries)
+-- KEYS[2]: queue meta key (hash of the entry counter and modes)
+-- KEYS[3]: queue order key (the entries in their order before shuffling)
+-- ARGV[1]: events channel
+-- ARGV[2]: position (0-based)
+-- ARGV[3]: TTL seconds
 
-local key = KEYS[1]
-local pos = tonumber(ARGV[1]) + 1
-local ttl = tonumber(ARGV[2])
+local ranks = KEYS[1]
+local meta = KEYS[2]
+local order = KEYS[3]
+local channel = ARGV[1]
+local pos = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
 
-local len = redis.call('LLEN', key)
+-- the change goes to the queue's subscribers, tagged with the queue version
+local function publish(event)
+    event.version = redis.call('HINCRBY', meta, 'version', 1)
+    redis.call('PUBLISH', channel, cjson.encode(event))
+end
+
+local len = redis.call('ZCARD', ranks)
 if len == 0 then return redis.error_reply("e") end
-if pos > len then pos = len end
+if pos > len - 1 then pos = len - 1 end
 
-local elements = redis.call('LRANGE', key, 0, -1)
-table.remove(elements, pos)
-redis.call('DEL', key)
-if #elements > 0 then
-    redis.call('RPUSH', key, unpack(elements))
+redis.call('ZREMRANGEBYRANK', ranks, pos, pos)
+if len == 1 then
+    redis.call('DEL', meta, order)
+    redis.call('PUBLISH', channel, cjson.encode({op = 'delete'}))
+    return 'OK'
 end
+publish({op = 'remove', pos = pos})
 
-redis.call('EXPIRE', key, ttl)
-return 'OK'
\ No newline at end of file
+redis.call('EXPIRE', ranks, ttl)
+redis.call('EXPIRE', meta, ttl)
+redis.call('EXPIRE', order, ttl)
+return 'OK'
@@ -0,0 +1,30 @@
+-- KEYS[1]: queue ranks key (sorted set of "<seq>:<track ID>" entries)
+-- KEYS[2]: queue meta key (hash of the entry counter and modes)
+-- KEYS[3]: queue order key (the entries in their order before shuffling)
+-- ARGV[1]: events channel
+-- ARGV[2]: repeat mode, "off", "one" or "all"
+-- ARGV[3]: TTL seconds
+
+local ranks = KEYS[1]
+local meta = KEYS[2]
+local order = KEYS[3]
+local channel = ARGV[1]
+local mode = ARGV[2]
+local ttl = tonumber(ARGV[3])
+
+-- the change goes to the queue's subscribers, tagged with the queue version
+local function publish(event)
+    event.version = redis.call('HINCRBY', meta, 'version', 1)
+    redis.call('PUBLISH', channel, cjson.encode(event))
+end
+
+local len = redis.call('ZCARD', ranks)
+if len == 0 then return redis.error_reply("e") end
+
+redis.call('HSET', meta, 'repeat', mode)
+publish({op = 'repeat', mode = mode})
+
+redis.call('EXPIRE', ranks, ttl)
+redis.call('EXPIRE', meta, ttl)
+redis.call('EXPIRE', order, ttl)
+return 'OK'
@@ -0,0 +1,51 @@
+-- KEYS[1]: queue ranks key (sorted set of "<seq>:<track ID>" entries)
+-- KEYS[2]: queue meta key (hash of the entry counter and modes)
+-- KEYS[3]: queue order key (the entries in their order before shuffling)
+-- ARGV[1]: events channel
+-- ARGV[2]: seed
+-- ARGV[3]: TTL seconds
+
+local ranks = KEYS[1]
+local meta = KEYS[2]
+local order = KEYS[3]
+local channel = ARGV[1]
+local seed = tonumber(ARGV[2])
+local ttl = tonumber(ARGV[3])
+
+-- the change goes to the queue's subscribers, tagged with the queue version
+local function publish(event)
+    event.version = redis.call('HINCRBY', meta, 'version', 1)
+    redis.call('PUBLISH', channel, cjson.encode(event))
+end
+
+local len = redis.call('ZCARD', ranks)
+if len == 0 then return redis.error_reply("e") end
+
+-- a reshuffle keeps the order saved by the first one
+if redis.call('ZCARD', order) == 0 then
+    redis.call('ZUNIONSTORE', order, 1, ranks)
+end
+
+local entries = redis.call('ZRANGE', ranks, 0, -1)
+math.randomseed(seed)
+for i = #entries, 2, -1 do
+    local j = math.random(i)
+    entries[i], entries[j] = entries[j], entries[i]
+end
+
+local args = {}
+for i, entry in ipairs(entries) do
+    args[#args + 1] = i - 1
+    args[#args + 1] = entry
+    if #args == 1000 or i == #entries then
+        redis.call('ZADD', ranks, unpack(args))
+        args = {}
+    end
+end
+redis.call('HSET', meta, 'shuffle', seed)
+publish({op = 'shuffle', seed = seed})
+
+redis.call('EXPIRE', ranks, ttl)
+redis.call('EXPIRE', meta, ttl)
+redis.call('EXPIRE', order, ttl)
+return 'OK'
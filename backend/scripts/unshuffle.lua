@@ -0,0 +1,53 @@
+-- KEYS[1]: queue ranks key (sorted set of "<seq>:<track ID>" entries)
+-- KEYS[2]: queue meta key (hash of the entry counter and modes)
+-- KEYS[3]: queue order key (the entries in their order before shuffling)
+-- ARGV[1]: events channel
+-- ARGV[2]: TTL seconds
+
+local ranks = KEYS[1]
+local meta = KEYS[2]
+local order = KEYS[3]
+local channel = ARGV[1]
+local ttl = tonumber(ARGV[2])
+
+-- the change goes to the queue's subscribers, tagged with the queue version
+local function publish(event)
+    event.version = redis.call('HINCRBY', meta, 'version', 1)
+    redis.call('PUBLISH', channel, cjson.encode(event))
+end
+
+local len = redis.call('ZCARD', ranks)
+if len == 0 then return redis.error_reply("e") end
+
+-- entries still queued go back to their saved order, the ones added while
+-- shuffled follow them in their current order
+local saved = redis.call('ZRANGE', order, 0, -1)
+local current = redis.call('ZRANGE', ranks, 0, -1)
+local placed = {}
+local entries = {}
+for _, entry in ipairs(saved) do
+    if redis.call('ZSCORE', ranks, entry) then
+        placed[entry] = true
+        entries[#entries + 1] = entry
+    end
+end
+for _, entry in ipairs(current) do
+    if not placed[entry] then entries[#entries + 1] = entry end
+end
+
+local args = {}
+for i, entry in ipairs(entries) do
+    args[#args + 1] = i - 1
+    args[#args + 1] = entry
+    if #args == 1000 or i == #entries then
+        redis.call('ZADD', ranks, unpack(args))
+        args = {}
+    end
+end
+redis.call('DEL', order)
+redis.call('HDEL', meta, 'shuffle')
+publish({op = 'unshuffle'})
+
+redis.call('EXPIRE', ranks, ttl)
+redis.call('EXPIRE', meta, ttl)
+return 'OK'
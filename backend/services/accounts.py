@@ -9,6 +9,9 @@ from dto.accounts import (
     PlaylistID,
     NewPlaylist,
     PlaylistTrack,
+    PlaylistTrackPosition,
+    PlaylistTracks,
+    PlaylistTrackResult,
     UserSearchParams,
     SubscribersCount,
     PlaylistSearchParams,
@@ -20,18 +23,27 @@ from dto.accounts import (
     ArtistSearchParams,
     UpdateUserRole,
     PlaylistTrackSearchParams,
+    ArtistPage,
+    ArtistPageParams,
 )
-from dto.music import AlbumSearchParams, TrackSearchParams, AlbumID, TrackID
+from dto.search import SuggestEntry, SuggestKind
 from repositories.interfaces import (
     IUserRepository,
     IPlaylistRepository,
     IMusicFileRepository,
     IAlbumRepository,
     ITrackRepository,
+    ISuggestRepository,
 )
-from exceptions.music import ImageFileNotFoundException
-from exceptions.accounts import PlaylistFavDeletion
+from exceptions.accounts import (
+    PlaylistFavDeletion,
+    PlaylistNotFoundException,
+    UserNotFoundException,
+)
+from services.cache import ResultCache
+from services.file_outbox import FileOutboxWorker
 
+import asyncio
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from passlib.context import CryptContext
@@ -46,6 +58,10 @@ class AccountService:
     music_file_repository: IMusicFileRepository
     album_repository: IAlbumRepository
     track_repository: ITrackRepository
+    search_cache: ResultCache
+    entity_cache: ResultCache
+    suggest_repository: ISuggestRepository
+    file_outbox_worker: FileOutboxWorker
 
     def __init__(
         self,
@@ -54,6 +70,10 @@ class AccountService:
         music_file_repository: IMusicFileRepository,
         album_repository: IAlbumRepository,
         track_repository: ITrackRepository,
+        search_cache: ResultCache,
+        entity_cache: ResultCache,
+        suggest_repository: ISuggestRepository,
+        file_outbox_worker: FileOutboxWorker,
     ) -> None:
         self.pwd_context = CryptContext(
             schemes=["bcrypt"], bcrypt__rounds=12, deprecated="auto"
@@ -63,6 +83,10 @@ class AccountService:
         self.music_file_repository = music_file_repository
         self.album_repository = album_repository
         self.track_repository = track_repository
+        self.search_cache = search_cache
+        self.entity_cache = entity_cache
+        self.suggest_repository = suggest_repository
+        self.file_outbox_worker = file_outbox_worker
 
     async def create_user(
         self,
@@ -77,15 +101,47 @@ class AccountService:
             await self.music_file_repository.save_image(
                 user, image_data, image_content_type
             )
+        self.search_cache.invalidate("artists")
+        await self.suggest_repository.add(
+            SuggestEntry(kind=SuggestKind.artist, id=user.id, name=user.name)
+        )
         return user
 
     async def get_user(self, user_id: UserID) -> User:
-        return await self.user_repository.get_user_by_id(user_id)
+        user_id = UserID(id=user_id.id)
+        return await self.entity_cache.get_or_load(
+            "user",
+            user_id,
+            lambda: self.user_repository.get_user_by_id(user_id),
+            negative=(UserNotFoundException,),
+            id=user_id.id,
+        )
 
     async def get_user_artist(self, user_id: UserID) -> Artist:
-        user = await self.user_repository.get_user_by_id(user_id)
+        user = await self.get_user(user_id)
         return Artist.model_validate(user.model_dump())
 
+    async def get_artist_page(self, params: ArtistPageParams) -> ArtistPage:
+        return await self.entity_cache.get_or_load(
+            "artist_page",
+            params,
+            lambda: self._get_artist_page(params),
+            negative=(UserNotFoundException,),
+            id=params.id,
+        )
+
+    async def _get_artist_page(self, params: ArtistPageParams) -> ArtistPage:
+        user, albums, tracks = await asyncio.gather(
+            self.user_repository.get_user_by_id(UserID(id=params.id)),
+            self.album_repository.get_artist_albums(params),
+            self.track_repository.get_artist_tracks(params),
+        )
+        return ArtistPage(
+            artist=Artist.model_validate(user.model_dump()),
+            albums=albums,
+            latest_tracks=tracks,
+        )
+
     async def get_user_image(self, user_id: UserID) -> bytes:
         await self.user_repository.get_user_by_id(user_id)
         return await self.music_file_repository.get_image(user_id)
@@ -97,18 +153,38 @@ class AccountService:
         return await self.user_repository.get_users(params)
 
     async def get_users_artists(self, params: ArtistSearchParams) -> list[Artist]:
+        return await self.search_cache.get_or_load(
+            "artists",
+            params,
+            lambda: self._get_users_artists(params),
+            negative=(UserNotFoundException,),
+        )
+
+    async def _get_users_artists(self, params: ArtistSearchParams) -> list[Artist]:
         users = await self.user_repository.get_users(
             UserSearchParams.model_validate(params.model_dump())
         )
         return [Artist.model_validate(u.model_dump()) for u in users]
 
     async def update_user(self, user: UpdateUser) -> User:
-        return await self.user_repository.update_user(
+        updated = await self.user_repository.update_user(
             UpdateUserRole.model_validate(user.model_dump())
         )
+        self.search_cache.invalidate("artists")
+        self.entity_cache.invalidate("user", "artist_page", ids=[updated.id])
+        await self.suggest_repository.add(
+            SuggestEntry(kind=SuggestKind.artist, id=updated.id, name=updated.name)
+        )
+        return updated
 
     async def update_user_with_role(self, user: UpdateUserRole) -> User:
-        return await self.user_repository.update_user(user)
+        updated = await self.user_repository.update_user(user)
+        self.search_cache.invalidate("artists")
+        self.entity_cache.invalidate("user", "artist_page", ids=[updated.id])
+        await self.suggest_repository.add(
+            SuggestEntry(kind=SuggestKind.artist, id=updated.id, name=updated.name)
+        )
+        return updated
 
     async def update_user_image(
         self,
@@ -122,38 +198,21 @@ class AccountService:
         )
 
     async def delete_user(self, user_id: UserID) -> None:
-        playlists = await self.get_playlists(
-            PlaylistSearchParams(author_id=user_id.id, limit=10000)
-        )
-        for playlist in playlists:
-            await self.playlist_repository.delete_playlist(PlaylistID(id=playlist.id))
-            try:
-                await self.music_file_repository.delete_image(
-                    PlaylistID(id=playlist.id)
-                )
-            except ImageFileNotFoundException:
-                pass
-
-        albums = await self.album_repository.get_albums(
-            AlbumSearchParams(artist_id=user_id.id, limit=10000)
+        deleted = await self.user_repository.delete_user(user_id)
+        self.file_outbox_worker.notify()
+        self.search_cache.invalidate("artists", "albums", "tracks", "playlists")
+        # the follower counters of everyone the user followed change as well
+        self.entity_cache.invalidate("user", "artist_page")
+        self.entity_cache.invalidate("album", ids=deleted.album_ids)
+        self.entity_cache.invalidate(
+            "track", "track_stats", ids=[track.id for track in deleted.tracks]
         )
-        for album in albums:
-            tracks = await self.track_repository.get_tracks(
-                TrackSearchParams(album_id=album.id, limit=10000)
-            )
-            for track in tracks:
-                await self.music_file_repository.delete_track(track)
-                await self.track_repository.delete_track(TrackID(id=track.id))
-            try:
-                await self.music_file_repository.delete_image(AlbumID(id=album.id))
-            except ImageFileNotFoundException:
-                pass
-
-        await self.user_repository.delete_user(user_id)
-        try:
-            await self.music_file_repository.delete_image(user_id)
-        except ImageFileNotFoundException:
-            pass
+        self.entity_cache.invalidate("playlist", ids=deleted.playlist_ids)
+        for track in deleted.tracks:
+            await self.suggest_repository.remove(SuggestKind.track, track.id)
+        for album_id in deleted.album_ids:
+            await self.suggest_repository.remove(SuggestKind.album, album_id)
+        await self.suggest_repository.remove(SuggestKind.artist, user_id.id)
 
     async def delete_user_image(self, user_id: UserID) -> None:
         await self.user_repository.get_user_by_id(user_id)
@@ -197,9 +256,18 @@ class AccountService:
 
     async def subscribe_to(self, subscribe: Subscribe) -> None:
         await self.user_repository.subscribe_to(subscribe)
+        # artist search results carry the follower counters
+        self.search_cache.invalidate("artists")
+        self.entity_cache.invalidate(
+            "user", "artist_page", ids=[subscribe.subscriber_id, subscribe.artist_id]
+        )
 
     async def unsubscribe_from(self, subscribe: Subscribe) -> None:
         await self.user_repository.unsubscribe_from(subscribe)
+        self.search_cache.invalidate("artists")
+        self.entity_cache.invalidate(
+            "user", "artist_page", ids=[subscribe.subscriber_id, subscribe.artist_id]
+        )
 
     async def get_subscriptions(self, params: SubscribeSearchParams) -> list[Artist]:
         users = await self.user_repository.get_subscriptions(params)
@@ -225,20 +293,39 @@ class AccountService:
             await self.music_file_repository.save_image(
                 playlist, image_data, image_content_type
             )
+        self.search_cache.invalidate("playlists")
         return playlist
 
-    async def get_playlist(self, playlist_id: PlaylistID) -> Playlist:
-        return await self.playlist_repository.get_playlist_by_id(playlist_id)
+    async def get_playlist(
+        self, playlist_id: PlaylistID, cached: bool = True
+    ) -> Playlist:
+        if not cached:
+            return await self.playlist_repository.get_playlist_by_id(playlist_id)
+        return await self.entity_cache.get_or_load(
+            "playlist",
+            playlist_id,
+            lambda: self.playlist_repository.get_playlist_by_id(playlist_id),
+            negative=(PlaylistNotFoundException,),
+            id=playlist_id.id,
+        )
 
     async def get_playlists(self, params: PlaylistSearchParams) -> list[Playlist]:
-        return await self.playlist_repository.get_playlists(params)
+        return await self.search_cache.get_or_load(
+            "playlists",
+            params,
+            lambda: self.playlist_repository.get_playlists(params),
+            negative=(UserNotFoundException,),
+        )
 
     async def get_playlist_image(self, playlist_id: PlaylistID) -> bytes:
         await self.playlist_repository.get_playlist_by_id(playlist_id)
         return await self.music_file_repository.get_image(playlist_id)
 
     async def update_playlist(self, playlist: UpdatePlaylist) -> Playlist:
-        return await self.playlist_repository.update_playlist(playlist)
+        updated = await self.playlist_repository.update_playlist(playlist)
+        self.search_cache.invalidate("playlists")
+        self.entity_cache.invalidate("playlist", ids=[updated.id])
+        return updated
 
     async def update_playlist_image(
         self,
@@ -256,10 +343,9 @@ class AccountService:
         if playlist.name == "fav":
             raise PlaylistFavDeletion("Deletion of favorite playlist")
         await self.playlist_repository.delete_playlist(playlist_id)
-        try:
-            await self.music_file_repository.delete_image(playlist_id)
-        except ImageFileNotFoundException:
-            pass
+        self.file_outbox_worker.notify()
+        self.search_cache.invalidate("playlists")
+        self.entity_cache.invalidate("playlist", ids=[playlist_id.id])
 
     async def delete_playlist_image(self, playlist_id: PlaylistID) -> None:
         await self.playlist_repository.get_playlist_by_id(playlist_id)
@@ -268,12 +354,29 @@ class AccountService:
     # === PlaylistTrack-related methods ===
 
     async def add_track_to_playlist(
-        self, playlist_track: PlaylistTrack
+        self, playlist_track: PlaylistTrackPosition
     ) -> PlaylistTrack:
         return await self.playlist_repository.add_track_to_playlist(playlist_track)
 
+    async def move_track_in_playlist(
+        self, playlist_track: PlaylistTrackPosition
+    ) -> PlaylistTrack:
+        return await self.playlist_repository.move_track_in_playlist(playlist_track)
+
     async def get_tracks_by_playlist(self, params: PlaylistTrackSearchParams):
         return await self.playlist_repository.get_tracks_by_playlist(params)
 
     async def remove_track_from_playlist(self, playlist_track: PlaylistTrack) -> None:
         await self.playlist_repository.remove_track_from_playlist(playlist_track)
+
+    async def add_tracks_to_playlist(
+        self, playlist_tracks: PlaylistTracks
+    ) -> list[PlaylistTrackResult]:
+        return await self.playlist_repository.add_tracks_to_playlist(playlist_tracks)
+
+    async def remove_tracks_from_playlist(
+        self, playlist_tracks: PlaylistTracks
+    ) -> list[PlaylistTrackResult]:
+        return await self.playlist_repository.remove_tracks_from_playlist(
+            playlist_tracks
+        )
@@ -0,0 +1,263 @@
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, TypeVar
+
+from pydantic import BaseModel
+
+from configs.logger import logger
+from configs.metrics import result_cache_requests, result_cache_entries
+from dto.cache import CacheInvalidation
+from repositories.interfaces import ICacheEventsRepository
+
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    value: Any = None
+    error: Exception | None = None
+
+
+class ResultCache:
+    """
+    short-lived in-process cache for search results and single entities.
+
+    entries are keyed by a namespace and a canonical hash of the search params,
+    empty results and "not found" errors are cached with a separate (shorter) ttl,
+    and concurrent lookups of the same key share a single load.
+
+    the cache lives in one process: with several backend replicas each holds its
+    own entries. `invalidate` clears the local replica and hands the change to
+    `on_invalidate`, which `CacheBroadcaster` uses to clear the other ones
+    """
+
+    def __init__(
+        self, name: str, ttl_sec: float, negative_ttl_sec: float, max_entries: int
+    ):
+        self.name = name
+        self.ttl_sec = ttl_sec
+        self.negative_ttl_sec = negative_ttl_sec
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._generations: dict[str, int] = {}
+        # keys cached or loading for one entity, so it can be dropped on its own
+        self._keys_by_id: dict[tuple[str, int], set[str]] = {}
+        self._owners: dict[str, tuple[str, int]] = {}
+        self.on_invalidate: Callable[[str, list[int] | None], None] | None = None
+
+    @staticmethod
+    def _normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            return " ".join(value.split()).lower()
+        return value
+
+    def _key(self, namespace: str, params: BaseModel) -> str:
+        canonical = json.dumps(
+            {
+                field: self._normalize(value)
+                for field, value in params.model_dump(mode="json").items()
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        digest = hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{namespace}:{self._generations.get(namespace, 0)}:{digest}"
+
+    def _own(self, key: str, owner: tuple[str, int]) -> None:
+        self._owners[key] = owner
+        self._keys_by_id.setdefault(owner, set()).add(key)
+
+    def _disown(self, key: str) -> None:
+        owner = self._owners.pop(key, None)
+        if owner is None:
+            return
+        keys = self._keys_by_id[owner]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_id[owner]
+
+    def _store(self, key: str, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            if evicted not in self._inflight:
+                self._disown(evicted)
+        result_cache_entries.labels(self.name).set(len(self._entries))
+
+    async def _load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[T]],
+        negative: tuple[type[Exception], ...],
+    ) -> T:
+        try:
+            value = await loader()
+        except negative as e:
+            if self._inflight.get(key) is asyncio.current_task():
+                self._store(
+                    key, _Entry(time.monotonic() + self.negative_ttl_sec, error=e)
+                )
+            raise
+        # an invalidation during the load drops it from `_inflight`, what it
+        # read may be older than the change, so it is not stored
+        if self._inflight.get(key) is asyncio.current_task():
+            ttl = self.ttl_sec if value else self.negative_ttl_sec
+            self._store(key, _Entry(time.monotonic() + ttl, value=value))
+        return value
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        params: BaseModel,
+        loader: Callable[[], Awaitable[T]],
+        negative: tuple[type[Exception], ...] = (),
+        id: int | None = None,
+    ) -> T:
+        """`id` names the entity the result belongs to, for `invalidate(ids=...)`"""
+        key = self._key(namespace, params)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                if entry.error is not None:
+                    result_cache_requests.labels(
+                        self.name, namespace, "negative_hit"
+                    ).inc()
+                    raise type(entry.error)(*entry.error.args)
+                result_cache_requests.labels(self.name, namespace, "hit").inc()
+                return entry.value
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            result_cache_requests.labels(self.name, namespace, "miss").inc()
+            task = asyncio.ensure_future(self._load(key, loader, negative))
+            self._inflight[key] = task
+            if id is not None:
+                self._own(key, (namespace, id))
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            result_cache_requests.labels(self.name, namespace, "coalesced").inc()
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if key not in self._entries and key not in self._inflight:
+            self._disown(key)
+        if not task.cancelled():
+            task.exception()
+
+    def invalidate_local(self, namespace: str, ids: list[int] | None = None) -> None:
+        if ids is None:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            return
+        for id in ids:
+            for key in self._keys_by_id.pop((namespace, id), ()):
+                del self._owners[key]
+                self._entries.pop(key, None)
+                self._inflight.pop(key, None)
+        result_cache_entries.labels(self.name).set(len(self._entries))
+
+    def invalidate(
+        self, *namespaces: str, ids: Iterable[int | None] | None = None
+    ) -> None:
+        """
+        drops `namespaces` as a whole, or only the entries of `ids` in them,
+        None ids (an unset artist, say) have no entries and are skipped
+        """
+        if ids is not None:
+            ids = [id for id in dict.fromkeys(ids) if id is not None]
+            if not ids:
+                return
+        for namespace in namespaces:
+            self.invalidate_local(namespace, ids)
+            if self.on_invalidate is not None:
+                self.on_invalidate(namespace, ids)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._inflight.clear()
+        self._keys_by_id.clear()
+        self._owners.clear()
+        result_cache_entries.labels(self.name).set(0)
+
+
+class CacheBroadcaster:
+    """
+    keeps the caches of all replicas in step: invalidations are published in
+    the background right after they happen locally, and the ones of the other
+    replicas are applied as they arrive. a replica that (re)connects clears its
+    caches, as it may have missed some
+    """
+
+    def __init__(
+        self,
+        cache_events_repository: ICacheEventsRepository,
+        caches: list[ResultCache],
+        retry_delay_sec: float,
+    ):
+        self.cache_events_repository = cache_events_repository
+        self.caches = {cache.name: cache for cache in caches}
+        self.retry_delay_sec = retry_delay_sec
+        self.origin = uuid.uuid4().hex
+        self._pending: list[CacheInvalidation] = []
+        self._published = asyncio.Event()
+        for cache in caches:
+            cache.on_invalidate = self._queue(cache.name)
+
+    def _queue(self, cache: str) -> Callable[[str, list[int] | None], None]:
+        def queue(namespace: str, ids: list[int] | None) -> None:
+            self._pending.append(
+                CacheInvalidation(
+                    origin=self.origin, cache=cache, namespace=namespace, ids=ids
+                )
+            )
+            self._published.set()
+
+        return queue
+
+    def apply(self, event: CacheInvalidation | None) -> None:
+        if event is None:
+            for cache in self.caches.values():
+                cache.clear()
+            return
+        cache = self.caches.get(event.cache)
+        if cache is not None and event.origin != self.origin:
+            cache.invalidate_local(event.namespace, event.ids)
+
+    async def publish(self) -> None:
+        events, self._pending = self._pending, []
+        if not events:
+            return
+        try:
+            await self.cache_events_repository.publish(events)
+        except BaseException:
+            self._pending[:0] = events
+            raise
+
+    async def run(self) -> None:
+        while True:
+            await self._published.wait()
+            self._published.clear()
+            try:
+                await self.publish()
+            except Exception as e:
+                logger.warning("failed to publish cache invalidations: %s", e)
+                await asyncio.sleep(self.retry_delay_sec)
+                self._published.set()
+
+    async def run_listener(self) -> None:
+        await self.cache_events_repository.run_listener(
+            self.apply, self.retry_delay_sec
+        )
@@ -0,0 +1,78 @@
+import asyncio
+
+from configs.logger import logger
+from configs.metrics import file_outbox_backlog, file_outbox_files
+from repositories.interfaces import IFileOutboxRepository, IMusicFileRepository
+
+
+class FileOutboxWorker:
+    """
+    removes files of deleted catalog rows in the background.
+
+    the rows are queued into the outbox by the same statement that deletes them,
+    the worker claims due ones in batches of `batch_size` once notified or every
+    `interval_sec` and removes their files with bulk requests. claims skip locked
+    rows, so any number of replicas can drain the outbox at once
+    """
+
+    def __init__(
+        self,
+        file_outbox_repository: IFileOutboxRepository,
+        music_file_repository: IMusicFileRepository,
+        batch_size: int,
+        interval_sec: float,
+    ):
+        self.file_outbox_repository = file_outbox_repository
+        self.music_file_repository = music_file_repository
+        self.batch_size = batch_size
+        self.interval_sec = interval_sec
+        self._wakeup = asyncio.Event()
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def drain(self) -> None:
+        while True:
+            entries = await self.file_outbox_repository.claim(self.batch_size)
+            if not entries:
+                return
+
+            owners: dict[tuple[str, str], list[int]] = {}
+            files = []
+            for entry in entries:
+                file = self.music_file_repository.file_key(entry.catalog)
+                key = (file.kind.value, file.name)
+                if key not in owners:
+                    owners[key] = []
+                    files.append(file)
+                owners[key].append(entry.id)
+
+            failed = await self.music_file_repository.delete_files(files)
+            for file in failed:
+                owners.pop((file.kind.value, file.name), None)
+            await self.file_outbox_repository.complete(
+                [id for ids in owners.values() for id in ids]
+            )
+            file_outbox_files.labels("removed").inc(len(files) - len(failed))
+            if failed:
+                file_outbox_files.labels("failed").inc(len(failed))
+                logger.warning("failed to remove files, will retry: %s", failed)
+
+            if len(entries) < self.batch_size:
+                return
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval_sec)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.drain()
+                backlog = await self.file_outbox_repository.backlog()
+            except Exception as e:
+                logger.warning("failed to drain the file outbox: %s", e)
+                continue
+            file_outbox_backlog.labels("pending").set(backlog.pending)
+            file_outbox_backlog.labels("exhausted").set(backlog.exhausted)
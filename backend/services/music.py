@@ -3,10 +3,12 @@ from repositories.interfaces import (
     IAlbumRepository,
     ITrackRepository,
     IGenreRepository,
+    ISuggestRepository,
 )
 from dto.music import (
     TrackStream,
     Track,
+    MusicFileStats,
     Album,
     NewAlbum,
     NewTrack,
@@ -22,12 +24,19 @@ from dto.music import (
     UpdateAlbum,
     UpdateTrack,
     UpdateGenre,
+    DeletedCatalog,
 )
+from dto.search import SuggestEntry, SuggestKind
 from exceptions.music import (
     InvalidStartException,
-    ImageFileNotFoundException,
     AlbumNotFoundException,
+    GenreNotFoundException,
+    TrackNotFoundException,
+    MusicFileNotFoundException,
 )
+from exceptions.accounts import UserNotFoundException
+from services.cache import ResultCache
+from services.file_outbox import FileOutboxWorker
 
 
 class MusicService:
@@ -35,6 +44,10 @@ class MusicService:
     track_repository: ITrackRepository
     album_repository: IAlbumRepository
     genre_repository: IGenreRepository
+    search_cache: ResultCache
+    entity_cache: ResultCache
+    suggest_repository: ISuggestRepository
+    file_outbox_worker: FileOutboxWorker
 
     def __init__(
         self,
@@ -42,11 +55,19 @@ class MusicService:
         track_repository: ITrackRepository,
         album_repository: IAlbumRepository,
         genre_repository: IGenreRepository,
+        search_cache: ResultCache,
+        entity_cache: ResultCache,
+        suggest_repository: ISuggestRepository,
+        file_outbox_worker: FileOutboxWorker,
     ) -> None:
         self.music_file_repository = music_file_repository
         self.track_repository = track_repository
         self.album_repository = album_repository
         self.genre_repository = genre_repository
+        self.search_cache = search_cache
+        self.entity_cache = entity_cache
+        self.suggest_repository = suggest_repository
+        self.file_outbox_worker = file_outbox_worker
 
     # Track
     async def create_track_single(
@@ -71,6 +92,16 @@ class MusicService:
             await self.music_file_repository.save_image(
                 album, image_data, image_content_type
             )
+        self.search_cache.invalidate("tracks", "albums")
+        self.entity_cache.invalidate("artist_page", ids=[track.artist_id])
+        # a lookup of the id before the file was stored may have cached a 404
+        self.entity_cache.invalidate("track", "track_stats", ids=[track.id])
+        await self.suggest_repository.add(
+            SuggestEntry(kind=SuggestKind.album, id=album.id, name=album.name)
+        )
+        await self.suggest_repository.add(
+            SuggestEntry(kind=SuggestKind.track, id=track.id, name=track.name)
+        )
         return track
 
     async def create_track_to_album(
@@ -83,13 +114,22 @@ class MusicService:
         await self.music_file_repository.save_track(
             track, track_data, track_content_type
         )
+        self.search_cache.invalidate("tracks")
+        self.entity_cache.invalidate("artist_page", ids=[track.artist_id])
+        # a lookup of the id before the file was stored may have cached a 404
+        self.entity_cache.invalidate("track", "track_stats", ids=[track.id])
+        await self.suggest_repository.add(
+            SuggestEntry(kind=SuggestKind.track, id=track.id, name=track.name)
+        )
         return track
 
     async def stream_track(
         self, track_id: TrackID, start: int | None = None, end: int | None = None
     ) -> TrackStream:
-        track = await self.track_repository.get_track_by_id(track_id)
-        stats = await self.music_file_repository.get_track_stats(track)
+        # cached, so a track warmed by the queue prefetch starts without lookups.
+        # file changes invalidate the size on every replica
+        track = await self.get_track(track_id)
+        stats = await self.get_track_stats(track)
 
         file_byte_size = stats.size
 
@@ -106,18 +146,55 @@ class MusicService:
 
         return TrackStream(stream, start, end, file_byte_size, content_length)
 
-    async def get_track(self, track_id: TrackID) -> Track:
-        return await self.track_repository.get_track_by_id(track_id)
+    async def get_track(self, track_id: TrackID, cached: bool = True) -> Track:
+        if not cached:
+            return await self.track_repository.get_track_by_id(track_id)
+        return await self.entity_cache.get_or_load(
+            "track",
+            track_id,
+            lambda: self.track_repository.get_track_by_id(track_id),
+            negative=(TrackNotFoundException,),
+            id=track_id.id,
+        )
+
+    async def get_track_stats(
+        self, track: Track, cached: bool = True
+    ) -> MusicFileStats:
+        if not cached:
+            return await self.music_file_repository.get_track_stats(track)
+        return await self.entity_cache.get_or_load(
+            "track_stats",
+            TrackID(id=track.id),
+            lambda: self.music_file_repository.get_track_stats(track),
+            negative=(MusicFileNotFoundException,),
+            id=track.id,
+        )
 
     async def get_tracks(self, params: TrackSearchParams) -> list[Track]:
-        return await self.track_repository.get_tracks(params)
+        return await self.search_cache.get_or_load(
+            "tracks",
+            params,
+            lambda: self.track_repository.get_tracks(params),
+            negative=(
+                UserNotFoundException,
+                AlbumNotFoundException,
+                GenreNotFoundException,
+            ),
+        )
 
     async def get_track_image(self, track_id: TrackID) -> bytes:
         track = await self.track_repository.get_track_by_id(track_id)
         return await self.music_file_repository.get_image(AlbumID(id=track.album_id))
 
     async def update_track(self, track: UpdateTrack) -> Track:
-        return await self.track_repository.update_track(track)
+        updated = await self.track_repository.update_track(track)
+        self.search_cache.invalidate("tracks")
+        self.entity_cache.invalidate("track", "track_stats", ids=[updated.id])
+        self._forget_artist_page(updated.artist_id, track.artist_id is not None)
+        await self.suggest_repository.add(
+            SuggestEntry(kind=SuggestKind.track, id=updated.id, name=updated.name)
+        )
+        return updated
 
     async def update_track_image(
         self, track_id: TrackID, image_data: bytes, image_content_type: str
@@ -134,19 +211,35 @@ class MusicService:
         await self.music_file_repository.save_track(
             track, track_data, track_content_type
         )
+        self.entity_cache.invalidate("track_stats", ids=[track.id])
+
+    def _forget_artist_page(self, artist_id: int, artist_changed: bool) -> None:
+        if artist_changed:
+            # the previous artist's page is unknown here
+            self.entity_cache.invalidate("artist_page")
+        else:
+            self.entity_cache.invalidate("artist_page", ids=[artist_id])
+
+    async def _forget_deleted(
+        self, deleted: DeletedCatalog, artist_ids: list[int | None] = []
+    ) -> None:
+        self.file_outbox_worker.notify()
+        self.search_cache.invalidate("tracks", "albums")
+        track_ids = [track.id for track in deleted.tracks]
+        self.entity_cache.invalidate("track", "track_stats", ids=track_ids)
+        self.entity_cache.invalidate("album", ids=deleted.album_ids)
+        self.entity_cache.invalidate(
+            "artist_page",
+            ids=artist_ids + [track.artist_id for track in deleted.tracks],
+        )
+        for track in deleted.tracks:
+            await self.suggest_repository.remove(SuggestKind.track, track.id)
+        for album_id in deleted.album_ids:
+            await self.suggest_repository.remove(SuggestKind.album, album_id)
 
     async def delete_track(self, track_id: TrackID) -> None:
-        track = await self.track_repository.get_track_by_id(track_id)
-        await self.music_file_repository.delete_track(track)
-        tracks = await self.get_tracks(TrackSearchParams(album_id=track.album_id))
-        if len(tracks) == 1:
-            try:
-                await self.music_file_repository.delete_image(
-                    AlbumID(id=track.album_id)
-                )
-            except ImageFileNotFoundException:
-                pass
-        await self.track_repository.delete_track(track_id)
+        deleted = await self.track_repository.delete_track(track_id)
+        await self._forget_deleted(deleted)
 
     async def delete_track_image(self, track_id: TrackID) -> None:
         track = await self.track_repository.get_track_by_id(track_id)
@@ -164,20 +257,45 @@ class MusicService:
             await self.music_file_repository.save_image(
                 album, image_data, image_content_type
             )
+        self.search_cache.invalidate("albums")
+        self.entity_cache.invalidate("artist_page", ids=[album.artist_id])
+        await self.suggest_repository.add(
+            SuggestEntry(kind=SuggestKind.album, id=album.id, name=album.name)
+        )
         return album
 
-    async def get_album(self, album_id: AlbumID) -> Album:
-        return await self.album_repository.get_album_by_id(album_id)
+    async def get_album(self, album_id: AlbumID, cached: bool = True) -> Album:
+        if not cached:
+            return await self.album_repository.get_album_by_id(album_id)
+        return await self.entity_cache.get_or_load(
+            "album",
+            album_id,
+            lambda: self.album_repository.get_album_by_id(album_id),
+            negative=(AlbumNotFoundException,),
+            id=album_id.id,
+        )
 
     async def get_albums(self, params: AlbumSearchParams) -> list[Album]:
-        return await self.album_repository.get_albums(params)
+        return await self.search_cache.get_or_load(
+            "albums",
+            params,
+            lambda: self.album_repository.get_albums(params),
+            negative=(UserNotFoundException,),
+        )
 
     async def get_album_image(self, album_id: AlbumID) -> bytes:
         await self.album_repository.get_album_by_id(album_id)
         return await self.music_file_repository.get_image(album_id)
 
     async def update_album(self, album: UpdateAlbum) -> Album:
-        return await self.album_repository.update_album(album)
+        updated = await self.album_repository.update_album(album)
+        self.search_cache.invalidate("albums")
+        self.entity_cache.invalidate("album", ids=[updated.id])
+        self._forget_artist_page(updated.artist_id, album.artist_id is not None)
+        await self.suggest_repository.add(
+            SuggestEntry(kind=SuggestKind.album, id=updated.id, name=updated.name)
+        )
+        return updated
 
     async def update_album_image(
         self,
@@ -191,19 +309,9 @@ class MusicService:
         )
 
     async def delete_album(self, album_id: AlbumID) -> None:
-        tracks = await self.get_tracks(
-            TrackSearchParams(album_id=album_id.id, limit=10000)
-        )
-        for track in tracks:
-            await self.delete_track(track)
-        try:
-            await self.music_file_repository.delete_image(album_id)
-        except ImageFileNotFoundException:
-            pass
-        try:
-            await self.album_repository.delete_album(album_id)
-        except AlbumNotFoundException:
-            pass
+        album = await self.album_repository.get_album_by_id(album_id)
+        deleted = await self.album_repository.delete_album(album_id)
+        await self._forget_deleted(deleted, [album.artist_id])
 
     async def delete_album_image(self, album_id: AlbumID) -> None:
         await self.album_repository.get_album_by_id(album_id)
@@ -214,7 +322,11 @@ class MusicService:
         self,
         new_genre: NewGenre,
     ) -> Genre:
-        return await self.genre_repository.create_genre(new_genre)
+        genre = await self.genre_repository.create_genre(new_genre)
+        await self.suggest_repository.add(
+            SuggestEntry(kind=SuggestKind.genre, id=genre.id, name=genre.name)
+        )
+        return genre
 
     async def get_genre(self, genre_id: GenreID) -> Genre:
         return await self.genre_repository.get_genre_by_id(genre_id)
@@ -223,7 +335,14 @@ class MusicService:
         return await self.genre_repository.get_genres(params)
 
     async def update_genre(self, genre: UpdateGenre) -> Genre:
-        return await self.genre_repository.update_genre(genre)
+        updated = await self.genre_repository.update_genre(genre)
+        await self.suggest_repository.add(
+            SuggestEntry(kind=SuggestKind.genre, id=updated.id, name=updated.name)
+        )
+        return updated
 
     async def delete_genre(self, genre_id: GenreID) -> None:
         await self.genre_repository.delete_genre(genre_id)
+        self.search_cache.invalidate("tracks")
+        self.entity_cache.invalidate("track", "artist_page")
+        await self.suggest_repository.remove(SuggestKind.genre, genre_id.id)
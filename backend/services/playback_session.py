@@ -0,0 +1,94 @@
+import asyncio
+import datetime
+
+from configs.logger import logger
+from configs.metrics import playback_session_writes
+from dto.track_queue import PlaybackSession, PlaybackState
+from repositories.interfaces import IPlaybackSessionRepository, IUserActivityRepository
+
+
+class PlaybackSessionService:
+    """
+    keeps what each user plays right now.
+
+    updates only replace the user's entry in an in-process buffer, the latest
+    one wins. the buffer is written to redis every `flush_interval_sec` with
+    one pipeline, and sessions changed since the last compaction are stored as
+    `playhead` activities every `compaction_interval_sec`, in batches of
+    `compaction_batch_size`
+    """
+
+    def __init__(
+        self,
+        playback_session_repository: IPlaybackSessionRepository,
+        user_activity_repository: IUserActivityRepository,
+        flush_interval_sec: float,
+        compaction_interval_sec: float,
+        compaction_batch_size: int,
+    ):
+        self.playback_session_repository = playback_session_repository
+        self.user_activity_repository = user_activity_repository
+        self.flush_interval_sec = flush_interval_sec
+        self.compaction_interval_sec = compaction_interval_sec
+        self.compaction_batch_size = compaction_batch_size
+        self._pending: dict[int, PlaybackSession] = {}
+
+    def update(self, user_id: int, state: PlaybackState) -> None:
+        self._pending[user_id] = PlaybackSession(
+            user_id=user_id,
+            **state.model_dump(),
+            updated_at=datetime.datetime.now(),
+        )
+        playback_session_writes.labels("received").inc()
+
+    async def resume(self, user_id: int) -> PlaybackSession:
+        pending = self._pending.get(user_id)
+        if pending is not None:
+            return pending
+        return await self.playback_session_repository.get(user_id)
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        sessions, self._pending = self._pending, {}
+        try:
+            await self.playback_session_repository.save_many(list(sessions.values()))
+        except BaseException:
+            # cancelled or failed, newer updates that came in meanwhile win over the failed ones
+            for user_id, session in sessions.items():
+                self._pending.setdefault(user_id, session)
+            raise
+        playback_session_writes.labels("flushed").inc(len(sessions))
+
+    async def compact(self) -> None:
+        while True:
+            sessions = await self.playback_session_repository.take_changed(
+                self.compaction_batch_size
+            )
+            if sessions:
+                try:
+                    await self.user_activity_repository.add_playheads(sessions)
+                except BaseException:
+                    # taken off the changed set, so the next compaction retries them
+                    await self.playback_session_repository.return_changed(sessions)
+                    raise
+                playback_session_writes.labels("compacted").inc(len(sessions))
+            if len(sessions) < self.compaction_batch_size:
+                return
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        compacted_at = loop.time()
+        while True:
+            await asyncio.sleep(self.flush_interval_sec)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("failed to flush playback sessions: %s", e)
+            if loop.time() - compacted_at < self.compaction_interval_sec:
+                continue
+            compacted_at = loop.time()
+            try:
+                await self.compact()
+            except Exception as e:
+                logger.warning("failed to compact playback sessions: %s", e)
@@ -0,0 +1,12 @@
+from repositories.interfaces import ISuggestRepository
+from dto.search import SuggestEntry, SuggestParams
+
+
+class SearchService:
+    suggest_repository: ISuggestRepository
+
+    def __init__(self, suggest_repository: ISuggestRepository) -> None:
+        self.suggest_repository = suggest_repository
+
+    async def suggest(self, params: SuggestParams) -> list[SuggestEntry]:
+        return await self.suggest_repository.suggest(params)
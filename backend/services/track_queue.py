@@ -1,8 +1,26 @@
-from dto.music import TrackID
-from repositories.interfaces import ITrackQueueRepository
+import asyncio
+import random
+from typing import AsyncIterator
+
+from dto.accounts import PlaylistID
+from dto.music import AlbumID, Track, TrackID
+from exceptions.music import MusicFileNotFoundException, TrackNotFoundException
+from repositories.interfaces import (
+    IPlaylistRepository,
+    ITrackQueueRepository,
+    ITrackRepository,
+)
+from services.music import MusicService
 from dto.track_queue import (
+    BulkEnqueueParams,
     InQueueID,
+    PrefetchedTrack,
+    PrefetchParams,
+    QueueModes,
     QueueParameters,
+    QueuePrefetch,
+    QueueRepeat,
+    QueueShuffle,
     QueueSrcDestIDs,
     TrackInQueueIDs,
     TrackQueue,
@@ -11,9 +29,24 @@ from dto.track_queue import (
 
 class TrackQueueService:
     track_queue_repository: ITrackQueueRepository
+    track_repository: ITrackRepository
+    playlist_repository: IPlaylistRepository
+    music_service: MusicService
+    events_keepalive_sec: float
 
-    def __init__(self, track_queue_repository: ITrackQueueRepository) -> None:
+    def __init__(
+        self,
+        track_queue_repository: ITrackQueueRepository,
+        track_repository: ITrackRepository,
+        playlist_repository: IPlaylistRepository,
+        music_service: MusicService,
+        events_keepalive_sec: float,
+    ) -> None:
         self.track_queue_repository = track_queue_repository
+        self.track_repository = track_repository
+        self.playlist_repository = playlist_repository
+        self.music_service = music_service
+        self.events_keepalive_sec = events_keepalive_sec
 
     async def push_left(self, user_id: int, id: TrackID) -> None:
         return await self.track_queue_repository.push_left(user_id, id)
@@ -21,9 +54,59 @@ class TrackQueueService:
     async def push_right(self, user_id: int, id: TrackID) -> None:
         return await self.track_queue_repository.push_right(user_id, id)
 
+    async def enqueue_album(
+        self, user_id: int, album_id: AlbumID, params: BulkEnqueueParams
+    ) -> None:
+        track_ids = await self.track_repository.get_album_track_ids(album_id)
+        await self.track_queue_repository.push_many(user_id, track_ids, params)
+
+    async def enqueue_playlist(
+        self, user_id: int, playlist_id: PlaylistID, params: BulkEnqueueParams
+    ) -> None:
+        track_ids = await self.playlist_repository.get_playlist_track_ids(playlist_id)
+        await self.track_queue_repository.push_many(user_id, track_ids, params)
+
+    async def enqueue_tracks(
+        self, user_id: int, track_ids: list[int], params: BulkEnqueueParams
+    ) -> None:
+        existing = await self.track_repository.get_existing_track_ids(track_ids)
+        missing = [id for id in dict.fromkeys(track_ids) if id not in existing]
+        if missing:
+            raise TrackNotFoundException(f"Tracks {missing} not found")
+        await self.track_queue_repository.push_many(user_id, track_ids, params)
+
     async def list(self, user_id: int, params: QueueParameters) -> TrackQueue:
         return await self.track_queue_repository.list(user_id, params)
 
+    async def _prefetch_track(
+        self, track_id: int, cached: bool
+    ) -> tuple[Track, int] | None:
+        try:
+            track = await self.music_service.get_track(TrackID(id=track_id), cached)
+            stats = await self.music_service.get_track_stats(track, cached)
+        except (TrackNotFoundException, MusicFileNotFoundException):
+            return None
+        return track, stats.size
+
+    async def prefetch(self, user_id: int, params: PrefetchParams) -> QueuePrefetch:
+        queue = await self.track_queue_repository.list(
+            user_id, QueueParameters(offset=0, limit=params.limit)
+        )
+        # a track queued twice is looked up once
+        track_ids = list(dict.fromkeys(queue.track_ids))
+        found = await asyncio.gather(
+            *(self._prefetch_track(id, params.warm) for id in track_ids)
+        )
+        by_id = dict(zip(track_ids, found))
+        entries = []
+        for queue_id, track_id in enumerate(queue.track_ids):
+            if by_id[track_id] is not None:
+                track, size = by_id[track_id]
+                entries.append(
+                    PrefetchedTrack(queue_id=queue_id, track=track, size=size)
+                )
+        return QueuePrefetch(entries=entries, version=queue.version)
+
     async def delete(self, user_id: int) -> None:
         return await self.track_queue_repository.delete(user_id)
 
@@ -35,3 +118,36 @@ class TrackQueueService:
 
     async def remove(self, user_id: int, queue_id: InQueueID) -> None:
         return await self.track_queue_repository.remove(user_id, queue_id)
+
+    async def shuffle(self, user_id: int, params: QueueShuffle) -> None:
+        if params.seed is None:
+            params = QueueShuffle(seed=random.randrange(2**31))
+        return await self.track_queue_repository.shuffle(user_id, params)
+
+    async def unshuffle(self, user_id: int) -> None:
+        return await self.track_queue_repository.unshuffle(user_id)
+
+    async def set_repeat(self, user_id: int, params: QueueRepeat) -> None:
+        return await self.track_queue_repository.set_repeat(user_id, params)
+
+    async def get_modes(self, user_id: int) -> QueueModes:
+        return await self.track_queue_repository.get_modes(user_id)
+
+    async def next(self, user_id: int) -> TrackID:
+        return await self.track_queue_repository.next(user_id)
+
+    async def events(self, user_id: int) -> AsyncIterator[str | None]:
+        """
+        changes of the user's queue as they happen. none once subscribed and
+        after `events_keepalive_sec` of silence so the stream can be kept open
+        """
+        queue = self.track_queue_repository.subscribe(user_id)
+        try:
+            yield None
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), self.events_keepalive_sec)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self.track_queue_repository.unsubscribe(user_id, queue)
@@ -1,24 +1,73 @@
-from typing import Optional
+from typing import Any, Optional
+
+from pydantic import TypeAdapter, ValidationError
 
 from repositories.interfaces import IUserActivityRepository
+from services.user_activity_buffer import UserActivityBuffer
 from dto.user_activity import (
     UserActivity,
+    UserActivityBatchError,
+    UserActivityBatchPost,
+    UserActivityBatchResult,
     UserActivityFilter,
     UserActivityPost,
 )
 
 
+USER_ACTIVITY_BATCH = TypeAdapter(list[UserActivityBatchPost])
+USER_ACTIVITY_BATCH_ITEM = TypeAdapter(UserActivityBatchPost)
+
+
 class UserActivityService:
     user_activity_repository: IUserActivityRepository
+    buffer: UserActivityBuffer | None
 
     def __init__(
         self,
         user_activity_repository: IUserActivityRepository,
+        buffer: UserActivityBuffer | None,
     ) -> None:
         self.user_activity_repository = user_activity_repository
+        self.buffer = buffer
 
     async def add(self, user_activity: UserActivityPost) -> UserActivity:
-        return await self.user_activity_repository.add(user_activity)
+        """with a buffer the activity is only queued, it is stored by a later flush"""
+        if self.buffer is None:
+            return await self.user_activity_repository.add(user_activity)
+        prepared = self.user_activity_repository.prepare(user_activity)
+        await self.buffer.put(prepared)
+        return prepared
+
+    async def add_many(self, items: list[Any]) -> UserActivityBatchResult:
+        errors = {}
+        try:
+            # the whole batch at once, item by item only when some are invalid
+            valid = list(enumerate(USER_ACTIVITY_BATCH.validate_python(items)))
+        except ValidationError:
+            valid = []
+            for index, item in enumerate(items):
+                try:
+                    valid.append(
+                        (index, USER_ACTIVITY_BATCH_ITEM.validate_python(item))
+                    )
+                except ValidationError as e:
+                    errors[index] = "; ".join(
+                        f"{'.'.join(map(str, error['loc'])) or 'item'}: {error['msg']}"
+                        for error in e.errors(include_url=False)
+                    )
+
+        failed = await self.user_activity_repository.add_many(
+            [user_activity for _, user_activity in valid]
+        )
+        for position, detail in failed.items():
+            errors[valid[position][0]] = detail
+        return UserActivityBatchResult(
+            inserted=len(valid) - len(failed),
+            errors=[
+                UserActivityBatchError(index=index, detail=detail)
+                for index, detail in sorted(errors.items())
+            ],
+        )
 
     async def get(self, id: int) -> UserActivity:
         return await self.user_activity_repository.get(id)
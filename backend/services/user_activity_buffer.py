@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Literal
+
+from configs.logger import logger
+from configs.metrics import (
+    user_activity_buffer_depth,
+    user_activity_buffer_events,
+    user_activity_buffer_flush_seconds,
+)
+from dto.user_activity import UserActivity
+from exceptions.user_activity import UserActivityBufferFullException
+from repositories.interfaces import IUserActivityRepository
+
+
+class UserActivityBuffer:
+    """
+    write-behind buffer of user activities.
+
+    activities are written with one unordered insert in batches of
+    `flush_size`, as soon as a batch is full or every `flush_interval_sec`.
+    at most `max_size` activities are held, flushing ones included. when full,
+    the `block` policy makes new ones wait up to `put_timeout_sec` for a flush
+    to free room and rejects them after that, the `drop` policy drops them at once.
+    a failed flush keeps its batch for the next one
+    """
+
+    def __init__(
+        self,
+        user_activity_repository: IUserActivityRepository,
+        max_size: int,
+        flush_size: int,
+        flush_interval_sec: float,
+        policy: Literal["block", "drop"],
+        put_timeout_sec: float,
+    ):
+        self.user_activity_repository = user_activity_repository
+        self.max_size = max_size
+        self.flush_size = flush_size
+        self.flush_interval_sec = flush_interval_sec
+        self.policy = policy
+        self.put_timeout_sec = put_timeout_sec
+        self._items: list[UserActivity] = []
+        self._flushing = 0
+        self._flush_needed = asyncio.Event()
+        self._room = asyncio.Event()
+        user_activity_buffer_depth.set_function(lambda: self.depth)
+
+    @property
+    def depth(self) -> int:
+        return len(self._items) + self._flushing
+
+    async def _wait_for_room(self) -> None:
+        deadline = time.monotonic() + self.put_timeout_sec
+        while self.depth >= self.max_size:
+            self._room.clear()
+            self._flush_needed.set()
+            try:
+                await asyncio.wait_for(
+                    self._room.wait(), max(deadline - time.monotonic(), 0)
+                )
+            except asyncio.TimeoutError:
+                user_activity_buffer_events.labels("rejected").inc()
+                raise UserActivityBufferFullException(
+                    f"User activity buffer is full ({self.max_size})"
+                )
+
+    async def put(self, user_activity: UserActivity) -> None:
+        if self.depth >= self.max_size:
+            if self.policy == "drop":
+                user_activity_buffer_events.labels("dropped").inc()
+                return
+            await self._wait_for_room()
+        self._items.append(user_activity)
+        user_activity_buffer_events.labels("buffered").inc()
+        if len(self._items) >= self.flush_size:
+            self._flush_needed.set()
+
+    async def flush(self) -> None:
+        while self._items:
+            batch = self._items[: self.flush_size]
+            del self._items[: self.flush_size]
+            self._flushing += len(batch)
+            start = time.perf_counter()
+            try:
+                failed = await self.user_activity_repository.add_prepared(batch)
+            except BaseException:
+                # cancelled or failed, the batch is written by the next flush
+                self._items[:0] = batch
+                raise
+            finally:
+                self._flushing -= len(batch)
+            user_activity_buffer_flush_seconds.observe(time.perf_counter() - start)
+            user_activity_buffer_events.labels("stored").inc(len(batch) - len(failed))
+            if failed:
+                user_activity_buffer_events.labels("failed").inc(len(failed))
+                logger.warning("failed to store buffered user activities: %s", failed)
+            self._room.set()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._flush_needed.wait(), self.flush_interval_sec
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._flush_needed.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("failed to flush user activities: %s", e)
+                await asyncio.sleep(self.flush_interval_sec)
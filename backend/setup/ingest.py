@@ -0,0 +1,217 @@
+import argparse
+import asyncio
+import csv
+import json
+import mimetypes
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import asyncpg
+from pydantic import TypeAdapter
+
+from configs.database import get_psql_url
+from configs.environment import settings
+from dto.music import AlbumID, IngestTrack, Track
+from repositories.music_file import MinioMusicFileRepository
+
+
+manifest_adapter = TypeAdapter(list[IngestTrack])
+
+
+def read_manifest(path: Path) -> list[IngestTrack]:
+    with open(path, "r", newline="") as f:
+        if path.suffix == ".csv":
+            rows = [
+                {k: v for k, v in row.items() if v != ""} for row in csv.DictReader(f)
+            ]
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    return manifest_adapter.validate_python(rows)
+
+
+async def missing_ids(conn: asyncpg.Connection, table: str, ids: set[int]) -> set[int]:
+    rows = await conn.fetch(
+        f"SELECT id FROM {table} WHERE id = ANY($1::int[])", list(ids)
+    )
+    return ids - {row["id"] for row in rows}
+
+
+async def reserve_ids(conn: asyncpg.Connection, table: str, count: int) -> list[int]:
+    rows = await conn.fetch(
+        "SELECT nextval(pg_get_serial_sequence($1, 'id')) AS id "
+        "FROM generate_series(1, $2)",
+        table,
+        count,
+    )
+    return [row["id"] for row in rows]
+
+
+async def ingest(manifest: Path, blob_dir: Path, concurrency: int) -> None:
+    started = time.perf_counter()
+    tracks = read_manifest(manifest)
+    print(f"Read {len(tracks)} tracks from {manifest}")
+
+    missing_files = {
+        path
+        for t in tracks
+        for path in (t.file, t.cover)
+        if path is not None and not (blob_dir / path).is_file()
+    }
+    if missing_files:
+        raise SystemExit(f"Missing blobs: {sorted(missing_files)}")
+
+    async def upload_blobs(rows: list[Track], covers: dict[int, str]) -> None:
+        await upload(rows, tracks, covers, blob_dir, concurrency)
+        print(f"Uploaded {len(rows)} tracks and {len(covers)} covers")
+
+    conn = await asyncpg.connect(get_psql_url("music").replace("+asyncpg", ""))
+    try:
+        albums, rows = await load(conn, tracks, upload_blobs)
+    finally:
+        await conn.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Ingested {albums} albums and {rows} tracks in {elapsed:.1f}s "
+        f"({rows / elapsed * 60:.0f} tracks/min)"
+    )
+
+
+async def load(
+    conn: asyncpg.Connection,
+    tracks: list[IngestTrack],
+    upload_blobs: Callable[[list[Track], dict[int, str]], Awaitable[None]],
+) -> tuple[int, int]:
+    """
+    copies the albums and tracks of the manifest, after `upload_blobs` stored
+    their files. returns how many albums and tracks were added
+    """
+    artists = await missing_ids(conn, "users", {t.artist_id for t in tracks})
+    genres = await missing_ids(
+        conn, "genres", {t.genre_id for t in tracks if t.genre_id is not None}
+    )
+    if artists or genres:
+        raise SystemExit(
+            f"Unknown artists: {sorted(artists)}, unknown genres: {sorted(genres)}"
+        )
+
+    albums: dict[tuple[int, str], list[IngestTrack]] = {}
+    for t in tracks:
+        albums.setdefault((t.artist_id, t.album), []).append(t)
+    album_ids = dict(
+        zip(albums, await reserve_ids(conn, "albums", len(albums)), strict=True)
+    )
+    track_ids = await reserve_ids(conn, "tracks", len(tracks))
+
+    now = datetime.now()
+    rows = [
+        Track(
+            id=track_id,
+            name=t.name,
+            album_id=album_ids[(t.artist_id, t.album)],
+            artist_id=t.artist_id,
+            genre_id=t.genre_id,
+            release_date=t.release_date,
+            created_at=now,
+            updated_at=now,
+        )
+        for track_id, t in zip(track_ids, tracks, strict=True)
+    ]
+    covers = {
+        album_ids[key]: album_tracks[0].cover
+        for key, album_tracks in albums.items()
+        if album_tracks[0].cover is not None
+    }
+
+    # blobs go first so that committed rows never point at missing files
+    await upload_blobs(rows, covers)
+
+    async with conn.transaction():
+        await conn.copy_records_to_table(
+            "albums",
+            columns=["id", "name", "artist_id", "release_date"],
+            records=[
+                (
+                    album_ids[(artist_id, album)],
+                    album,
+                    artist_id,
+                    min(t.release_date for t in album_tracks),
+                )
+                for (artist_id, album), album_tracks in albums.items()
+            ],
+        )
+        await conn.copy_records_to_table(
+            "tracks",
+            columns=[
+                "id",
+                "name",
+                "album_id",
+                "artist_id",
+                "genre_id",
+                "release_date",
+            ],
+            records=[
+                (
+                    r.id,
+                    r.name,
+                    r.album_id,
+                    r.artist_id,
+                    r.genre_id,
+                    r.release_date,
+                )
+                for r in rows
+            ],
+        )
+    return len(albums), len(rows)
+
+
+async def upload(
+    rows: list[Track],
+    tracks: list[IngestTrack],
+    covers: dict[int, str],
+    blob_dir: Path,
+    concurrency: int,
+) -> None:
+    music_file_repository = MinioMusicFileRepository(
+        "minio-service:" + str(settings.MINIO_PORT),
+        settings.MINIO_ROOT_USER,
+        settings.MINIO_ROOT_PASSWORD,
+        settings.MINIO_MUSIC_BUCKET,
+        settings.MINIO_COVER_BUCKET,
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def save_track(row: Track, path: Path) -> None:
+        async with semaphore:
+            data = await asyncio.to_thread(path.read_bytes)
+            content_type = mimetypes.guess_type(path.name)[0] or "audio/mpeg"
+            await music_file_repository.save_track(row, data, content_type)
+
+    async def save_cover(album_id: int, path: Path) -> None:
+        async with semaphore:
+            data = await asyncio.to_thread(path.read_bytes)
+            content_type = mimetypes.guess_type(path.name)[0] or "image/png"
+            await music_file_repository.save_image(
+                AlbumID(id=album_id), data, content_type
+            )
+
+    await asyncio.gather(
+        *(save_track(row, blob_dir / t.file) for row, t in zip(rows, tracks)),
+        *(save_cover(album_id, blob_dir / path) for album_id, path in covers.items()),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bulk load albums and tracks from an NDJSON or CSV manifest"
+    )
+    parser.add_argument("manifest", type=Path, help="*.ndjson or *.csv manifest")
+    parser.add_argument("blob_dir", type=Path, help="directory with audio and covers")
+    parser.add_argument(
+        "--concurrency", type=int, default=32, help="parallel blob uploads"
+    )
+    args = parser.parse_args()
+    asyncio.run(ingest(args.manifest, args.blob_dir, args.concurrency))
+    print("Ingest done!")
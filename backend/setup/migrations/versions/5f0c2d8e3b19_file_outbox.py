@@ -0,0 +1,48 @@
+"""file outbox
+
+Revision ID: 5f0c2d8e3b19
+Revises: e2a9b5c81f47
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5f0c2d8e3b19"
+down_revision: Union[str, None] = "e2a9b5c81f47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "file_outbox",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("kind", sa.String(length=16), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("artist_id", sa.Integer(), nullable=True),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "available_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at", sa.TIMESTAMP(), server_default=sa.text("now()"), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "idx_file_outbox_available_at", "file_outbox", ["available_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_file_outbox_available_at", table_name="file_outbox")
+    op.drop_table("file_outbox")
@@ -0,0 +1,67 @@
+"""playlist track position
+
+Revision ID: 7b1c4e2a9d36
+Revises: 3e5d7a5258f0
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from itertools import groupby
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from repositories.ranking import keys_after
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7b1c4e2a9d36"
+down_revision: Union[str, None] = "3e5d7a5258f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "playlist_tracks",
+        sa.Column("position", sa.String(255, collation="C"), nullable=True),
+    )
+
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text(
+            "SELECT playlist_id, track_id FROM playlist_tracks "
+            "ORDER BY playlist_id, track_id"
+        )
+    ).all()
+    updates = []
+    for playlist_id, group in groupby(rows, key=lambda row: row.playlist_id):
+        track_ids = [row.track_id for row in group]
+        for track_id, position in zip(track_ids, keys_after(None, len(track_ids))):
+            updates.append(
+                {"playlist_id": playlist_id, "track_id": track_id, "position": position}
+            )
+    if updates:
+        connection.execute(
+            sa.text(
+                "UPDATE playlist_tracks SET position = :position "
+                "WHERE playlist_id = :playlist_id AND track_id = :track_id"
+            ),
+            updates,
+        )
+
+    op.alter_column("playlist_tracks", "position", nullable=False)
+    op.create_index(
+        "idx_playlist_tracks_playlist_id_position",
+        "playlist_tracks",
+        ["playlist_id", "position"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "idx_playlist_tracks_playlist_id_position", table_name="playlist_tracks"
+    )
+    op.drop_column("playlist_tracks", "position")
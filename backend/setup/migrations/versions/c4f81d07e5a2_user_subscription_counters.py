@@ -0,0 +1,55 @@
+"""user subscription counters
+
+Revision ID: c4f81d07e5a2
+Revises: 7b1c4e2a9d36
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4f81d07e5a2"
+down_revision: Union[str, None] = "7b1c4e2a9d36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("followers_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "users",
+        sa.Column("following_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE users SET followers_count = c.count
+        FROM (
+            SELECT artist_id AS id, count(*) AS count
+            FROM subscriptions GROUP BY artist_id
+        ) AS c
+        WHERE users.id = c.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE users SET following_count = c.count
+        FROM (
+            SELECT subscriber_id AS id, count(*) AS count
+            FROM subscriptions GROUP BY subscriber_id
+        ) AS c
+        WHERE users.id = c.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "following_count")
+    op.drop_column("users", "followers_count")
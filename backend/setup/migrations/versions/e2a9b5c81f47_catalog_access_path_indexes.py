@@ -0,0 +1,52 @@
+"""catalog access path indexes
+
+Revision ID: e2a9b5c81f47
+Revises: c4f81d07e5a2
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a9b5c81f47"
+down_revision: Union[str, None] = "c4f81d07e5a2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("idx_tracks_album_id", "tracks", ["album_id"]),
+    ("idx_tracks_artist_id_release_date", "tracks", ["artist_id", "release_date"]),
+    ("idx_tracks_genre_id", "tracks", ["genre_id"]),
+    ("idx_albums_artist_id_release_date", "albums", ["artist_id", "release_date"]),
+    ("idx_playlists_author_id", "playlists", ["author_id"]),
+    ("idx_subscriptions_artist_id", "subscriptions", ["artist_id"]),
+    ("idx_playlist_tracks_track_id", "playlist_tracks", ["track_id"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,36 @@
+import asyncio
+
+import asyncpg
+
+from configs.database import get_psql_url
+
+
+RECONCILE_QUERY = """
+WITH actual AS (
+    SELECT
+        u.id,
+        (SELECT count(*) FROM subscriptions s WHERE s.artist_id = u.id) AS followers,
+        (SELECT count(*) FROM subscriptions s WHERE s.subscriber_id = u.id) AS following
+    FROM users u
+)
+UPDATE users
+SET followers_count = actual.followers, following_count = actual.following
+FROM actual
+WHERE users.id = actual.id
+    AND (users.followers_count <> actual.followers
+        OR users.following_count <> actual.following)
+RETURNING users.id
+"""
+
+
+async def reconcile() -> None:
+    conn = await asyncpg.connect(get_psql_url("music").replace("+asyncpg", ""))
+    try:
+        fixed = await conn.fetch(RECONCILE_QUERY)
+    finally:
+        await conn.close()
+    print(f"Reconciled subscription counters of {len(fixed)} users")
+
+
+if __name__ == "__main__":
+    asyncio.run(reconcile())
@@ -0,0 +1,51 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from configs.environment import settings
+from configs.database import get_session_generator
+from repositories.file_outbox import SQLAlchemyFileOutboxRepository
+from repositories.music_file import MinioMusicFileRepository
+
+
+BATCH_SIZE = 1000
+
+
+async def sweep() -> None:
+    """
+    queues files whose rows are gone into the file outbox, the backend removes them.
+    only files older than the grace period are looked at, so uploads of rows being
+    created right now are left alone
+    """
+    music_file_repository = MinioMusicFileRepository(
+        "minio-service:" + str(settings.MINIO_PORT),
+        settings.MINIO_ROOT_USER,
+        settings.MINIO_ROOT_PASSWORD,
+        settings.MINIO_MUSIC_BUCKET,
+        settings.MINIO_COVER_BUCKET,
+    )
+    file_outbox_repository = SQLAlchemyFileOutboxRepository(
+        await get_session_generator("music"),
+        settings.FILE_OUTBOX_RETRY_DELAY,
+        settings.FILE_OUTBOX_MAX_RETRY_DELAY,
+        settings.FILE_OUTBOX_MAX_ATTEMPTS,
+    )
+    modified_before = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.FILE_SWEEP_GRACE_PERIOD
+    )
+
+    scanned = queued = 0
+    batch = []
+    async for file in music_file_repository.list_files(modified_before):
+        scanned += 1
+        entry = music_file_repository.catalog_entry(file)
+        if entry is not None:
+            batch.append(entry)
+        if len(batch) >= BATCH_SIZE:
+            queued += await file_outbox_repository.enqueue_orphans(batch)
+            batch = []
+    queued += await file_outbox_repository.enqueue_orphans(batch)
+    print(f"Scanned {scanned} files, queued {queued} orphans for removal")
+
+
+if __name__ == "__main__":
+    asyncio.run(sweep())
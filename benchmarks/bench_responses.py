@@ -0,0 +1,177 @@
+"""
+json responses of listing endpoints: fastapi validating and dumping the
+`response_model` on every call against `DTORoute` sending validated dtos as they are.
+
+the real routers are mounted on a bare app, services are replaced by fakes
+returning pages of ready dtos, so only the response path is measured.
+
+python benchmarks/bench_responses.py
+"""
+
+import argparse
+import asyncio
+import datetime
+import inspect
+import sys
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+from fastapi import APIRouter, FastAPI
+from fastapi.routing import APIRoute
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+load_dotenv(ROOT / ".env")
+
+from api.routers import album, playlist, track, user  # noqa: E402
+from dto.accounts import Artist, Playlist  # noqa: E402
+from dto.music import Album, Track  # noqa: E402
+
+
+PAGE_SIZES = (10, 100, 1000)
+ENDPOINTS = ("/tracks/", "/albums/", "/playlists/", "/users/artist/")
+NOW = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+
+class FakeMusicService:
+    def __init__(self, size: int):
+        self.tracks = [
+            Track(
+                id=i,
+                name=f"track {i}",
+                album_id=i,
+                artist_id=i,
+                genre_id=None,
+                release_date=NOW.date(),
+                created_at=NOW,
+                updated_at=NOW,
+            )
+            for i in range(size)
+        ]
+        self.albums = [
+            Album(
+                id=i,
+                name=f"album {i}",
+                artist_id=i,
+                release_date=NOW.date(),
+                created_at=NOW,
+                updated_at=NOW,
+            )
+            for i in range(size)
+        ]
+
+    async def get_tracks(self, params):
+        return self.tracks
+
+    async def get_albums(self, params):
+        return self.albums
+
+
+class FakeAccountService:
+    def __init__(self, size: int):
+        self.playlists = [
+            Playlist(
+                id=i, name=f"playlist {i}", author_id=i, created_at=NOW, updated_at=NOW
+            )
+            for i in range(size)
+        ]
+        self.artists = [
+            Artist(id=i, name=f"artist {i}", description="about", followers_count=i)
+            for i in range(size)
+        ]
+
+    async def get_playlists(self, params):
+        return self.playlists
+
+    async def get_users_artists(self, params):
+        return self.artists
+
+
+def plain(router: APIRouter) -> APIRouter:
+    """the same routes served by fastapi's own `APIRoute`"""
+    copy = APIRouter()
+    for route in router.routes:
+        if isinstance(route, APIRoute):
+            copy.add_api_route(
+                route.path,
+                inspect.unwrap(route.endpoint),
+                response_model=route.response_model,
+                status_code=route.status_code,
+                methods=route.methods,
+                response_class=route.response_class,
+                route_class_override=APIRoute,
+            )
+    return copy
+
+
+def make_app(size: int, fast: bool) -> FastAPI:
+    app = FastAPI()
+    for module in (track, album, playlist, user):
+        app.include_router(module.router if fast else plain(module.router))
+    # the services are looked up on app.state, dependency_overrides would add
+    # a per request dependency analysis to both sides
+    app.state.music_service = FakeMusicService(size)
+    app.state.account_service = FakeAccountService(size)
+    return app
+
+
+async def request(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def throughput(app: FastAPI, path: str, requests: int) -> float:
+    for _ in range(5):
+        await request(app, path)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await request(app, path)
+    return requests / (time.perf_counter() - start)
+
+
+async def main(requests: int) -> None:
+    print(
+        f"{'endpoint':<16}{'size':>6}{'before, rps':>13}{'after, rps':>12}{'speedup':>9}"
+    )
+    for size in PAGE_SIZES:
+        before_app, after_app = make_app(size, fast=False), make_app(size, fast=True)
+        for path in ENDPOINTS:
+            assert await request(before_app, path) == await request(after_app, path)
+            n = max(requests * 10 // size, 20)
+            before = await throughput(before_app, path, n)
+            after = await throughput(after_app, path, n)
+            print(
+                f"{path:<16}{size:>6}{before:>13.0f}{after:>12.0f}{after / before:>8.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    asyncio.run(main(parser.parse_args().requests))
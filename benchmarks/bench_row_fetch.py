@@ -0,0 +1,165 @@
+"""
+listing read path: orm instances converted with `from_attributes` against
+plain column rows validated in bulk by a `TypeAdapter`.
+
+BENCH_DSN=postgresql+asyncpg://... python benchmarks/bench_row_fetch.py
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from dto.accounts import PlaylistTrackSearchParams, User, UserSearchParams  # noqa: E402
+from dto.music import Track, TrackSearchParams  # noqa: E402
+from models import album, genre, playlist, playlist_track, subscription, track, user  # noqa: E402, F401
+from models.base_model import MusicModelBase  # noqa: E402
+from models.playlist import PlaylistModel  # noqa: E402
+from models.playlist_track import PlaylistTrackModel  # noqa: E402
+from models.track import TrackModel  # noqa: E402
+from models.user import UserModel  # noqa: E402
+from repositories.genre import SQLAlchemyGenreRepository  # noqa: E402
+from repositories.playlist import SQLAlchemyPlaylistRepository  # noqa: E402
+from repositories.track import SQLAlchemyTrackRepository  # noqa: E402
+from repositories.user import SQLAlchemyUserRepository  # noqa: E402
+
+
+PAGE_SIZES = (10, 100, 1000)
+USERS = 5_000
+TRACKS = 50_000
+
+SEED_QUERIES = [
+    f"""
+    INSERT INTO users (name, username, description, password, role)
+    SELECT 'user ' || n, 'user_' || n, 'about user ' || n, 'x', 'user'::userroleenum
+    FROM generate_series(1, {USERS}) n
+    """,
+    f"""
+    INSERT INTO albums (name, artist_id, release_date)
+    SELECT 'album ' || n, n, date '2000-01-01' + n % 9000
+    FROM generate_series(1, {USERS}) n
+    """,
+    f"""
+    INSERT INTO tracks (name, album_id, artist_id, genre_id, release_date)
+    SELECT 'track ' || n, 1 + n % {USERS}, 1 + n % {USERS}, NULL, date '2000-01-01' + n % 9000
+    FROM generate_series(1, {TRACKS}) n
+    """,
+    "INSERT INTO playlists (name, author_id) VALUES ('bench', 1)",
+    f"""
+    INSERT INTO playlist_tracks (playlist_id, track_id, position)
+    SELECT 1, n, to_char(n, 'FM0000000')
+    FROM generate_series(1, {max(PAGE_SIZES)}) n
+    """,
+]
+
+
+async def seed(engine) -> None:
+    async with engine.connect() as conn:
+        seeded = await conn.scalar(text("SELECT to_regclass('playlist_tracks')"))
+        if seeded is not None:
+            seeded = await conn.scalar(text("SELECT count(*) FROM tracks")) == TRACKS
+    if seeded:
+        return
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(MusicModelBase.metadata.drop_all)
+        await conn.run_sync(MusicModelBase.metadata.create_all)
+        for query in SEED_QUERIES:
+            await conn.execute(text(query))
+
+
+# the read path before columnar fetches, kept here as the baseline
+
+
+async def orm_tracks(session_factory, limit: int) -> list[Track]:
+    async with session_factory() as session:
+        result = await session.execute(select(TrackModel).offset(0).limit(limit))
+        return [Track.model_validate(m, from_attributes=True) for m in result.scalars()]
+
+
+async def orm_users(session_factory, limit: int) -> list[User]:
+    async with session_factory() as session:
+        result = await session.execute(select(UserModel).offset(0).limit(limit))
+        return [User.model_validate(m, from_attributes=True) for m in result.scalars()]
+
+
+async def orm_playlist_tracks(session_factory, limit: int) -> list[Track]:
+    async with session_factory() as session:
+        await session.execute(select(PlaylistModel.id).where(PlaylistModel.id == 1))
+        result = await session.execute(
+            select(TrackModel)
+            .join(PlaylistTrackModel, PlaylistTrackModel.track_id == TrackModel.id)
+            .where(PlaylistTrackModel.playlist_id == 1)
+            .order_by(PlaylistTrackModel.position)
+            .offset(0)
+            .limit(limit)
+        )
+        return [Track.model_validate(m, from_attributes=True) for m in result.scalars()]
+
+
+def cases(session_factory):
+    tracks = SQLAlchemyTrackRepository(
+        session_factory, SQLAlchemyGenreRepository(session_factory)
+    )
+    users = SQLAlchemyUserRepository(session_factory)
+    playlists = SQLAlchemyPlaylistRepository(session_factory)
+    return {
+        "tracks": (
+            lambda n: orm_tracks(session_factory, n),
+            lambda n: tracks.get_tracks(TrackSearchParams(limit=n)),
+        ),
+        "users": (
+            lambda n: orm_users(session_factory, n),
+            lambda n: users.get_users(UserSearchParams(limit=n)),
+        ),
+        "playlist tracks": (
+            lambda n: orm_playlist_tracks(session_factory, n),
+            lambda n: playlists.get_tracks_by_playlist(
+                PlaylistTrackSearchParams(id=1, limit=n)
+            ),
+        ),
+    }
+
+
+async def measure(call, limit: int, rounds: int) -> float:
+    """median milliseconds per call"""
+    for _ in range(3):
+        await call(limit)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await call(limit)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+async def main(rounds: int) -> None:
+    engine = create_async_engine(os.environ["BENCH_DSN"])
+    await seed(engine)
+    session_factory = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )
+
+    print(f"{'listing':<16}{'limit':>6}{'orm, ms':>10}{'rows, ms':>10}{'speedup':>9}")
+    for name, (orm, rows) in cases(session_factory).items():
+        for limit in PAGE_SIZES:
+            before = await measure(orm, limit, rounds)
+            after = await measure(rows, limit, rounds)
+            print(
+                f"{name:<16}{limit:>6}{before:>10.2f}{after:>10.2f}{before / after:>8.2f}x"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=50)
+    asyncio.run(main(parser.parse_args().rounds))
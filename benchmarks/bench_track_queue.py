@@ -0,0 +1,232 @@
+"""
+track queue edits: the former list scripts, which read the whole queue, edit it
+in lua and push it back, against the sorted set of ranked entries.
+then repeated inserts at one spot, which renumber the entries around it once
+their scores run out of halvings.
+
+the database is flushed, so point it to an empty one.
+
+BENCH_REDIS_URL=redis://localhost:6379/15 python benchmarks/bench_track_queue.py
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from pathlib import Path
+
+import redis.asyncio as redis
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "backend" / "scripts"
+
+QUEUE_LENGTHS = (10, 100, 1_000, 10_000, 100_000)
+TTL_SEC = 600
+LIST_KEY = "queue:bench"
+RANKS_KEY, META_KEY, ORDER_KEY = (
+    "queue:bench:ranks",
+    "queue:bench:meta",
+    "queue:bench:order",
+)
+EVENTS_CHANNEL = "queue:bench:events"
+
+LIST_SCRIPTS = {
+    "insert": """
+local key = KEYS[1]
+local value = ARGV[1]
+local pos = tonumber(ARGV[2]) + 1
+local ttl = tonumber(ARGV[3])
+
+local len = redis.call('LLEN', key)
+if len == 0 then return redis.error_reply("e") end
+if pos > len then pos = len + 1 end
+
+local elements = redis.call('LRANGE', key, 0, -1)
+table.insert(elements, pos, value)
+
+redis.call('DEL', key)
+
+if #elements > 0 then
+    redis.call('RPUSH', key, unpack(elements))
+end
+
+redis.call('EXPIRE', key, ttl)
+return 'OK'
+""",
+    "move": """
+local key = KEYS[1]
+local src = tonumber(ARGV[1]) + 1
+local dest = tonumber(ARGV[2]) + 1
+local ttl = tonumber(ARGV[3])
+
+local len = redis.call('LLEN', key)
+if len == 0 then return redis.error_reply("e") end
+if src > len then src = len end
+if dest >= len then dest = len + 1 end
+
+local elements = redis.call('LRANGE', key, 0, -1)
+local elem = table.remove(elements, src)
+
+if dest > src then dest = dest - 1 end
+
+table.insert(elements, dest, elem)
+redis.call('DEL', key)
+if #elements > 0 then
+    redis.call('RPUSH', key, unpack(elements))
+end
+
+redis.call('EXPIRE', key, ttl)
+return 'OK'
+""",
+    "remove": """
+local key = KEYS[1]
+local pos = tonumber(ARGV[1]) + 1
+local ttl = tonumber(ARGV[2])
+
+local len = redis.call('LLEN', key)
+if len == 0 then return redis.error_reply("e") end
+if pos > len then pos = len end
+
+local elements = redis.call('LRANGE', key, 0, -1)
+table.remove(elements, pos)
+redis.call('DEL', key)
+if #elements > 0 then
+    redis.call('RPUSH', key, unpack(elements))
+end
+
+redis.call('EXPIRE', key, ttl)
+return 'OK'
+""",
+}
+
+
+async def seed(client: redis.Redis, length: int) -> None:
+    await client.delete(LIST_KEY, RANKS_KEY, META_KEY, ORDER_KEY)
+    for start in range(0, length, 10_000):
+        end = min(start + 10_000, length)
+        await client.rpush(LIST_KEY, *range(start, end))
+        await client.zadd(RANKS_KEY, {f"{i}:{i}": i for i in range(start, end)})
+    await client.hset(META_KEY, "seq", length)
+
+
+async def measure(call, rounds: int) -> float | None:
+    """median milliseconds per call, none when the script fails"""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        try:
+            await call()
+        except redis.ResponseError:
+            # the list scripts `unpack` the whole queue, which lua caps at ~8000 values
+            return None
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def cases(client: redis.Redis, sha1s: dict[str, dict[str, str]], length: int):
+    """op -> (list call, sorted set call), each keeping the queue length"""
+    middle = length // 2
+
+    def run(kind: str, name: str, *args):
+        if kind == "list":
+            keys = (LIST_KEY,)
+        else:
+            keys = (RANKS_KEY, META_KEY, ORDER_KEY)
+            args = (EVENTS_CHANNEL, *args)
+        return client.evalsha(sha1s[kind][name], len(keys), *keys, *args)
+
+    def edits(kind: str):
+        async def insert():
+            await run(kind, "insert", 1, middle, TTL_SEC)
+            await run(kind, "remove", middle, TTL_SEC)
+
+        async def move():
+            await run(kind, "move", length // 4, 3 * length // 4, TTL_SEC)
+
+        async def remove():
+            await run(kind, "remove", middle, TTL_SEC)
+            await run(kind, "insert", 1, middle, TTL_SEC)
+
+        return {"insert+remove": insert, "move": move, "remove+insert": remove}
+
+    before, after = edits("list"), edits("zset")
+    return {op: (before[op], after[op]) for op in before}
+
+
+async def same_spot(
+    client: redis.Redis, sha1: str, length: int, inserts: int
+) -> tuple[float, float, int]:
+    """
+    median and max milliseconds of `inserts` inserts before the same entry,
+    which halve one gap until the entries around it are renumbered, and the
+    number of seeded entries renumbered by then
+    """
+    await seed(client, length)
+    middle = length // 2
+    timings = []
+    for _ in range(inserts):
+        start = time.perf_counter()
+        await client.evalsha(
+            sha1, 3, RANKS_KEY, META_KEY, ORDER_KEY, EVENTS_CHANNEL, 1, middle, TTL_SEC
+        )
+        timings.append(time.perf_counter() - start)
+
+    inserted = await client.zrange(RANKS_KEY, middle, middle + inserts - 1)
+    # each insert went before the previous one
+    assert [int(e.partition(":")[0]) for e in inserted] == list(
+        range(length + inserts, length, -1)
+    )
+    renumbered = 0
+    for start in range(0, length + inserts, 10_000):
+        ranked = await client.zrange(RANKS_KEY, start, start + 9_999, withscores=True)
+        for entry, score in ranked:
+            seq = int(entry.partition(":")[0])
+            renumbered += seq < length and score != seq
+    return statistics.median(timings) * 1000, max(timings) * 1000, renumbered
+
+
+async def main(rounds: int) -> None:
+    client = redis.from_url(os.environ["BENCH_REDIS_URL"], decode_responses=True)
+    await client.flushdb()
+    sha1s = {"list": {}, "zset": {}}
+    for name, script in LIST_SCRIPTS.items():
+        sha1s["list"][name] = await client.script_load(script)
+    for name in ("insert", "move", "remove"):
+        script = (SCRIPTS_DIR / f"{name}.lua").read_text()
+        sha1s["zset"][name] = await client.script_load(script)
+
+    print(f"{'op':<16}{'length':>8}{'list, ms':>10}{'zset, ms':>10}{'speedup':>10}")
+    for length in QUEUE_LENGTHS:
+        await seed(client, length)
+        for op, (before, after) in cases(client, sha1s, length).items():
+            n = rounds if length < 100_000 else max(rounds // 10, 3)
+            before_ms = await measure(before, n)
+            after_ms = await measure(after, n)
+            if before_ms is None:
+                print(f"{op:<16}{length:>8}{'fails':>10}{after_ms:>10.3f}{'-':>10}")
+                continue
+            print(
+                f"{op:<16}{length:>8}{before_ms:>10.3f}{after_ms:>10.3f}"
+                f"{before_ms / after_ms:>9.1f}x"
+            )
+            listed = await client.lrange(LIST_KEY, 0, -1)
+            ranked = await client.zrange(RANKS_KEY, 0, -1)
+            assert listed == [entry.partition(":")[2] for entry in ranked]
+
+    print(f"\n{'op':<16}{'length':>8}{'median':>10}{'max, ms':>10}{'renumbered':>12}")
+    for length in QUEUE_LENGTHS:
+        median_ms, max_ms, renumbered = await same_spot(
+            client, sha1s["zset"]["insert"], length, 200
+        )
+        print(
+            f"{'same spot':<16}{length:>8}{median_ms:>10.3f}{max_ms:>10.3f}"
+            f"{renumbered:>12}"
+        )
+    await client.flushdb()
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=100)
+    asyncio.run(main(parser.parse_args().rounds))
@@ -0,0 +1,177 @@
+"""
+the same mix of queue operations against the in-memory repository and the lua
+scripts on redis, so a change of the queue algorithm can be tried in process
+first. the final queues of both are compared.
+
+without BENCH_REDIS_URL only the in-memory repository runs. the database is
+flushed, so point it to an empty one.
+
+BENCH_REDIS_URL=redis://localhost:6379/15 python benchmarks/bench_track_queue_backends.py
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import redis.asyncio as redis
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from dto.music import TrackID  # noqa: E402
+from dto.track_queue import (  # noqa: E402
+    BulkEnqueueParams,
+    InQueueID,
+    QueueParameters,
+    QueueRepeat,
+    QueueShuffle,
+    QueueSrcDestIDs,
+    RepeatMode,
+    TrackInQueueIDs,
+)
+from exceptions.track_queue import TrackQueueNotFoundException  # noqa: E402
+from repositories.track_queue import (  # noqa: E402
+    InMemoryTrackQueueRepository,
+    RedisTrackQueueRepository,
+)
+
+SCRIPTS_DIR = ROOT / "backend" / "scripts"
+TTL_SEC = 600
+EVENTS_BUFFER = 100
+
+# op -> weight, roughly a player: listing and skipping dominate edits
+MIX = {
+    "list": 30,
+    "next": 20,
+    "push_left": 15,
+    "insert": 10,
+    "move": 10,
+    "remove": 8,
+    "push_many": 4,
+    "shuffle": 1,
+    "unshuffle": 1,
+    "set_repeat": 1,
+}
+
+
+def operations(n: int, users: int, length: int, seed: int) -> list[tuple]:
+    """(user id, op, args), each user's queue starts with `length` tracks"""
+    rng = random.Random(seed)
+    ops = [
+        (user_id, "push_many", (list(range(length)), BulkEnqueueParams()))
+        for user_id in range(users)
+    ]
+    names, weights = list(MIX), list(MIX.values())
+    for _ in range(n):
+        user_id = rng.randrange(users)
+        op = rng.choices(names, weights)[0]
+        if op == "list":
+            args = (QueueParameters(offset=0, limit=10),)
+        elif op == "push_left":
+            args = (TrackID(id=rng.randrange(10_000)),)
+        elif op == "push_many":
+            args = ([rng.randrange(10_000) for _ in range(20)], BulkEnqueueParams())
+        elif op == "insert":
+            args = (
+                TrackInQueueIDs(
+                    track_id=rng.randrange(10_000), queue_id=rng.randrange(length)
+                ),
+            )
+        elif op == "move":
+            args = (
+                QueueSrcDestIDs(
+                    src_id=rng.randrange(length), dest_id=rng.randrange(length)
+                ),
+            )
+        elif op == "remove":
+            args = (InQueueID(id=rng.randrange(length)),)
+        elif op == "shuffle":
+            args = (QueueShuffle(seed=rng.randrange(2**31)),)
+        elif op == "set_repeat":
+            args = (QueueRepeat(mode=rng.choice(list(RepeatMode))),)
+        else:
+            args = ()
+        ops.append((user_id, op, args))
+    return ops
+
+
+async def run(repo, ops: list[tuple]) -> dict[str, list[float]]:
+    """seconds per call by op"""
+    timings = defaultdict(list)
+    for user_id, op, args in ops:
+        call = getattr(repo, op)
+        start = time.perf_counter()
+        try:
+            await call(user_id, *args)
+        except TrackQueueNotFoundException:
+            pass
+        timings[op].append(time.perf_counter() - start)
+    return timings
+
+
+async def snapshot(repo, users: int) -> list[list[int] | None]:
+    queues = []
+    for user_id in range(users):
+        try:
+            queue = await repo.list(user_id, QueueParameters(offset=0, limit=0))
+            queues.append(queue.track_ids)
+        except TrackQueueNotFoundException:
+            queues.append(None)
+    return queues
+
+
+def report(results: dict[str, dict[str, list[float]]]) -> None:
+    backends = list(results)
+    header = f"{'op':<12}{'calls':>8}"
+    for backend in backends:
+        header += f"{backend + ', us':>14}"
+    print(header)
+    for op in sorted(results[backends[0]]):
+        line = f"{op:<12}{len(results[backends[0]][op]):>8}"
+        for backend in backends:
+            line += f"{statistics.median(results[backend][op]) * 1e6:>14.1f}"
+        print(line)
+    line = f"{'total, s':<12}{'':>8}"
+    for backend in backends:
+        total = sum(sum(t) for t in results[backend].values())
+        line += f"{total:>14.3f}"
+    print(line)
+
+
+async def main(n: int, users: int, length: int, seed: int) -> None:
+    ops = operations(n, users, length, seed)
+    memory = InMemoryTrackQueueRepository(TTL_SEC, EVENTS_BUFFER)
+    results = {"memory": await run(memory, ops)}
+    expected = await snapshot(memory, users)
+
+    url = os.getenv("BENCH_REDIS_URL")
+    if url is not None:
+        client = redis.from_url(url, decode_responses=True)
+        await client.flushdb()
+        sha1s = {
+            path.stem: await client.script_load(path.read_text())
+            for path in SCRIPTS_DIR.glob("*.lua")
+        }
+        scripts = RedisTrackQueueRepository(client, TTL_SEC, sha1s, EVENTS_BUFFER)
+        results["redis"] = await run(scripts, ops)
+        assert await snapshot(scripts, users) == expected
+        await client.flushdb()
+        await client.aclose()
+
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--length", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.ops, args.users, args.length, args.seed))
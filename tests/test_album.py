@@ -340,3 +340,48 @@ class TestAlbumEndpoints:
         await async_client.delete("/track/", params={"id": tid}, headers=user_headers)
         await self._delete_genre(async_client, genre_id, genre_headers)
         await self._delete_user(async_client, user_headers)
+
+    async def test_delete_album_removes_its_tracks(self, async_client: AsyncClient):
+        user_id, user_headers = await self._create_user_and_get_auth_headers(
+            async_client, "AlbumCascadeUser"
+        )
+
+        album_params = {
+            "name": "AlbumCascade",
+            "artist_id": user_id,
+            "release_date": "2025-06-01",
+        }
+        album_resp = await async_client.post(
+            "/album/", params=album_params, headers=user_headers
+        )
+        assert album_resp.status_code == status.HTTP_201_CREATED
+        album_id = album_resp.json()["id"]
+
+        track_ids = []
+        for i in range(3):
+            track_resp = await async_client.post(
+                "/track/",
+                params={
+                    "name": f"CascadeSong{i}",
+                    "artist_id": user_id,
+                    "album_id": album_id,
+                    "release_date": date.today().isoformat(),
+                },
+                files={"track_file": ("cascade.mp3", b"CASCADEDATA", "audio/mpeg")},
+                headers=user_headers,
+            )
+            assert track_resp.status_code == status.HTTP_201_CREATED
+            track_ids.append(track_resp.json()["id"])
+
+        resp = await async_client.delete(
+            "/album/", params={"id": album_id}, headers=user_headers
+        )
+        assert resp.status_code == status.HTTP_204_NO_CONTENT
+
+        for track_id in track_ids:
+            chk = await async_client.get(
+                "/track/", params={"id": track_id}, headers=user_headers
+            )
+            assert chk.status_code == status.HTTP_404_NOT_FOUND
+
+        await self._delete_user(async_client, user_headers)
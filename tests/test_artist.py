@@ -0,0 +1,115 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from datetime import date
+import uuid
+
+
+@pytest.mark.asyncio
+class TestArtistEndpoints:
+    async def _delete_user(self, client: AsyncClient, headers):
+        resp = await client.delete("/user/", headers=headers)
+        assert resp.status_code in [
+            status.HTTP_204_NO_CONTENT,
+            status.HTTP_404_NOT_FOUND,
+        ], f"Failed to delete user: {resp.status_code} - {resp.text}"
+
+    async def _create_user_and_get_auth_headers(
+        self, async_client: AsyncClient, username_prefix: str
+    ):
+        username = f"testuser{username_prefix}_{uuid.uuid4().hex[:8]}"
+        user_data = {
+            "name": f"TestName{username_prefix}",
+            "username": username,
+            "password": "testpass",
+        }
+        resp_reg = await async_client.post(
+            "/user/register/",
+            params=user_data,
+            files={"cover_file": ("", "", "")},
+        )
+        assert resp_reg.status_code == status.HTTP_201_CREATED, (
+            f"Failed to register user: {resp_reg.text}"
+        )
+
+        headers = {"Authorization": f"Bearer {resp_reg.json()['token']}"}
+
+        resp_get_user = await async_client.get("/user/", headers=headers)
+        assert resp_get_user.status_code == status.HTTP_200_OK
+        user_id = resp_get_user.json()["id"]
+
+        return user_id, headers
+
+    async def _create_single(
+        self, client: AsyncClient, artist_id: int, headers: dict, name: str
+    ) -> dict:
+        resp = await client.post(
+            "/track/single/",
+            params={
+                "name": name,
+                "artist_id": artist_id,
+                "release_date": date.today().isoformat(),
+            },
+            files={"track_file": ("single.mp3", b"fakesingledata", "audio/mpeg")},
+            headers=headers,
+        )
+        assert resp.status_code == status.HTTP_201_CREATED, resp.text
+        return resp.json()
+
+    async def test_artist_page(self, async_client: AsyncClient):
+        artist_id, artist_headers = await self._create_user_and_get_auth_headers(
+            async_client, "PageArtist"
+        )
+        fan_id, fan_headers = await self._create_user_and_get_auth_headers(
+            async_client, "PageFan"
+        )
+
+        empty = await async_client.get("/artist/page/", params={"id": artist_id})
+        assert empty.status_code == status.HTTP_200_OK
+        assert empty.json()["artist"]["id"] == artist_id
+        assert empty.json()["albums"] == []
+        assert empty.json()["latest_tracks"] == []
+
+        single = await self._create_single(
+            async_client, artist_id, artist_headers, "PageSingle"
+        )
+        resp = await async_client.post(
+            "/track/",
+            params={
+                "name": "PageSecond",
+                "album_id": single["album_id"],
+                "artist_id": artist_id,
+                "release_date": date.today().isoformat(),
+            },
+            files={"track_file": ("second.mp3", b"fakedata", "audio/mpeg")},
+            headers=artist_headers,
+        )
+        assert resp.status_code == status.HTTP_201_CREATED
+        second_id = resp.json()["id"]
+
+        resp = await async_client.post(
+            "/user/subscribe", params={"artist_id": artist_id}, headers=fan_headers
+        )
+        assert resp.status_code == status.HTTP_201_CREATED
+
+        page = await async_client.get(
+            "/artist/page/", params={"id": artist_id, "tracks_limit": 1}
+        )
+        assert page.status_code == status.HTTP_200_OK
+        body = page.json()
+        assert body["artist"]["followers_count"] == 1
+        assert [(a["id"], a["tracks_count"]) for a in body["albums"]] == [
+            (single["album_id"], 2)
+        ]
+        assert [t["id"] for t in body["latest_tracks"]] == [second_id]
+
+        missing = await async_client.get("/artist/page/", params={"id": 10**9})
+        assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+        unbounded = await async_client.get(
+            "/artist/page/", params={"id": artist_id, "albums_limit": 101}
+        )
+        assert unbounded.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        await self._delete_user(async_client, fan_headers)
+        await self._delete_user(async_client, artist_headers)
@@ -0,0 +1,85 @@
+import asyncio
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import brotli
+import pytest
+import zstandard
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from api.compression import CompressionMiddleware  # noqa: E402
+
+DECODERS = {
+    "zstd": lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data),
+    "br": brotli.decompress,
+    "gzip": gzip.decompress,
+}
+
+
+def _body(id: int, size: int) -> bytes:
+    return json.dumps(
+        [{"id": id, "n": n, "name": f"track {id}-{n}"} for n in range(size)]
+    ).encode()
+
+
+def _app(chunks: int):
+    """streams the body of `/{id}` in `chunks` parts, yielding in between"""
+
+    async def app(scope, receive, send):
+        id = int(scope["path"].strip("/"))
+        body = _body(id, 20_000)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        step = len(body) // chunks + 1
+        for start in range(0, len(body), step):
+            await asyncio.sleep(0)
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": body[start : start + step],
+                    "more_body": start + step < len(body),
+                }
+            )
+
+    return app
+
+
+async def _get(middleware, id: int, encoding: str) -> tuple[dict, bytes]:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": f"/{id}",
+        "headers": [(b"accept-encoding", encoding.encode())],
+    }
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, None, send)
+    headers = {k.decode(): v.decode() for k, v in messages[0]["headers"]}
+    return headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("encoding", list(DECODERS))
+@pytest.mark.parametrize("chunks", [1, 8])
+async def test_concurrent_responses_compress_independently(encoding, chunks):
+    # every chunk goes through a worker thread, so the streams interleave
+    middleware = CompressionMiddleware(_app(chunks), 500, 6, 4, 3, 0)
+
+    responses = await asyncio.gather(
+        *(_get(middleware, id, encoding) for id in range(8))
+    )
+
+    for id, (headers, body) in enumerate(responses):
+        assert headers["content-encoding"] == encoding
+        assert DECODERS[encoding](body) == _body(id, 20_000)
@@ -0,0 +1,169 @@
+import datetime
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from dto.music import IngestTrack  # noqa: E402
+from setup.ingest import load, read_manifest  # noqa: E402
+
+
+INGEST_DSN = os.getenv("INGEST_DSN")
+
+NDJSON = """\
+{"name": "one", "album": "first", "artist_id": 1, "genre_id": 2, "release_date": "2020-01-02", "file": "one.mp3", "cover": "first.png"}
+
+{"name": "two", "album": "first", "artist_id": 1, "release_date": "2020-01-01", "file": "two.mp3"}
+"""
+
+CSV = """\
+name,album,artist_id,genre_id,release_date,file,cover
+one,first,1,2,2020-01-02,one.mp3,first.png
+two,first,1,,2020-01-01,two.mp3,
+"""
+
+
+def _track(name: str, album: str, artist_id: int, genre_id: int | None = None):
+    return IngestTrack(
+        name=name,
+        album=album,
+        artist_id=artist_id,
+        genre_id=genre_id,
+        release_date=datetime.date(2020, 1, len(name)),
+        file=f"{name}.mp3",
+    )
+
+
+class FakeConnection:
+    """answers the id lookups of `load` from the given existing ids"""
+
+    def __init__(self, users: set[int], genres: set[int]):
+        self.ids = {"users": users, "genres": genres}
+
+    async def fetch(self, query: str, ids: list[int]):
+        table = query.split("FROM ")[1].split(" ")[0]
+        return [{"id": id} for id in ids if id in self.ids[table]]
+
+
+async def _never_upload(rows, covers):
+    raise AssertionError("nothing is uploaded for a rejected manifest")
+
+
+@pytest.mark.parametrize("suffix, content", [(".ndjson", NDJSON), (".csv", CSV)])
+def test_read_manifest(tmp_path: Path, suffix: str, content: str):
+    path = tmp_path / f"manifest{suffix}"
+    path.write_text(content)
+
+    one, two = read_manifest(path)
+    assert one == IngestTrack(
+        name="one",
+        album="first",
+        artist_id=1,
+        genre_id=2,
+        release_date=datetime.date(2020, 1, 2),
+        file="one.mp3",
+        cover="first.png",
+    )
+    # empty csv cells are missing values, not empty strings
+    assert (two.genre_id, two.cover) == (None, None)
+
+
+def test_read_manifest_rejects_invalid_rows(tmp_path: Path):
+    path = tmp_path / "manifest.csv"
+    path.write_text("name,album,artist_id,release_date,file\none,first,x,2020-01-01,\n")
+    with pytest.raises(ValidationError):
+        read_manifest(path)
+
+
+@pytest.mark.asyncio
+async def test_load_rejects_unknown_artists_and_genres():
+    conn = FakeConnection(users={1}, genres={2})
+    tracks = [_track("one", "a", 1, 2), _track("two", "a", 3), _track("six", "b", 1, 4)]
+
+    with pytest.raises(SystemExit, match=r"artists: \[3\], unknown genres: \[4\]"):
+        await load(conn, tracks, _never_upload)
+    with pytest.raises(SystemExit, match=r"artists: \[\], unknown genres: \[4\]"):
+        await load(conn, tracks[:1] + tracks[2:], _never_upload)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    INGEST_DSN is None,
+    reason="set INGEST_DSN=postgresql+asyncpg://... to a scratch database",
+)
+async def test_load_copies_albums_and_tracks():
+    import asyncpg
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from models import album, genre, playlist, playlist_track, subscription, track, user  # noqa: F401
+    from models.base_model import MusicModelBase
+
+    engine = create_async_engine(INGEST_DSN)
+    async with engine.begin() as conn:
+        await conn.run_sync(MusicModelBase.metadata.create_all)
+    await engine.dispose()
+
+    conn = await asyncpg.connect(INGEST_DSN.replace("+asyncpg", ""))
+    artist_id = genre_id = None
+    try:
+        artist_id = await conn.fetchval(
+            "INSERT INTO users (name, username, password, role) "
+            "VALUES ('ingest', 'ingest_' || gen_random_uuid(), 'x', 'user') "
+            "RETURNING id"
+        )
+        genre_id = await conn.fetchval(
+            "INSERT INTO genres (name) VALUES ('ingest ' || gen_random_uuid()) "
+            "RETURNING id"
+        )
+        tracks = [
+            _track("one", "first", artist_id, genre_id),
+            _track("two", "second", artist_id),
+            _track("three", "first", artist_id),
+        ]
+        tracks[0].cover = "first.png"
+        uploaded = {}
+
+        async def upload_blobs(rows, covers):
+            uploaded["rows"], uploaded["covers"] = rows, covers
+
+        assert await load(conn, tracks, upload_blobs) == (2, 3)
+
+        albums = await conn.fetch(
+            "SELECT id, name, release_date FROM albums WHERE artist_id = $1 "
+            "ORDER BY name",
+            artist_id,
+        )
+        assert [(a["name"], a["release_date"].day) for a in albums] == [
+            ("first", 3),
+            ("second", 3),
+        ]
+        first_id = albums[0]["id"]
+        assert uploaded["covers"] == {first_id: "first.png"}
+
+        stored = await conn.fetch(
+            "SELECT id, name, album_id, genre_id FROM tracks WHERE artist_id = $1 "
+            "ORDER BY id",
+            artist_id,
+        )
+        assert [(t["id"], t["name"], t["album_id"], t["genre_id"]) for t in stored] == [
+            (r.id, r.name, r.album_id, r.genre_id) for r in uploaded["rows"]
+        ]
+        assert [t["album_id"] == first_id for t in stored] == [True, False, True]
+
+        # the reserved ids moved the sequences past the copied rows
+        next_track_id = await conn.fetchval(
+            "INSERT INTO tracks (name, album_id, artist_id, release_date) "
+            "VALUES ('after', $1, $2, current_date) RETURNING id",
+            first_id,
+            artist_id,
+        )
+        assert next_track_id > stored[-1]["id"]
+    finally:
+        # albums and tracks go along with their artist
+        await conn.execute("DELETE FROM users WHERE id = $1", artist_id)
+        await conn.execute("DELETE FROM genres WHERE id = $1", genre_id)
+        await conn.close()
@@ -468,3 +468,148 @@ class TestUserEndpoints:
 
         await self._delete_playlist(async_client, playlist_id, headers)
         await self._delete_user(async_client, headers)
+
+    async def test_bulk_add_and_remove_tracks(self, async_client: AsyncClient):
+        author_id, headers = await self._create_user_and_get_auth_headers(
+            async_client, "BulkPlaylistUser"
+        )
+        playlist_id = await self._create_playlist(
+            async_client, author_id, headers, "BulkPlaylist"
+        )
+        track_ids = [
+            await self._create_single(async_client, author_id, headers, f"bulk{i}")
+            for i in range(3)
+        ]
+        await self._add_track_to_playlist(
+            async_client, playlist_id, track_ids[0], headers
+        )
+
+        resp_add = await async_client.post(
+            "/playlist/tracks/",
+            params={"id": playlist_id},
+            json=[*track_ids, 999999],
+            headers=headers,
+        )
+        assert resp_add.status_code == status.HTTP_200_OK
+        assert resp_add.json() == [
+            {"track_id": track_ids[0], "status": "already_exists"},
+            {"track_id": track_ids[1], "status": "added"},
+            {"track_id": track_ids[2], "status": "added"},
+            {"track_id": 999999, "status": "track_not_found"},
+        ]
+
+        resp_remove = await async_client.post(
+            "/playlist/tracks/remove",
+            params={"id": playlist_id},
+            json=[track_ids[0], track_ids[1], 999999],
+            headers=headers,
+        )
+        assert resp_remove.status_code == status.HTTP_200_OK
+        assert resp_remove.json() == [
+            {"track_id": track_ids[0], "status": "removed"},
+            {"track_id": track_ids[1], "status": "removed"},
+            {"track_id": 999999, "status": "not_in_playlist"},
+        ]
+
+        resp_get = await async_client.get(
+            "/playlist/tracks/", params={"id": playlist_id}, headers=headers
+        )
+        assert resp_get.status_code == status.HTTP_200_OK
+        assert [t["id"] for t in resp_get.json()] == [track_ids[2]]
+
+        resp_empty = await async_client.post(
+            "/playlist/tracks/", params={"id": playlist_id}, json=[], headers=headers
+        )
+        assert resp_empty.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        await self._delete_playlist(async_client, playlist_id, headers)
+        for track_id in track_ids:
+            await self._delete_track(async_client, track_id, headers)
+        await self._delete_user(async_client, headers)
+
+    async def test_bulk_add_tracks_playlist_not_found(self, async_client: AsyncClient):
+        _, headers = await self._create_user_and_get_auth_headers(
+            async_client, "BulkPlaylistMissing"
+        )
+        resp = await async_client.post(
+            "/playlist/tracks/", params={"id": 999999}, json=[1], headers=headers
+        )
+        assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+        await self._delete_user(async_client, headers)
+
+    async def test_playlist_tracks_keep_order_and_move(self, async_client: AsyncClient):
+        author_id, headers = await self._create_user_and_get_auth_headers(
+            async_client, "OrderedPlaylistUser"
+        )
+        playlist_id = await self._create_playlist(
+            async_client, author_id, headers, "OrderedPlaylist"
+        )
+        track_ids = [
+            await self._create_single(async_client, author_id, headers, f"ord{i}")
+            for i in range(4)
+        ]
+        for track_id in track_ids[:3]:
+            await self._add_track_to_playlist(
+                async_client, playlist_id, track_id, headers
+            )
+
+        resp_insert = await async_client.post(
+            "/playlist/track/",
+            params={
+                "playlist_id": playlist_id,
+                "track_id": track_ids[3],
+                "before_id": track_ids[0],
+            },
+            headers=headers,
+        )
+        assert resp_insert.status_code == status.HTTP_201_CREATED
+
+        resp_move = await async_client.put(
+            "/playlist/track/position/",
+            params={
+                "playlist_id": playlist_id,
+                "track_id": track_ids[2],
+                "before_id": track_ids[1],
+            },
+            headers=headers,
+        )
+        assert resp_move.status_code == status.HTTP_200_OK
+
+        resp_move_last = await async_client.put(
+            "/playlist/track/position/",
+            params={"playlist_id": playlist_id, "track_id": track_ids[3]},
+            headers=headers,
+        )
+        assert resp_move_last.status_code == status.HTTP_200_OK
+
+        expected = [track_ids[0], track_ids[2], track_ids[1], track_ids[3]]
+        resp_get = await async_client.get(
+            "/playlist/tracks/", params={"id": playlist_id}, headers=headers
+        )
+        assert resp_get.status_code == status.HTTP_200_OK
+        assert [t["id"] for t in resp_get.json()] == expected
+
+        resp_page = await async_client.get(
+            "/playlist/tracks/",
+            params={"id": playlist_id, "skip": 1, "limit": 2},
+            headers=headers,
+        )
+        assert resp_page.status_code == status.HTTP_200_OK
+        assert [t["id"] for t in resp_page.json()] == expected[1:3]
+
+        resp_missing = await async_client.put(
+            "/playlist/track/position/",
+            params={
+                "playlist_id": playlist_id,
+                "track_id": track_ids[0],
+                "before_id": 999999,
+            },
+            headers=headers,
+        )
+        assert resp_missing.status_code == status.HTTP_404_NOT_FOUND
+
+        await self._delete_playlist(async_client, playlist_id, headers)
+        for track_id in track_ids:
+            await self._delete_track(async_client, track_id, headers)
+        await self._delete_user(async_client, headers)
@@ -0,0 +1,281 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from dto.accounts import (  # noqa: E402
+    ArtistPageParams,
+    PlaylistID,
+    PlaylistSearchParams,
+    PlaylistTrackSearchParams,
+    SubscribeSearchParams,
+    UserID,
+)
+from dto.music import AlbumID, AlbumSearchParams, TrackSearchParams  # noqa: E402
+from models import album, genre, playlist, playlist_track, subscription, track, user  # noqa: E402, F401
+from models.base_model import MusicModelBase  # noqa: E402
+from repositories.album import SQLAlchemyAlbumRepository  # noqa: E402
+from repositories.genre import SQLAlchemyGenreRepository  # noqa: E402
+from repositories.playlist import SQLAlchemyPlaylistRepository  # noqa: E402
+from repositories.track import SQLAlchemyTrackRepository  # noqa: E402
+from repositories.user import SQLAlchemyUserRepository  # noqa: E402
+
+
+QUERY_PLAN_DSN = os.getenv("QUERY_PLAN_DSN")
+
+pytestmark = pytest.mark.skipif(
+    QUERY_PLAN_DSN is None,
+    reason="set QUERY_PLAN_DSN=postgresql+asyncpg://... to a scratch database",
+)
+
+USERS = 20_000
+GENRES = 2_000
+ALBUMS = 40_000
+TRACKS = 400_000
+PLAYLISTS = 40_000
+PLAYLIST_TRACKS = 400_000
+SUBSCRIPTIONS = 200_000
+
+SEED_QUERIES = [
+    f"""
+    INSERT INTO users (name, username, password, role)
+    SELECT 'user ' || n, 'user_' || n, 'x', 'user'::userroleenum
+    FROM generate_series(1, {USERS}) n
+    """,
+    f"""
+    INSERT INTO genres (name)
+    SELECT 'genre ' || n FROM generate_series(1, {GENRES}) n
+    """,
+    f"""
+    INSERT INTO albums (name, artist_id, release_date)
+    SELECT 'album ' || n, 1 + n % {USERS}, date '2000-01-01' + n % 9000
+    FROM generate_series(1, {ALBUMS}) n
+    """,
+    f"""
+    INSERT INTO tracks (name, album_id, artist_id, genre_id, release_date)
+    SELECT
+        'track ' || n,
+        1 + n % {ALBUMS},
+        1 + (1 + n % {ALBUMS}) % {USERS},
+        1 + n % {GENRES},
+        date '2000-01-01' + n % 9000
+    FROM generate_series(1, {TRACKS}) n
+    """,
+    f"""
+    INSERT INTO playlists (name, author_id)
+    SELECT 'playlist ' || n, 1 + n % {USERS}
+    FROM generate_series(1, {PLAYLISTS}) n
+    """,
+    f"""
+    INSERT INTO playlist_tracks (playlist_id, track_id, position)
+    SELECT 1 + n % {PLAYLISTS}, 1 + (n::bigint * 7919) % {TRACKS}, to_char(n, 'FM0000000')
+    FROM generate_series(1, {PLAYLIST_TRACKS}) n
+    ON CONFLICT DO NOTHING
+    """,
+    f"""
+    INSERT INTO subscriptions (subscriber_id, artist_id)
+    SELECT 1 + n % {USERS}, 1 + (n / {USERS} * 97 + n * 31) % {USERS}
+    FROM generate_series(1, {SUBSCRIPTIONS}) n
+    ON CONFLICT DO NOTHING
+    """,
+]
+
+# lookups the foreign key triggers run on cascading deletes and SET NULL
+FOREIGN_KEY_LOOKUPS = [
+    ("tracks", "album_id"),
+    ("tracks", "artist_id"),
+    ("tracks", "genre_id"),
+    ("albums", "artist_id"),
+    ("playlists", "author_id"),
+    ("subscriptions", "artist_id"),
+    ("subscriptions", "subscriber_id"),
+    ("playlist_tracks", "playlist_id"),
+    ("playlist_tracks", "track_id"),
+]
+
+
+async def _seed(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(MusicModelBase.metadata.drop_all)
+        await conn.run_sync(MusicModelBase.metadata.create_all)
+        for query in SEED_QUERIES:
+            await conn.execute(text(query))
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("ANALYZE"))
+
+
+def _seq_scans(node: dict) -> set[str]:
+    found = {node["Relation Name"]} if node["Node Type"] == "Seq Scan" else set()
+    for child in node.get("Plans", []):
+        found |= _seq_scans(child)
+    return found
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine(QUERY_PLAN_DSN)
+    async with engine.connect() as conn:
+        seeded = await conn.scalar(text("SELECT to_regclass('subscriptions')"))
+        if seeded is not None:
+            seeded = await conn.scalar(text("SELECT count(*) FROM tracks")) == TRACKS
+    if not seeded:
+        await _seed(engine)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def genres(engine):
+    return await SQLAlchemyGenreRepository.create(
+        async_sessionmaker(bind=engine, class_=AsyncSession)
+    )
+
+
+@pytest.mark.asyncio
+class TestQueryPlans:
+    async def _assert_no_seq_scan(self, engine, call):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                statements.append((statement, parameters))
+
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await call(async_sessionmaker(bind=engine, class_=AsyncSession))
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+        assert statements, "repository call issued no queries"
+        async with engine.connect() as conn:
+            for statement, parameters in statements:
+                result = await conn.exec_driver_sql(
+                    "EXPLAIN (FORMAT JSON) " + statement, parameters
+                )
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                scanned = _seq_scans(plan[0]["Plan"])
+                assert not scanned, f"Seq Scan on {scanned} in:\n{statement}"
+
+    async def test_get_tracks_by_album(self, engine, genres):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyTrackRepository(sf, genres).get_tracks(
+                TrackSearchParams(album_id=42)
+            ),
+        )
+
+    async def test_get_tracks_by_artist(self, engine, genres):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyTrackRepository(sf, genres).get_tracks(
+                TrackSearchParams(artist_id=42)
+            ),
+        )
+
+    async def test_get_tracks_by_genre(self, engine, genres):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyTrackRepository(sf, genres).get_tracks(
+                TrackSearchParams(genre_id=42)
+            ),
+        )
+
+    async def test_get_album_track_ids(self, engine, genres):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyTrackRepository(sf, genres).get_album_track_ids(
+                AlbumID(id=42)
+            ),
+        )
+
+    async def test_get_albums_by_artist(self, engine):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyAlbumRepository(sf).get_albums(
+                AlbumSearchParams(artist_id=42)
+            ),
+        )
+
+    async def test_get_artist_albums(self, engine):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyAlbumRepository(sf).get_artist_albums(
+                ArtistPageParams(id=42)
+            ),
+        )
+
+    async def test_get_artist_tracks(self, engine, genres):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyTrackRepository(sf, genres).get_artist_tracks(
+                ArtistPageParams(id=42)
+            ),
+        )
+
+    async def test_get_playlists_by_author(self, engine):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyPlaylistRepository(sf).get_playlists(
+                PlaylistSearchParams(author_id=42)
+            ),
+        )
+
+    async def test_get_tracks_by_playlist(self, engine):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyPlaylistRepository(sf).get_tracks_by_playlist(
+                PlaylistTrackSearchParams(id=42)
+            ),
+        )
+
+    async def test_get_playlist_track_ids(self, engine):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyPlaylistRepository(sf).get_playlist_track_ids(
+                PlaylistID(id=42)
+            ),
+        )
+
+    async def test_get_subscribers(self, engine):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyUserRepository(sf).get_subscribers(
+                SubscribeSearchParams(id=42)
+            ),
+        )
+
+    async def test_get_subscriptions(self, engine):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyUserRepository(sf).get_subscriptions(
+                SubscribeSearchParams(id=42)
+            ),
+        )
+
+    async def test_get_subscribe_count(self, engine):
+        await self._assert_no_seq_scan(
+            engine,
+            lambda sf: SQLAlchemyUserRepository(sf).get_subscribe_count(UserID(id=42)),
+        )
+
+    @pytest.mark.parametrize("table,column", FOREIGN_KEY_LOOKUPS)
+    async def test_foreign_key_lookup(self, engine, table, column):
+        async with engine.connect() as conn:
+            plan = await conn.scalar(
+                text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table} WHERE {column} = 42")
+            )
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        scanned = _seq_scans(plan[0]["Plan"])
+        assert not scanned, f"Seq Scan on {scanned} looking up {table}.{column}"
@@ -1,6 +1,8 @@
+import json
 import pytest
 from fastapi import status
 from httpx import AsyncClient
+from datetime import date
 
 
 @pytest.mark.asyncio
@@ -181,3 +183,318 @@ class TestTrackQueueEndpoints:
         await async_client.delete("/track_queue/", headers=headers)
 
         await self._delete_user(async_client, headers)
+
+    async def test_queue_duplicates(self, async_client: AsyncClient):
+        headers = await self._get_auth_headers(async_client)
+
+        list_response = await async_client.get("/track_queue/", headers=headers)
+        if list_response.status_code == status.HTTP_200_OK:
+            await async_client.delete("/track_queue/", headers=headers)
+
+        for track_id in [7, 8, 7]:
+            await async_client.post(
+                "/track_queue/right", params={"id": track_id}, headers=headers
+            )
+        for _ in range(60):
+            response = await async_client.patch(
+                "/track_queue/insert",
+                params={"track_id": 7, "queue_id": 1},
+                headers=headers,
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        list_response = await async_client.get("/track_queue/", headers=headers)
+        assert list_response.json()["track_ids"] == [7] * 61 + [8, 7]
+
+        move_response = await async_client.patch(
+            "/track_queue/move",
+            params={"src_id": 62, "dest_id": 61},
+            headers=headers,
+        )
+        assert move_response.status_code == status.HTTP_200_OK
+
+        remove_response = await async_client.patch(
+            "/track_queue/remove", params={"id": 0}, headers=headers
+        )
+        assert remove_response.status_code == status.HTTP_200_OK
+
+        list_response = await async_client.get(
+            "/track_queue/", params={"offset": 58}, headers=headers
+        )
+        assert list_response.json()["track_ids"] == [7, 7, 7, 8]
+
+        await async_client.delete("/track_queue/", headers=headers)
+
+        await self._delete_user(async_client, headers)
+
+    async def test_queue_bulk_enqueue(self, async_client: AsyncClient):
+        headers = await self._get_auth_headers(async_client)
+        user_id = (await async_client.get("/user/", headers=headers)).json()["id"]
+
+        track_ids = []
+        album_id = None
+        for name in ["BulkFirst", "BulkSecond"]:
+            if album_id is None:
+                resp = await async_client.post(
+                    "/track/single/",
+                    params={
+                        "name": name,
+                        "artist_id": user_id,
+                        "release_date": date.today().isoformat(),
+                    },
+                    files={"track_file": ("bulk.mp3", b"fakedata", "audio/mpeg")},
+                    headers=headers,
+                )
+            else:
+                resp = await async_client.post(
+                    "/track/",
+                    params={
+                        "name": name,
+                        "album_id": album_id,
+                        "artist_id": user_id,
+                        "release_date": date.today().isoformat(),
+                    },
+                    files={"track_file": ("bulk.mp3", b"fakedata", "audio/mpeg")},
+                    headers=headers,
+                )
+            assert resp.status_code == status.HTTP_201_CREATED, resp.text
+            album_id = resp.json()["album_id"]
+            track_ids.append(resp.json()["id"])
+
+        await async_client.post("/track_queue/right", params={"id": 1}, headers=headers)
+        response = await async_client.post(
+            "/track_queue/album",
+            params={"id": album_id, "replace": True},
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        list_response = await async_client.get("/track_queue/", headers=headers)
+        assert list_response.json()["track_ids"] == track_ids
+
+        response = await async_client.post(
+            "/track_queue/tracks",
+            params={"side": "left"},
+            json=track_ids[::-1],
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        list_response = await async_client.get("/track_queue/", headers=headers)
+        assert list_response.json()["track_ids"] == track_ids[::-1] + track_ids
+
+        response = await async_client.post(
+            "/track_queue/tracks", json=[track_ids[0], 10**9], headers=headers
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        response = await async_client.post(
+            "/track_queue/album", params={"id": 10**9}, headers=headers
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        response = await async_client.post(
+            "/track_queue/playlist", params={"id": 10**9}, headers=headers
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        await async_client.delete("/track_queue/", headers=headers)
+
+        await self._delete_user(async_client, headers)
+
+    async def test_queue_shuffle_and_repeat(self, async_client: AsyncClient):
+        headers = await self._get_auth_headers(async_client)
+
+        list_response = await async_client.get("/track_queue/", headers=headers)
+        if list_response.status_code == status.HTTP_200_OK:
+            await async_client.delete("/track_queue/", headers=headers)
+
+        track_ids = list(range(1, 21))
+        for track_id in track_ids:
+            await async_client.post(
+                "/track_queue/right", params={"id": track_id}, headers=headers
+            )
+
+        response = await async_client.patch(
+            "/track_queue/shuffle", params={"seed": 42}, headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        shuffled = (
+            await async_client.get(
+                "/track_queue/", params={"limit": 0}, headers=headers
+            )
+        ).json()["track_ids"]
+        assert sorted(shuffled) == track_ids
+
+        modes = await async_client.get("/track_queue/modes", headers=headers)
+        assert modes.json() == {"shuffle": True, "seed": 42, "repeat": "off"}
+
+        response = await async_client.patch("/track_queue/unshuffle", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        list_response = await async_client.get(
+            "/track_queue/", params={"limit": 0}, headers=headers
+        )
+        assert list_response.json()["track_ids"] == track_ids
+
+        await async_client.patch(
+            "/track_queue/shuffle", params={"seed": 42}, headers=headers
+        )
+        list_response = await async_client.get(
+            "/track_queue/", params={"limit": 0}, headers=headers
+        )
+        assert list_response.json()["track_ids"] == shuffled
+        await async_client.patch("/track_queue/unshuffle", headers=headers)
+
+        response = await async_client.patch(
+            "/track_queue/repeat", params={"mode": "one"}, headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        for _ in range(2):
+            response = await async_client.post("/track_queue/next", headers=headers)
+            assert response.json() == {"id": 1}
+
+        await async_client.patch(
+            "/track_queue/repeat", params={"mode": "all"}, headers=headers
+        )
+        response = await async_client.post("/track_queue/next", headers=headers)
+        assert response.json() == {"id": 1}
+        list_response = await async_client.get(
+            "/track_queue/", params={"limit": 0}, headers=headers
+        )
+        assert list_response.json()["track_ids"] == track_ids[1:] + [1]
+
+        await async_client.patch(
+            "/track_queue/repeat", params={"mode": "off"}, headers=headers
+        )
+        response = await async_client.post("/track_queue/next", headers=headers)
+        assert response.json() == {"id": 2}
+        list_response = await async_client.get(
+            "/track_queue/", params={"limit": 0}, headers=headers
+        )
+        assert list_response.json()["track_ids"] == track_ids[2:] + [1]
+
+        await async_client.delete("/track_queue/", headers=headers)
+
+        response = await async_client.post("/track_queue/next", headers=headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        await self._delete_user(async_client, headers)
+
+    async def test_queue_events(self, async_client: AsyncClient):
+        headers = await self._get_auth_headers(async_client)
+
+        list_response = await async_client.get("/track_queue/", headers=headers)
+        if list_response.status_code == status.HTTP_200_OK:
+            await async_client.delete("/track_queue/", headers=headers)
+
+        async with async_client.stream(
+            "GET", "/track_queue/events", headers=headers
+        ) as events:
+            assert events.status_code == status.HTTP_200_OK
+            assert events.headers["content-type"].startswith("text/event-stream")
+            lines = events.aiter_lines()
+            # sent once the stream is subscribed
+            assert await lines.__anext__() == ": keepalive"
+
+            await async_client.post(
+                "/track_queue/right", params={"id": 5}, headers=headers
+            )
+            await async_client.delete("/track_queue/", headers=headers)
+
+            received = []
+            while len(received) < 2:
+                line = await lines.__anext__()
+                if line.startswith("data: "):
+                    received.append(json.loads(line.removeprefix("data: ")))
+
+        assert received[0]["op"] == "push"
+        assert received[0]["track_ids"] == [5]
+        assert received[0]["version"] == 1
+        assert received[1] == {"op": "delete"}
+
+        await self._delete_user(async_client, headers)
+
+    async def test_playback_session(self, async_client: AsyncClient):
+        headers = await self._get_auth_headers(async_client)
+
+        response = await async_client.get("/track_queue/session", headers=headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        response = await async_client.put(
+            "/track_queue/session",
+            params={"track_id": 5, "position_ms": -1},
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        for position_ms in (1000, 2000, 3000):
+            response = await async_client.put(
+                "/track_queue/session",
+                params={"track_id": 5, "position_ms": position_ms, "queue_index": 2},
+                headers=headers,
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        response = await async_client.get("/track_queue/session", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        session = response.json()
+        assert session["track_id"] == 5
+        assert session["position_ms"] == 3000
+        assert session["queue_index"] == 2
+
+        await self._delete_user(async_client, headers)
+
+    async def test_queue_prefetch(self, async_client: AsyncClient):
+        headers = await self._get_auth_headers(async_client)
+        user_id = (await async_client.get("/user/", headers=headers)).json()["id"]
+
+        list_response = await async_client.get("/track_queue/", headers=headers)
+        if list_response.status_code == status.HTTP_200_OK:
+            await async_client.delete("/track_queue/", headers=headers)
+
+        response = await async_client.get("/track_queue/prefetch", headers=headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        resp = await async_client.post(
+            "/track/single/",
+            params={
+                "name": "PrefetchTrack",
+                "artist_id": user_id,
+                "release_date": date.today().isoformat(),
+            },
+            files={"track_file": ("prefetch.mp3", b"fakedata", "audio/mpeg")},
+            headers=headers,
+        )
+        assert resp.status_code == status.HTTP_201_CREATED, resp.text
+        track_id = resp.json()["id"]
+
+        # the unknown track is left out, the queue ids stay as they are
+        for id in (track_id, 10**9, track_id):
+            await async_client.post(
+                "/track_queue/right", params={"id": id}, headers=headers
+            )
+
+        response = await async_client.get(
+            "/track_queue/prefetch", params={"limit": 3}, headers=headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        prefetch = response.json()
+        assert [e["queue_id"] for e in prefetch["entries"]] == [0, 2]
+        assert prefetch["entries"][0]["track"]["id"] == track_id
+        assert prefetch["entries"][0]["size"] == len(b"fakedata")
+        assert prefetch["version"] == 3
+
+        response = await async_client.get(
+            "/track_queue/prefetch",
+            params={"limit": 1, "warm": False},
+            headers=headers,
+        )
+        assert [e["queue_id"] for e in response.json()["entries"]] == [0]
+
+        stream_response = await async_client.get(
+            "/track/stream/", params={"id": track_id}
+        )
+        assert stream_response.headers["content-range"] == "bytes 0-7/8"
+
+        await async_client.delete("/track_queue/", headers=headers)
+        await self._delete_user(async_client, headers)
@@ -0,0 +1,95 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from dto.accounts import ArtistPageParams  # noqa: E402
+from dto.music import TrackID  # noqa: E402
+from services.cache import CacheBroadcaster, ResultCache  # noqa: E402
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+        self.delay_sec = 0.0
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        call = self.calls
+        await asyncio.sleep(self.delay_sec)
+        return call
+
+
+class FakeCacheEventsRepository:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, events) -> None:
+        self.published += events
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidates_one_entity():
+    cache = ResultCache("entity", 30, 2, 100)
+    loader = Loader()
+
+    async def page(id: int, tracks_limit: int = 10) -> int:
+        params = ArtistPageParams(id=id, tracks_limit=tracks_limit)
+        return await cache.get_or_load("artist_page", params, loader, id=id)
+
+    assert [await page(1), await page(1, 5), await page(2)] == [1, 2, 3]
+    assert [await page(1), await page(1, 5), await page(2)] == [1, 2, 3]
+
+    cache.invalidate("artist_page", ids=[1, None])
+    assert [await page(1), await page(1, 5), await page(2)] == [4, 5, 3]
+
+    cache.invalidate("artist_page")
+    assert await page(2) == 6
+
+
+@pytest.mark.asyncio
+async def test_cache_drops_load_started_before_invalidation():
+    cache = ResultCache("entity", 30, 2, 100)
+    loader = Loader()
+    loader.delay_sec = 0.05
+
+    def track() -> asyncio.Future:
+        return asyncio.ensure_future(
+            cache.get_or_load("track", TrackID(id=1), loader, id=1)
+        )
+
+    stale = track()
+    await asyncio.sleep(0.01)
+    cache.invalidate("track", ids=[1])
+    # not joined to the load that may have read the old row
+    fresh = track()
+    assert await stale == 1
+    assert await fresh == 2
+    assert await track() == 2
+
+
+@pytest.mark.asyncio
+async def test_broadcaster_applies_other_replicas():
+    caches = [ResultCache("entity", 30, 2, 100) for _ in range(2)]
+    repository = FakeCacheEventsRepository()
+    replicas = [CacheBroadcaster(repository, [cache], 1) for cache in caches]
+    loader = Loader()
+
+    for cache in caches:
+        await cache.get_or_load("track", TrackID(id=1), loader, id=1)
+    caches[0].invalidate("track", ids=[1])
+    await replicas[0].publish()
+    assert [e.ids for e in repository.published] == [[1]]
+
+    for replica in replicas:
+        for event in repository.published:
+            replica.apply(event)
+    assert await caches[1].get_or_load("track", TrackID(id=1), loader, id=1) == 3
+    assert await caches[0].get_or_load("track", TrackID(id=1), loader, id=1) == 4
+
+    # a reconnected listener may have missed invalidations
+    replicas[1].apply(None)
+    assert await caches[1].get_or_load("track", TrackID(id=1), loader, id=1) == 5
@@ -0,0 +1,102 @@
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+import uuid
+from datetime import date
+
+
+@pytest.mark.asyncio
+class TestSearchEndpoints:
+    async def _create_user_and_get_auth_headers(
+        self, async_client: AsyncClient, name: str
+    ):
+        user_data = {
+            "name": name,
+            "username": f"testuser_{uuid.uuid4().hex[:8]}",
+            "password": "testpass",
+        }
+        resp_reg = await async_client.post(
+            "/user/register/",
+            params=user_data,
+            files={"cover_file": ("", "", "")},
+        )
+        assert resp_reg.status_code == status.HTTP_201_CREATED, (
+            f"Failed to register user: {resp_reg.text}"
+        )
+
+        headers = {"Authorization": f"Bearer {resp_reg.json()['token']}"}
+
+        resp_get_user = await async_client.get("/user/", headers=headers)
+        assert resp_get_user.status_code == status.HTTP_200_OK
+        return resp_get_user.json()["id"], headers
+
+    async def _delete_user(self, client: AsyncClient, headers):
+        resp = await client.delete("/user/", headers=headers)
+        assert resp.status_code in [
+            status.HTTP_204_NO_CONTENT,
+            status.HTTP_404_NOT_FOUND,
+        ], f"Failed to delete user: {resp.status_code} - {resp.text}"
+
+    async def test_suggest_lifecycle(self, async_client: AsyncClient):
+        prefix = f"suggest{uuid.uuid4().hex[:8]}"
+        user_id, headers = await self._create_user_and_get_auth_headers(
+            async_client, f"{prefix} Artist"
+        )
+
+        resp = await async_client.get(
+            "/search/suggest", params={"prefix": prefix.upper()}
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        assert {"kind": "artist", "id": user_id, "name": f"{prefix} Artist"} in (
+            resp.json()
+        )
+
+        track_data = {
+            "name": f"{prefix} Track",
+            "artist_id": user_id,
+            "release_date": date.today().isoformat(),
+        }
+        files = {
+            "track_file": ("single.mp3", b"fakesingledata", "audio/mpeg"),
+            "cover_file": ("", "", ""),
+        }
+        resp = await async_client.post(
+            "/track/single/", params=track_data, files=files, headers=headers
+        )
+        assert resp.status_code == status.HTTP_201_CREATED
+        track = resp.json()
+
+        resp = await async_client.get(
+            "/search/suggest", params={"prefix": prefix, "kind": "track"}
+        )
+        assert resp.status_code == status.HTTP_200_OK
+        assert resp.json() == [
+            {"kind": "track", "id": track["id"], "name": f"{prefix} Track"}
+        ]
+
+        resp = await async_client.get("/search/suggest", params={"prefix": "track"})
+        assert resp.status_code == status.HTTP_200_OK
+
+        resp = await async_client.delete(
+            "/track/", params={"id": track["id"]}, headers=headers
+        )
+        assert resp.status_code == status.HTTP_204_NO_CONTENT
+
+        resp = await async_client.get(
+            "/search/suggest", params={"prefix": prefix, "kind": "track"}
+        )
+        assert resp.json() == []
+
+        await self._delete_user(async_client, headers)
+
+        resp = await async_client.get("/search/suggest", params={"prefix": prefix})
+        assert resp.json() == []
+
+    async def test_suggest_validation(self, async_client: AsyncClient):
+        resp = await async_client.get("/search/suggest", params={"prefix": ""})
+        assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        resp = await async_client.get(
+            "/search/suggest", params={"prefix": "a", "limit": 1000}
+        )
+        assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
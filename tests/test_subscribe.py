@@ -254,3 +254,61 @@ class TestUserEndpoints:
         await self._delete_user(async_client, artist_headers)
         await self._delete_user(async_client, subscriber1_headers)
         await self._delete_user(async_client, subscriber2_headers)
+
+    async def test_subscription_counters_follow_writes(self, async_client: AsyncClient):
+        artist_id, artist_headers = await self._create_user_and_get_auth_headers(
+            async_client, "CounterArtist"
+        )
+        (
+            subscriber_id,
+            subscriber_headers,
+        ) = await self._create_user_and_get_auth_headers(async_client, "CounterSub")
+
+        resp_sub = await async_client.post(
+            "/user/subscribe",
+            params={"artist_id": artist_id},
+            headers=subscriber_headers,
+        )
+        assert resp_sub.status_code == status.HTTP_201_CREATED
+
+        resp_artist = await async_client.get(
+            "/user/artist/", params={"id": artist_id}, headers=artist_headers
+        )
+        assert resp_artist.status_code == status.HTTP_200_OK
+        assert resp_artist.json()["followers_count"] == 1
+        assert resp_artist.json()["following_count"] == 0
+
+        resp_subscriber = await async_client.get(
+            "/user/artist/", params={"id": subscriber_id}, headers=artist_headers
+        )
+        assert resp_subscriber.status_code == status.HTTP_200_OK
+        assert resp_subscriber.json()["followers_count"] == 0
+        assert resp_subscriber.json()["following_count"] == 1
+
+        resp_unsub = await async_client.post(
+            "/user/unsubscribe",
+            params={"artist_id": artist_id},
+            headers=subscriber_headers,
+        )
+        assert resp_unsub.status_code == status.HTTP_204_NO_CONTENT
+
+        resp_count = await async_client.get(
+            "/user/subscriber-count", params={"id": artist_id}, headers=artist_headers
+        )
+        assert resp_count.status_code == status.HTTP_200_OK
+        assert resp_count.json()["count"] == 0
+
+        await async_client.post(
+            "/user/subscribe",
+            params={"artist_id": artist_id},
+            headers=subscriber_headers,
+        )
+        await self._delete_user(async_client, subscriber_headers)
+
+        resp_count = await async_client.get(
+            "/user/subscriber-count", params={"id": artist_id}, headers=artist_headers
+        )
+        assert resp_count.status_code == status.HTTP_200_OK
+        assert resp_count.json()["count"] == 0
+
+        await self._delete_user(async_client, artist_headers)
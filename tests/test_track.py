@@ -483,3 +483,140 @@ class TestTrackEndpoints:
         resp = await async_client.put("/track/", params=params, headers=headers)
         assert resp.status_code == status.HTTP_404_NOT_FOUND
         await self._delete_user(async_client, headers)
+
+    async def test_get_tracks_cached_search_sees_writes(
+        self, async_client: AsyncClient
+    ):
+        genre_id, genre_headers = await self._create_genre(
+            async_client, "CachedSearchGenre"
+        )
+        user_id, user_headers = await self._create_user_and_get_auth_headers(
+            async_client, "CachedSearchUser"
+        )
+
+        r1 = await async_client.get("/tracks/", params={"artist_id": user_id})
+        assert r1.status_code == status.HTTP_200_OK
+        assert r1.json() == []
+
+        tid = await self._create_single(
+            async_client, user_id, genre_id, user_headers, "CachedSearch"
+        )
+
+        r2 = await async_client.get("/tracks/", params={"artist_id": user_id})
+        assert r2.status_code == status.HTTP_200_OK
+        assert [t["id"] for t in r2.json()] == [tid]
+
+        r3 = await async_client.get("/tracks/", params={"artist_id": user_id})
+        assert r3.json() == r2.json()
+
+        await self._delete_track(async_client, tid, user_headers)
+
+        r4 = await async_client.get("/tracks/", params={"artist_id": user_id})
+        assert r4.status_code == status.HTTP_200_OK
+        assert r4.json() == []
+
+        await self._delete_genre(async_client, genre_id, genre_headers)
+        await self._delete_user(async_client, user_headers)
+
+    async def test_get_track_conditional(self, async_client: AsyncClient):
+        genre_id, genre_headers = await self._create_genre(
+            async_client, "ConditionalGenre"
+        )
+        user_id, user_headers = await self._create_user_and_get_auth_headers(
+            async_client, "ConditionalUser"
+        )
+        tid = await self._create_single(
+            async_client, user_id, genre_id, user_headers, "Conditional"
+        )
+
+        first = await async_client.get("/track/", params={"id": tid})
+        assert first.status_code == status.HTTP_200_OK
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+        assert "last-modified" in first.headers
+
+        revalidated = await async_client.get(
+            "/track/", params={"id": tid}, headers={"If-None-Match": etag}
+        )
+        assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+        since = await async_client.get(
+            "/track/",
+            params={"id": tid},
+            headers={"If-Modified-Since": first.headers["last-modified"]},
+        )
+        assert since.status_code == status.HTTP_304_NOT_MODIFIED
+
+        listed = await async_client.get("/tracks/", params={"artist_id": user_id})
+        assert (
+            await async_client.get(
+                "/tracks/",
+                params={"artist_id": user_id},
+                headers={"If-None-Match": listed.headers["etag"]},
+            )
+        ).status_code == status.HTTP_304_NOT_MODIFIED
+
+        updated = await async_client.put(
+            "/track/",
+            params={"id": tid, "name": "Renamed"},
+            headers=user_headers,
+        )
+        assert updated.status_code == status.HTTP_200_OK
+
+        changed = await async_client.get(
+            "/track/", params={"id": tid}, headers={"If-None-Match": etag}
+        )
+        assert changed.status_code == status.HTTP_200_OK
+        assert changed.json()["name"] == "Renamed"
+        assert changed.headers["etag"] != etag
+
+        await self._delete_track(async_client, tid, user_headers)
+        await self._delete_genre(async_client, genre_id, genre_headers)
+        await self._delete_user(async_client, user_headers)
+
+    async def test_responses_compression(self, async_client: AsyncClient):
+        genre_id, genre_headers = await self._create_genre(
+            async_client, "CompressedGenre"
+        )
+        user_id, user_headers = await self._create_user_and_get_auth_headers(
+            async_client, "CompressedUser"
+        )
+        tids = [
+            await self._create_single(
+                async_client, user_id, genre_id, user_headers, "Compressed"
+            )
+            for _ in range(10)
+        ]
+
+        plain = await async_client.get(
+            "/tracks/",
+            params={"artist_id": user_id},
+            headers={"Accept-Encoding": "identity"},
+        )
+        assert plain.status_code == status.HTTP_200_OK
+        assert "content-encoding" not in plain.headers
+
+        gzipped = await async_client.get(
+            "/tracks/",
+            params={"artist_id": user_id},
+            headers={"Accept-Encoding": "br;q=0, zstd;q=0, gzip"},
+        )
+        assert gzipped.status_code == status.HTTP_200_OK
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in gzipped.headers["vary"]
+        assert gzipped.json() == plain.json()
+
+        stream = await async_client.get(
+            "/track/stream/",
+            params={"id": tids[0]},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert stream.status_code == 206
+        assert "content-encoding" not in stream.headers
+
+        for tid in tids:
+            await self._delete_track(async_client, tid, user_headers)
+        await self._delete_genre(async_client, genre_id, genre_headers)
+        await self._delete_user(async_client, user_headers)
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from dto.music import TrackID  # noqa: E402
+from dto.track_queue import (  # noqa: E402
+    BulkEnqueueParams,
+    InQueueID,
+    QueueParameters,
+    QueueRepeat,
+    QueueShuffle,
+    QueueSide,
+    QueueSrcDestIDs,
+    RepeatMode,
+    TrackInQueueIDs,
+)
+from exceptions.track_queue import TrackQueueNotFoundException  # noqa: E402
+from repositories import track_queue  # noqa: E402
+from repositories.track_queue import (  # noqa: E402
+    InMemoryTrackQueueRepository,
+    RedisTrackQueueRepository,
+)
+
+
+TRACK_QUEUE_REDIS_URL = os.getenv("TRACK_QUEUE_REDIS_URL")
+SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "backend" / "scripts"
+USER_ID = 1
+
+
+async def _list(repo, user_id: int = USER_ID) -> list[int]:
+    return (await repo.list(user_id, QueueParameters(offset=0, limit=0))).track_ids
+
+
+def _drain(queue: asyncio.Queue[str]) -> list[dict]:
+    events = []
+    while not queue.empty():
+        events.append(json.loads(queue.get_nowait()))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_memory_queue_lifecycle():
+    repo = InMemoryTrackQueueRepository(600, 100)
+    events = repo.subscribe(USER_ID)
+
+    await repo.push_right(USER_ID, TrackID(id=101))
+    await repo.push_right(USER_ID, TrackID(id=102))
+    await repo.push_left(USER_ID, TrackID(id=103))
+    assert await _list(repo) == [103, 101, 102]
+
+    await repo.insert(USER_ID, TrackInQueueIDs(track_id=104, queue_id=1))
+    assert await _list(repo) == [103, 104, 101, 102]
+    await repo.move(USER_ID, QueueSrcDestIDs(src_id=0, dest_id=3))
+    assert await _list(repo) == [104, 101, 102, 103]
+    await repo.move(USER_ID, QueueSrcDestIDs(src_id=3, dest_id=0))
+    assert await _list(repo) == [103, 104, 101, 102]
+    # positions past the end are clamped
+    await repo.insert(USER_ID, TrackInQueueIDs(track_id=105, queue_id=100))
+    await repo.remove(USER_ID, InQueueID(id=100))
+    assert await _list(repo) == [103, 104, 101, 102]
+    page = await repo.list(USER_ID, QueueParameters(offset=1, limit=2))
+    assert page.track_ids == [104, 101]
+    assert page.version == 8
+
+    assert [e["op"] for e in _drain(events)][-2:] == ["insert", "remove"]
+
+    await repo.delete(USER_ID)
+    assert _drain(events) == [{"op": "delete"}]
+    for call in (
+        repo.delete(USER_ID),
+        repo.list(USER_ID, QueueParameters()),
+        repo.next(USER_ID),
+        repo.remove(USER_ID, InQueueID(id=0)),
+        repo.get_modes(USER_ID),
+    ):
+        with pytest.raises(TrackQueueNotFoundException):
+            await call
+    repo.unsubscribe(USER_ID, events)
+
+
+@pytest.mark.asyncio
+async def test_memory_queue_expires(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(track_queue.time, "monotonic", lambda: now)
+    repo = InMemoryTrackQueueRepository(10, 100)
+
+    await repo.push_right(USER_ID, TrackID(id=1))
+    now += 9
+    # listing keeps the queue alive like any change
+    assert await _list(repo) == [1]
+    now += 9
+    assert await _list(repo) == [1]
+    now += 10
+    with pytest.raises(TrackQueueNotFoundException):
+        await _list(repo)
+    assert USER_ID not in repo.queues
+
+
+async def _apply(repo, op: str, args: tuple):
+    try:
+        return "ok", await getattr(repo, op)(USER_ID, *args)
+    except TrackQueueNotFoundException:
+        return "not found", None
+
+
+def _random_op(rng: random.Random) -> tuple[str, tuple]:
+    op = rng.choice(
+        ["push_many"] * 4
+        + ["insert", "move", "remove", "shuffle", "unshuffle", "set_repeat"]
+        + ["next"] * 3
+        + ["delete", "get_modes", "list"]
+    )
+    if op == "push_many":
+        track_ids = [rng.randrange(20) for _ in range(rng.choice([0, 1, 1, 3]))]
+        params = BulkEnqueueParams(
+            side=rng.choice(list(QueueSide)), replace=rng.random() < 0.1
+        )
+        return op, (track_ids, params)
+    if op == "insert":
+        return op, (
+            TrackInQueueIDs(track_id=rng.randrange(20), queue_id=rng.randrange(12)),
+        )
+    if op == "move":
+        return op, (
+            QueueSrcDestIDs(src_id=rng.randrange(12), dest_id=rng.randrange(12)),
+        )
+    if op == "remove":
+        return op, (InQueueID(id=rng.randrange(12)),)
+    if op == "shuffle":
+        return op, (QueueShuffle(seed=rng.randrange(2**31)),)
+    if op == "set_repeat":
+        return op, (QueueRepeat(mode=rng.choice(list(RepeatMode))),)
+    if op == "list":
+        return op, (QueueParameters(offset=rng.randrange(4), limit=rng.randrange(4)),)
+    return op, ()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    TRACK_QUEUE_REDIS_URL is None,
+    reason="set TRACK_QUEUE_REDIS_URL=redis://... to an empty database",
+)
+async def test_memory_queue_matches_scripts():
+    import redis.asyncio as redis
+
+    client = redis.from_url(TRACK_QUEUE_REDIS_URL, decode_responses=True)
+    await client.flushdb()
+    sha1s = {
+        path.stem: await client.script_load(path.read_text())
+        for path in SCRIPTS_DIR.glob("*.lua")
+    }
+    scripts = RedisTrackQueueRepository(client, 600, sha1s, 100)
+    memory = InMemoryTrackQueueRepository(600, 100)
+    memory_events = memory.subscribe(USER_ID)
+
+    async with client.pubsub() as pubsub:
+        await pubsub.subscribe(f"queue:{USER_ID}:events")
+        await pubsub.get_message(timeout=1)
+
+        rng = random.Random(0)
+        for _ in range(2000):
+            op, args = _random_op(rng)
+            expected = await _apply(scripts, op, args)
+            assert await _apply(memory, op, args) == expected, (op, args)
+
+            received = _drain(memory_events)
+            published = []
+            for _ in received:
+                message = await pubsub.get_message(timeout=1)
+                published.append(json.loads(message["data"]))
+            assert received == published, (op, args)
+
+            listed = await _apply(scripts, "list", (QueueParameters(limit=0),))
+            assert await _apply(memory, "list", (QueueParameters(limit=0),)) == listed
+            modes = await _apply(scripts, "get_modes", ())
+            assert await _apply(memory, "get_modes", ()) == modes
+
+    await client.flushdb()
+    await client.aclose()
@@ -111,3 +111,28 @@ class TestUserActivityEndpoints:
             "/user_activity/delete", json={"ids": [9999999]}
         )
         assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_add_user_activities_batch(self, async_client: AsyncClient):
+        user_id = 7331
+        batch = [
+            {"user_id": user_id, "track_id": 1, "event": "play"},
+            {"user_id": user_id, "track_id": "x", "event": "play"},
+            {"user_id": user_id, "track_id": 2, "event": "e" * 21},
+            {"user_id": user_id, "track_id": 3, "event": "skip"},
+        ]
+        response = await async_client.post("/user_activity/batch", json=batch)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["inserted"] == 2
+        assert [e["index"] for e in data["errors"]] == [1, 2]
+        assert data["errors"][0]["detail"].startswith("track_id")
+
+        response = await async_client.post(
+            "/user_activity/list", json={"user_ids": [user_id]}
+        )
+        assert sorted(a["track_id"] for a in response.json()) == [1, 3]
+
+        response = await async_client.post("/user_activity/batch", json=[])
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        await async_client.post("/user_activity/delete", json={"user_ids": [user_id]})
@@ -0,0 +1,99 @@
+import asyncio
+import datetime
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from dto.user_activity import UserActivity  # noqa: E402
+from exceptions.user_activity import UserActivityBufferFullException  # noqa: E402
+from services.user_activity_buffer import UserActivityBuffer  # noqa: E402
+
+
+def _activity(id: int) -> UserActivity:
+    return UserActivity(
+        id=id, user_id=1, track_id=id, event="play", time=datetime.datetime.now()
+    )
+
+
+class FakeUserActivityRepository:
+    def __init__(self):
+        self.stored = []
+        self.down = False
+        self.delay_sec = 0.0
+
+    async def add_prepared(self, user_activities: list[UserActivity]) -> dict[int, str]:
+        await asyncio.sleep(self.delay_sec)
+        if self.down:
+            raise ConnectionError("down")
+        self.stored += [a.id for a in user_activities]
+        return {}
+
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_by_size_and_time():
+    repo = FakeUserActivityRepository()
+    buffer = UserActivityBuffer(repo, 100, 3, 0.05, "block", 1)
+    runner = asyncio.create_task(buffer.run())
+
+    for id in range(3):
+        await buffer.put(_activity(id))
+    await asyncio.sleep(0.01)
+    assert repo.stored == [0, 1, 2]
+
+    await buffer.put(_activity(3))
+    await asyncio.sleep(0.01)
+    assert repo.stored == [0, 1, 2]
+    await asyncio.sleep(0.1)
+    assert repo.stored == [0, 1, 2, 3]
+
+    runner.cancel()
+
+
+@pytest.mark.asyncio
+async def test_buffer_backpressure_and_drop():
+    repo = FakeUserActivityRepository()
+    repo.down = True
+    buffer = UserActivityBuffer(repo, 3, 10, 0.05, "block", 0.1)
+    runner = asyncio.create_task(buffer.run())
+
+    for id in range(3):
+        await buffer.put(_activity(id))
+    # failed flushes keep the activities, so there is no room
+    with pytest.raises(UserActivityBufferFullException):
+        await buffer.put(_activity(3))
+    assert buffer.depth == 3
+
+    repo.down = False
+    await buffer.put(_activity(3))
+    await asyncio.sleep(0.1)
+    assert repo.stored == [0, 1, 2, 3]
+    runner.cancel()
+
+    dropping = UserActivityBuffer(repo, 2, 10, 10, "drop", 1)
+    for id in range(5):
+        await dropping.put(_activity(id))
+    assert dropping.depth == 2
+
+
+@pytest.mark.asyncio
+async def test_buffer_keeps_cancelled_flush():
+    repo = FakeUserActivityRepository()
+    repo.delay_sec = 1
+    buffer = UserActivityBuffer(repo, 100, 2, 10, "block", 1)
+    runner = asyncio.create_task(buffer.run())
+
+    for id in range(2):
+        await buffer.put(_activity(id))
+    await asyncio.sleep(0.01)
+    runner.cancel()
+    await asyncio.gather(runner, return_exceptions=True)
+    assert buffer.depth == 2
+
+    # the flush on shutdown
+    repo.delay_sec = 0
+    await buffer.flush()
+    assert repo.stored == [0, 1]
+    assert buffer.depth == 0